@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark perzistentní DFA cache parseru (src/parser/dfa_cache.py)
+# Každé měření běží v novém procesu: změří se načtení cache, první překlad programu
+# a ustálený (zahřátý) překlad téhož programu. Porovnává se studený proces bez cache
+# (PJP_DFA_CACHE=0) s procesem, který cache načte.
+#
+# Použití:
+#   python -m benchmarks.bench_dfa_cache [--runs 10] [--workload NAME ...] [--scale 0.2] [--cache FILE]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.workloads import WORKLOADS, generate
+
+# Kód spuštěný v novém procesu; vypíše časy jako JSON
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+from src.compiler.compiler import compile_source
+from src.parser import dfa_cache
+source = open(sys.argv[2], encoding='utf-8').read()
+started = time.perf_counter()
+dfa_cache.ensure_loaded()
+load = time.perf_counter() - started
+times = []
+for _ in range(4):
+    started = time.perf_counter()
+    result = compile_source(source, '<bench>')
+    times.append(time.perf_counter() - started)
+    if not result.success:
+        raise SystemExit(f"compilation failed: {result.errors[:1]}")
+print(json.dumps({'load': load, 'first': times[0], 'warm': min(times[1:])}))
+"""
+
+def measure(source_path, cache_setting):
+    environment = dict(os.environ, PJP_DFA_CACHE=cache_setting)
+    completed = subprocess.run([sys.executable, '-c', CHILD, ROOT, source_path], env=environment,
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs cached first-parse latency in fresh processes")
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes per configuration (default: 10)")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS), default=sorted(WORKLOADS))
+    parser.add_argument("--scale", type=float, default=0.2, help="workload size multiplier (default: 0.2)")
+    parser.add_argument("--cache", default="", help="cache file (default: the one next to the generated parser)")
+    args = parser.parse_args()
+
+    configurations = [('cold', '0'), ('cached', args.cache)]
+    print(f"{'Workload':<18} {'Mode':<7} {'Load ms':>8} {'First ms':>9} {'Warm ms':>8} {'First/Warm':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.workload:
+            source, _ = generate(name, args.scale)
+            source_path = os.path.join(directory, f"{name}.txt")
+            with open(source_path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            for mode, setting in configurations:
+                samples = [measure(source_path, setting) for _ in range(args.runs)]
+                load = statistics.median(sample['load'] for sample in samples) * 1000
+                first = statistics.median(sample['first'] for sample in samples) * 1000
+                warm = statistics.median(sample['warm'] for sample in samples) * 1000
+                print(f"{name:<18} {mode:<7} {load:>8.2f} {first:>9.2f} {warm:>8.2f} {first / warm:>9.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark paměti generování kódu: ListEmitter vs. StreamEmitter
+# Pro rostoucí velikost programu změří čas a špičku alokované paměti (tracemalloc) fáze
+# generování kódu včetně zápisu do souboru. S ListEmitter špička roste s velikostí výstupu
+# (seznam instrukcí, spojený řetězec), se StreamEmitter by měla zůstat přibližně konstantní.
+#
+# Použití:
+#   python -m benchmarks.bench_emitter [--workload long_expressions] [--scales 1 4 16]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream
+from src.parser.LanguageLexer import LanguageLexer
+from src.parser.LanguageParser import LanguageParser
+from src.ir.lowering import lower
+from src.code_generator.code_generator import CodeGenerator
+from src.code_generator.emitter import StreamEmitter
+from benchmarks.workloads import WORKLOADS, generate
+
+def parse(source):
+    tokens = CommonTokenStream(LanguageLexer(InputStream(source)))
+    return lower(LanguageParser(tokens).program())
+
+def generate_list(tree, path):
+    generator = CodeGenerator()
+    generator.visit(tree)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generator.get_generated_code())
+
+def generate_stream(tree, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        emitter = StreamEmitter(f)
+        CodeGenerator(emitter).visit(tree)
+        emitter.finish()
+
+def measure(function, tree, path):
+    tracemalloc.start()
+    started = time.perf_counter()
+    function(tree, path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of code generation with list vs streaming emitter")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="long_expressions")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print(f"{'Scale':>6} {'Output KB':>10} {'List ms':>9} {'List peak KB':>13} {'Stream ms':>10} {'Stream peak KB':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'generated.txt')
+        for scale in args.scales:
+            source, _ = generate(args.workload, scale)
+            tree = parse(source)
+            list_time, list_peak = measure(generate_list, tree, path)
+            stream_time, stream_peak = measure(generate_stream, tree, path)
+            size = os.path.getsize(path)
+            print(f"{scale:>6g} {size / 1024:>10.1f} {list_time * 1000:>9.1f} {list_peak / 1024:>13.1f} "
+                  f"{stream_time * 1000:>10.1f} {stream_peak / 1024:>15.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
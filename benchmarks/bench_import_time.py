@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark času importů při startu main.py (python -X importtime)
+# Pro podpříkazy compile, run a exec spustí main.py v novém procesu, z výstupu
+# -X importtime sečte kumulativní čas importů nejvyšší úrovně a vypíše nejpomalejší moduly.
+# S --check skončí chybou, pokud "run" naimportuje něco z překladače (antlr4, parser, IR,
+# TypeChecker, CodeGenerator) nebo pokud import některého podpříkazu překročí rozpočet.
+#
+# Použití:
+#   python -m benchmarks.bench_import_time [--repeat 5] [--top 10]
+#   python -m benchmarks.bench_import_time --check [--budget-ms run=60 --budget-ms exec=400]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+# Program pro měření; čte jedno číslo, aby se otestovala i instrukce read
+PROGRAM = """
+int a; read a;
+while (a > 0) { write "a=", a; a = a - 1; }
+"""
+
+# Moduly, které cesta "run" nesmí načíst
+COMPILER_MODULES = ('antlr4', 'src.parser', 'src.ir', 'src.compiler', 'src.type_checker', 'src.code_generator',
+                    'src.register_vm.register_generator')
+
+def parse_importtime(stderr):
+    # Vrací seznam (modul, vlastní čas us, kumulativní čas us, úroveň zanoření)
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|', 2)
+        level = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), int(self_time), int(cumulative), level))
+    return imports
+
+def measure(arguments, stdin):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', MAIN] + arguments, input=stdin,
+                               capture_output=True, text=True, cwd=ROOT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(arguments)} failed:\n{completed.stdout}{completed.stderr}")
+    return parse_importtime(completed.stderr)
+
+def project_total(imports):
+    # Kumulativní čas importů, které vyvolal main.py (bez startu samotného interpretru)
+    # Moduly načtené při startu Pythonu končí importem site, vše další na nejvyšší úrovni patří k main.py
+    top_level = [(name, cumulative) for name, _, cumulative, level in imports if level == 0]
+    start = max((index + 1 for index, (name, _) in enumerate(top_level) if name == 'site'), default=0)
+    return sum(cumulative for _, cumulative in top_level[start:])
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of main.py subcommands (-X importtime)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per subcommand (default: 5)")
+    parser.add_argument("--top", type=int, default=8, help="slowest modules to list (default: 8)")
+    parser.add_argument("--check", action="store_true",
+                        help="fail if 'run' imports the compiler or a subcommand exceeds its budget")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="COMMAND=MS",
+                        help="maximum median import time for a subcommand (only with --check)")
+    args = parser.parse_args()
+
+    budgets = {}
+    for item in args.budget_ms:
+        command, _, value = item.partition('=')
+        budgets[command] = float(value)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'program.txt')
+        bytecode_path = os.path.join(directory, 'program.bytecode')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write(PROGRAM)
+        measure(['compile', source_path, bytecode_path], '') # připraví vygenerovaný kód pro "run"
+
+        commands = [
+            ('compile', ['compile', source_path, os.path.join(directory, 'out.txt')]),
+            ('run', ['run', bytecode_path]),
+            ('exec', ['exec', source_path, os.path.join(directory, 'out.txt')]),
+        ]
+        for command, arguments in commands:
+            totals = []
+            imports = []
+            for _ in range(args.repeat):
+                imports = measure(arguments, '3\n')
+                totals.append(project_total(imports) / 1000.0)
+            median = statistics.median(totals)
+            modules = {name for name, _, _, _ in imports}
+            print(f"{command}: {median:.1f} ms median import time ({len(modules)} modules, "
+                  f"min {min(totals):.1f} ms, max {max(totals):.1f} ms)")
+            for name, self_time, cumulative, level in sorted(imports, key=lambda item: -item[1])[:args.top]:
+                print(f"    {self_time / 1000.0:>7.2f} ms self  {cumulative / 1000.0:>7.2f} ms cumulative  {name}")
+
+            if command == 'run':
+                leaked = sorted(name for name in modules
+                                if any(name == module or name.startswith(module + '.') for module in COMPILER_MODULES))
+                if leaked:
+                    failures.append(f"'run' imports compiler modules: {', '.join(leaked[:5])}")
+            if command in budgets and median > budgets[command]:
+                failures.append(f"'{command}' import time {median:.1f} ms exceeds budget {budgets[command]:.1f} ms")
+
+    if args.check:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            return 1
+        print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
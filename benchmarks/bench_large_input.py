@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark lexikální analýzy velkých zdrojových souborů: FileStream vs. ChunkedFileStream
+# Vygeneruje zdrojové soubory zadané velikosti a v novém procesu je celé projde lexerem
+# (src/parser/chunked_stream.py). Měří čas a přírůstek špičky RSS; FileStream drží celý soubor
+# jako řetězec i seznam kódů znaků, ChunkedFileStream jen okno kolem aktuálního tokenu.
+# Tokeny se ve výchozím nastavení neukládají, aby se měřil jen vstupní proud; s --buffer-tokens
+# se ukládají do CommonTokenStream jako při překladu.
+#
+# Použití:
+#   python -m benchmarks.bench_large_input [--sizes-mb 1 4] [--workload long_expressions] [--buffer-tokens]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.workloads import WORKLOADS, generate
+
+# Kód spuštěný v novém procesu; vypíše čas, přírůstek špičky RSS v KB a počet tokenů jako JSON
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+from antlr4 import CommonTokenStream, FileStream, Token
+from src.parser.LanguageLexer import LanguageLexer
+from src.parser.chunked_stream import ChunkedFileStream, copy_token_text
+stream, source_path, buffer_tokens = sys.argv[2], sys.argv[3], sys.argv[4] == '1'
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+input_stream = FileStream(source_path, encoding='utf-8') if stream == 'file' else ChunkedFileStream(source_path)
+lexer = copy_token_text(LanguageLexer(input_stream))
+if buffer_tokens:
+    token_stream = CommonTokenStream(lexer)
+    token_stream.fill()
+    tokens = len(token_stream.tokens)
+else:
+    tokens = 0
+    while lexer.nextToken().type != Token.EOF:
+        tokens += 1
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'time': elapsed, 'peak_kb': peak - baseline, 'tokens': tokens}))
+"""
+
+STREAMS = ('file', 'chunked')
+
+def measure(stream, source_path, buffer_tokens):
+    completed = subprocess.run([sys.executable, '-c', CHILD, ROOT, stream, source_path, '1' if buffer_tokens else '0'],
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def write_source(path, workload, size_mb):
+    # Opakuje vygenerovaný program, dokud soubor nedosáhne požadované velikosti
+    unit, _ = generate(workload, 1)
+    # Kopie opakují i deklarace, výsledek tak není platný program, lexeru to ale nevadí
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            f.write(unit)
+            written += len(unit.encode('utf-8'))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexing time and peak RSS of large sources with FileStream vs ChunkedFileStream")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4])
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="long_expressions")
+    parser.add_argument("--buffer-tokens", action="store_true", help="keep all tokens in a CommonTokenStream")
+    args = parser.parse_args()
+
+    print(f"{'Source MB':>9} {'Tokens':>9} {'File s':>8} {'File MB':>8} {'Chunked s':>10} {'Chunked MB':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'large.txt')
+        for size_mb in args.sizes_mb:
+            written = write_source(source_path, args.workload, size_mb)
+            results = {stream: measure(stream, source_path, args.buffer_tokens) for stream in STREAMS}
+            file, chunked = results['file'], results['chunked']
+            if file['tokens'] != chunked['tokens']:
+                raise SystemExit(f"token counts differ: {file['tokens']} != {chunked['tokens']}")
+            print(f"{written / 1024 / 1024:>9.1f} {chunked['tokens']:>9} {file['time']:>8.2f} {file['peak_kb'] / 1024:>8.1f} "
+                  f"{chunked['time']:>10.2f} {chunked['peak_kb'] / 1024:>11.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
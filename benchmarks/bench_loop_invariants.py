@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark přesunu invariantních výpočtů před cykly (src/optimizer/loop_invariants.py)
+# Každý program s vnořenými cykly se přeloží třikrát: bez optimalizace, jen s průchody
+# dataflow.py a s nimi a navíc s loop_invariants. Částečné vyhodnocení se vynechá, jinak by
+# programy bez read doběhly už při překladu. Výstupy všech tří verzí se musí shodovat;
+# měří se medián času běhu (bez načtení kódu) a počet vykonaných instrukcí.
+#
+# Použití:
+#   python -m benchmarks.bench_loop_invariants [--scale 1.0] [--repeat 5] [--workload invariant_loops ...]
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.optimizer import optimizer
+from benchmarks.workloads import WORKLOADS, generate
+
+DEFAULT_WORKLOADS = ['invariant_loops', 'nested_loops', 'numeric_loop']
+
+# Varianta -> průchody optimizer.PASSES, které se spustí
+VARIANTS = [
+    ('none', ()),
+    ('dataflow', ('unreachable_code', 'redundant_initializations', 'dead_stores')),
+    ('licm', ('unreachable_code', 'redundant_initializations', 'dead_stores', 'loop_invariants')),
+]
+
+@contextlib.contextmanager
+def selected_passes(names):
+    # Dočasně omezí seznam průchodů optimalizátoru na zadaná jména
+    original = list(optimizer.PASSES)
+    optimizer.PASSES[:] = [entry for entry in original if entry[0] in names]
+    try:
+        yield
+    finally:
+        optimizer.PASSES[:] = original
+
+def compile_variant(source, names):
+    with contextlib.redirect_stdout(io.StringIO()), selected_passes(names):
+        result = compile_source(source, optimize_level=optimizer.MAX_LEVEL if names else 0)
+    if not result.success:
+        raise RuntimeError(f"compilation failed: {result.errors[:1]}")
+    return result
+
+def run_once(code, stdin):
+    output = io.StringIO()
+    interpreter = Interpreter(io.StringIO(stdin), output)
+    interpreter.load_code(code)
+    started = time.perf_counter()
+    interpreter.run()
+    return time.perf_counter() - started, output.getvalue()
+
+def count_steps(code, stdin):
+    # Počet vykonaných instrukcí (run_slice je vrací, run je kvůli rychlosti nepočítá)
+    interpreter = Interpreter(io.StringIO(stdin), io.StringIO())
+    interpreter.load_code(code)
+    steps = 0
+    while not interpreter.is_finished():
+        steps += interpreter.run_slice(100000)
+    return steps
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure loop-invariant code motion on nested-loop programs")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS), default=DEFAULT_WORKLOADS)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per variant (default: 5)")
+    args = parser.parse_args()
+
+    print(f"{'Program':<16} {'Variant':<9} {'Code':>6} {'Steps':>10} {'Run ms':>10} {'Speedup':>8}")
+    for name in args.workload:
+        source, stdin = generate(name, args.scale)
+        baseline_time = expected_output = None
+        for variant, names in VARIANTS:
+            result = compile_variant(source, names)
+            times = []
+            for _ in range(args.repeat):
+                elapsed, output = run_once(result.generated_code, stdin)
+                times.append(elapsed)
+            if expected_output is None:
+                expected_output = output
+            elif output != expected_output:
+                raise SystemExit(f"{name}: output of the {variant} variant differs from the unoptimized program")
+            elapsed = statistics.median(times)
+            baseline_time = baseline_time or elapsed
+            print(f"{name:<16} {variant:<9} {result.instruction_count:>6} {count_steps(result.generated_code, stdin):>10} "
+                  f"{elapsed * 1000:>10.2f} {baseline_time / elapsed:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark rozbalení cyklů s konstantním počtem iterací (src/optimizer/loop_unrolling.py)
+# Každý program se přeloží se všemi průchody -O 2 a pak navíc s loop_unrolling (-O 3);
+# částečné vyhodnocení se stejně jako v bench_loop_invariants vynechá. Výstupy se musí shodovat;
+# měří se velikost kódu, počet vykonaných instrukcí a medián času běhu.
+#
+# Použití:
+#   python -m benchmarks.bench_loop_unrolling [--scale 1.0] [--repeat 5] [--workload counted_loops ...]
+
+import argparse
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.optimizer import optimizer
+from benchmarks.bench_loop_invariants import compile_variant, run_once, count_steps
+from benchmarks.workloads import WORKLOADS, generate
+
+DEFAULT_WORKLOADS = ['counted_loops', 'nested_loops', 'counting_loop']
+
+# Varianta -> průchody optimizer.PASSES, které se spustí
+LEVEL_2_PASSES = tuple(name for name, level, _ in optimizer.PASSES if level == 2)
+VARIANTS = [
+    ('O2', LEVEL_2_PASSES),
+    ('unrolled', LEVEL_2_PASSES + ('loop_unrolling',)),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure loop unrolling on programs with constant-bound loops")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS), default=DEFAULT_WORKLOADS)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per variant (default: 5)")
+    args = parser.parse_args()
+
+    print(f"{'Program':<16} {'Variant':<9} {'Code':>6} {'Steps':>10} {'Run ms':>10} {'Speedup':>8}")
+    for name in args.workload:
+        source, stdin = generate(name, args.scale)
+        baseline_time = expected_output = None
+        for variant, names in VARIANTS:
+            result = compile_variant(source, names)
+            times = []
+            for _ in range(args.repeat):
+                elapsed, output = run_once(result.generated_code, stdin)
+                times.append(elapsed)
+            if expected_output is None:
+                expected_output = output
+            elif output != expected_output:
+                raise SystemExit(f"{name}: output of the {variant} variant differs from the -O 2 program")
+            elapsed = statistics.median(times)
+            baseline_time = baseline_time or elapsed
+            print(f"{name:<16} {variant:<9} {result.instruction_count:>6} {count_steps(result.generated_code, stdin):>10} "
+                  f"{elapsed * 1000:>10.2f} {baseline_time / elapsed:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark paměti překladu: špička RSS na KB zdrojového kódu
+# Každé měření běží v novém procesu. Porovnává průběh, kdy se celý parse tree převede na IR
+# až po parsování a parse tree, tokeny i vstupní proud zůstávají v paměti do konce generování
+# kódu ("retained", původní chování), s compile_path, který příkazy převádí na IR už během
+# parsování a objekty ANTLR hned uvolní ("released"). Program z jednoho velkého příkazu
+# (deep_nesting) se během parsování zmenšit nedá, ušetří se jen po parsování.
+# Od špičky RSS (ru_maxrss) se odečítá RSS procesu po importech a načtení DFA cache.
+#
+# Použití:
+#   python -m benchmarks.bench_memory [--workload long_expressions ...] [--scales 1 2 4] [--runs 3]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.workloads import WORKLOADS, generate
+
+# Kód spuštěný v novém procesu; vypíše přírůstek špičky RSS v KB jako JSON
+CHILD = r"""
+import json, resource, sys
+sys.path.insert(0, sys.argv[1])
+sys.setrecursionlimit(100000)
+from antlr4 import CommonTokenStream, FileStream
+from src.parser.LanguageLexer import LanguageLexer
+from src.parser.LanguageParser import LanguageParser
+from src.parser import dfa_cache
+from src.ir.lowering import lower
+from src.type_checker.type_checker import TypeChecker
+from src.code_generator.code_generator import CodeGenerator
+from src.code_generator.emitter import StreamEmitter
+from src.compiler.compiler import compile_path
+mode, source_path, output_path = sys.argv[2:5]
+dfa_cache.ensure_loaded()
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if mode == 'retained':
+    input_stream = FileStream(source_path, encoding='utf-8')
+    token_stream = CommonTokenStream(LanguageLexer(input_stream))
+    parse_tree = LanguageParser(token_stream).program()
+    program = lower(parse_tree)
+    checker = TypeChecker()
+    checker.visit(program)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        emitter = StreamEmitter(f)
+        CodeGenerator(emitter).visit(program)
+        emitter.finish()
+    success = not checker.has_errors()
+else:
+    success = compile_path(source_path, output_path=output_path).success
+if not success:
+    raise SystemExit("compilation failed")
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'peak_kb': peak - baseline}))
+"""
+
+MODES = ('retained', 'released')
+
+def measure(mode, source_path, output_path):
+    completed = subprocess.run([sys.executable, '-c', CHILD, ROOT, mode, source_path, output_path],
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])['peak_kb']
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS per KB of source with and without releasing ANTLR objects")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS),
+                        default=["long_expressions", "deep_nesting", "many_variables"])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per measurement (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'Workload':<18} {'Scale':>6} {'Source KB':>10} {'Retained MB':>12} {'KB/KB':>7} "
+          f"{'Released MB':>12} {'KB/KB':>7} {'Saved':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'source.txt')
+        output_path = os.path.join(directory, 'generated.txt')
+        for name in args.workload:
+            for scale in args.scales:
+                source, _ = generate(name, scale)
+                with open(source_path, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                source_kb = os.path.getsize(source_path) / 1024
+                peaks = {mode: statistics.median(measure(mode, source_path, output_path) for _ in range(args.runs))
+                         for mode in MODES}
+                retained, released = peaks['retained'], peaks['released']
+                saved = 1 - released / retained if retained else 0.0
+                print(f"{name:<18} {scale:>6g} {source_kb:>10.1f} {retained / 1024:>12.1f} {retained / source_kb:>7.1f} "
+                      f"{released / 1024:>12.1f} {released / source_kb:>7.1f} {saved * 100:>6.1f}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
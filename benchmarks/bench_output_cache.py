@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark cache výstupu deterministických programů (src/interpreter/output_cache.py)
+# Pro programy bez read porovnává běh interpretu (načtení kódu a run) se zásahem do paměťové
+# úrovně cache a do diskové úrovně (nová instance OutputCache nad stejným adresářem, jako při
+# dalším spuštění main.py). Čas zásahu zahrnuje výpočet otisku kódu.
+#
+# Použití:
+#   python -m benchmarks.bench_output_cache [--scale 1.0] [--repeat 5] [--workload counting_loop ...]
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.output_cache import OutputCache, bytecode_key
+from benchmarks.workloads import WORKLOADS, generate
+
+DEFAULT_WORKLOADS = ['counting_loop', 'nested_loops', 'numeric_loop', 'many_variables']
+
+def run_uncached(code):
+    output = io.StringIO()
+    started = time.perf_counter()
+    interpreter = Interpreter(io.StringIO(""), output)
+    interpreter.load_code(code)
+    if not interpreter.output_is_deterministic():
+        raise SystemExit("workload reads input, its output cannot be cached")
+    interpreter.run()
+    return time.perf_counter() - started, output.getvalue()
+
+def cached_lookup(cache, code):
+    started = time.perf_counter()
+    output = cache.get(bytecode_key(code))
+    return time.perf_counter() - started, output
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the output cache of programs without read")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS), default=DEFAULT_WORKLOADS)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per workload (default: 5)")
+    args = parser.parse_args()
+
+    print(f"{'Program':<16} {'Run ms':>10} {'Memory ms':>10} {'Disk ms':>10} {'Output B':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.workload:
+            with contextlib.redirect_stdout(io.StringIO()):
+                code = compile_source(generate(name, args.scale)[0]).generated_code
+            run_times, memory_times, disk_times = [], [], []
+            for _ in range(args.repeat):
+                elapsed, output = run_uncached(code)
+                run_times.append(elapsed)
+            OutputCache(directory).put(bytecode_key(code), output, statistics.median(run_times))
+            warm_cache = OutputCache(directory)
+            warm_cache.get(bytecode_key(code))
+            for _ in range(args.repeat):
+                elapsed, cached = cached_lookup(warm_cache, code)
+                memory_times.append(elapsed)
+                elapsed, from_disk = cached_lookup(OutputCache(directory), code)
+                disk_times.append(elapsed)
+                if cached != output or from_disk != output:
+                    raise SystemExit(f"{name}: cached output differs from the program output")
+            print(f"{name:<16} {statistics.median(run_times) * 1000:>10.3f} {statistics.median(memory_times) * 1000:>10.3f} "
+                  f"{statistics.median(disk_times) * 1000:>10.3f} {len(output):>9}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
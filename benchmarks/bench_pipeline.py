@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark celé pipeline překladače na syntetických programech
+# Pro každý workload se samostatně měří jednotlivé fáze (lexer, parser, převod na IR, TypeChecker,
+# CodeGenerator, načtení instrukcí a běh interpretru). Výsledkem je medián a rozptyl
+# časů přes několik opakování a špička alokované paměti (tracemalloc) pro každou fázi.
+#
+# Použití:
+#   python -m benchmarks.bench_pipeline [--scale 1.0] [--repeat 5] [--workload NAME ...]
+#   python -m benchmarks.bench_pipeline --save-baseline baseline.json
+#   python -m benchmarks.bench_pipeline --compare baseline.json [--threshold 0.25]
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream
+from src.parser.LanguageLexer import LanguageLexer
+from src.parser.LanguageParser import LanguageParser
+from src.ir.lowering import lower
+from src.type_checker.type_checker import TypeChecker
+from src.code_generator.code_generator import CodeGenerator
+from src.interpreter.interpreter import Interpreter
+from benchmarks.workloads import WORKLOADS, generate
+
+STAGES = ['lex', 'parse', 'lower', 'type_check', 'codegen', 'load', 'run']
+
+def run_pipeline(source, stdin, measure):
+    # Provede celou pipeline, každou fázi obalí funkcí measure(jméno, funkce)
+    state = {}
+
+    def lex():
+        lexer = LanguageLexer(InputStream(source))
+        state['tokens'] = CommonTokenStream(lexer)
+        state['tokens'].fill()
+
+    def parse():
+        parser = LanguageParser(state['tokens'])
+        state['tree'] = parser.program()
+        if parser.getNumberOfSyntaxErrors() > 0:
+            raise RuntimeError("syntax errors in generated workload")
+
+    def lower_tree():
+        state['program'] = lower(state.pop('tree'))
+
+    def type_check():
+        checker = TypeChecker()
+        checker.visit(state['program'])
+        if checker.has_errors():
+            raise RuntimeError(f"type errors in generated workload: {checker.errors[0]}")
+
+    def codegen():
+        generator = CodeGenerator()
+        generator.visit(state['program'])
+        state['code'] = generator.get_generated_code()
+
+    def load():
+        state['output'] = io.StringIO()
+        state['interpreter'] = Interpreter(io.StringIO(stdin), state['output'])
+        state['interpreter'].load_code(state['code'])
+
+    def run():
+        state['interpreter'].run()
+
+    for name, function in (('lex', lex), ('parse', parse), ('lower', lower_tree), ('type_check', type_check),
+                           ('codegen', codegen), ('load', load), ('run', run)):
+        measure(name, function)
+    return state
+
+def time_workload(source, stdin, repeat, warmup=1):
+    # Změří časy fází pro daný počet opakování, vrátí jméno fáze -> seznam časů
+    # Zahřívací běhy (naplnění DFA cache ANTLR) se do výsledků nepočítají
+    times = {stage: [] for stage in STAGES}
+
+    def measure(name, function):
+        started = time.perf_counter()
+        function()
+        times[name].append(time.perf_counter() - started)
+
+    for _ in range(warmup):
+        run_pipeline(source, stdin, lambda name, function: function())
+    for _ in range(repeat):
+        run_pipeline(source, stdin, measure)
+    return times
+
+def memory_workload(source, stdin):
+    # Změří špičku alokované paměti pro každou fázi (samostatný běh, tracemalloc zpomaluje)
+    peaks = {}
+
+    def measure(name, function):
+        tracemalloc.start()
+        try:
+            function()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    run_pipeline(source, stdin, measure)
+    return peaks
+
+def summarize(samples):
+    # Medián, směrodatná odchylka, minimum a maximum ze seznamu časů
+    return {
+        'median': statistics.median(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+def run_benchmarks(names, scale, repeat, memory=True, warmup=1):
+    # Spustí vybrané workloady a vrátí výsledky jako slovník
+    results = {}
+    for name in names:
+        source, stdin = generate(name, scale)
+        times = time_workload(source, stdin, repeat, warmup)
+        peaks = memory_workload(source, stdin) if memory else {}
+        results[name] = {
+            'source_bytes': len(source.encode('utf-8')),
+            'stages': {stage: dict(summarize(times[stage]), peak_memory=peaks.get(stage)) for stage in STAGES},
+        }
+    return results
+
+def print_results(results, file=None):
+    file = file if file is not None else sys.stdout
+    for name, result in results.items():
+        print(f"{name} ({result['source_bytes']} bytes of source)", file=file)
+        for stage, summary in result['stages'].items():
+            peak = summary['peak_memory']
+            peak_text = f"{peak / 1024:10.1f} KiB" if peak is not None else ""
+            print(f"  {stage:<11} median {summary['median'] * 1000:10.3f} ms  "
+                  f"± {summary['stdev'] * 1000:8.3f} ms  "
+                  f"[{summary['min'] * 1000:.3f} .. {summary['max'] * 1000:.3f}]  {peak_text}", file=file)
+
+def compare(results, baseline, threshold, min_delta=0.0005):
+    # Porovná mediány s uloženou baseline, vrátí seznam regresí (workload, fáze, poměr)
+    # Zpomalení menší než min_delta sekund se ignoruje (šum u velmi krátkých fází)
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for stage, summary in result['stages'].items():
+            base = baseline[name]['stages'].get(stage)
+            if not base or base['median'] <= 0:
+                continue
+            ratio = summary['median'] / base['median']
+            if ratio > 1.0 + threshold and summary['median'] - base['median'] > min_delta:
+                regressions.append((name, stage, ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the compiler pipeline on synthetic workloads")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS),
+                        help="workload to run (can be repeated, default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed repetitions per workload")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed warm-up runs per workload (default: 1)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--save-baseline", metavar="FILE", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare medians against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown of a stage median before failing (default: 0.25)")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds (default: 0.5)")
+    args = parser.parse_args()
+
+    names = args.workload or list(WORKLOADS)
+    results = run_benchmarks(names, args.scale, args.repeat, memory=not args.no_memory, warmup=args.warmup)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta / 1000.0)
+        if regressions:
+            for name, stage, ratio in regressions:
+                print(f"REGRESSION: {name}/{stage} is {ratio:.2f}x the baseline median", file=sys.stderr)
+            return 1
+        print(f"No stage regressed by more than {args.threshold * 100:.0f} %")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark registrového stroje (src/register_vm) proti zásobníkovému Interpreter
+# Každý program se přeloží oběma backendy a spustí se stejným vstupem; výstupy se musí shodovat.
+# Měří se medián času běhu (bez načtení kódu) a počet instrukcí vygenerovaného kódu.
+# Programy jsou ukázky ze sample_inputs a syntetické cykly z benchmarks/workloads.py.
+#
+# Použití:
+#   python -m benchmarks.bench_register_vm [--scale 1.0] [--repeat 5] [--workload counting_loop ...] [--no-samples]
+
+import argparse
+import contextlib
+import glob
+import io
+import math
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.register_vm.register_machine import RegisterMachine
+from benchmarks.workloads import WORKLOADS, generate
+
+LOOP_WORKLOADS = ['counting_loop', 'nested_loops', 'numeric_loop', 'string_concat', 'io_heavy']
+
+# Vstup pro ukázky, které čtou (sample1: int, float, string, bool; sample3: int)
+SAMPLE_STDIN = {'sample1': "3\n2.5\nhello\ntrue\n", 'sample3': "5\n"}
+
+def sample_programs():
+    programs = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'sample_inputs', '*', 'sample*.txt'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name == 'sample_err':
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            programs.append((name, f.read(), SAMPLE_STDIN.get(name, "")))
+    return programs
+
+def compile_both(source):
+    # Varování generátoru kódu (print do stdout) se do výpisu benchmarku nepropisují
+    codes = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for backend in ('stack', 'register'):
+            result = compile_source(source, backend=backend)
+            if not result.success:
+                raise RuntimeError(f"{backend} compilation failed: {result.errors[:1]}")
+            codes[backend] = result.generated_code
+    return codes
+
+def run_once(machine_class, code, stdin):
+    output = io.StringIO()
+    machine = machine_class(io.StringIO(stdin), output)
+    machine.load_code(code)
+    started = time.perf_counter()
+    machine.run()
+    return time.perf_counter() - started, output.getvalue(), machine
+
+def measure(name, source, stdin, repeat):
+    codes = compile_both(source)
+    stack_times, register_times = [], []
+    for _ in range(repeat):
+        elapsed, stack_output, interpreter = run_once(Interpreter, codes['stack'], stdin)
+        stack_times.append(elapsed)
+        elapsed, register_output, machine = run_once(RegisterMachine, codes['register'], stdin)
+        register_times.append(elapsed)
+        if stack_output != register_output:
+            raise SystemExit(f"{name}: register VM output differs from the stack VM")
+    return {
+        'stack_instructions': len(interpreter.instructions),
+        'register_instructions': len(machine.instructions),
+        'stack_time': statistics.median(stack_times),
+        'register_time': statistics.median(register_times),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the register VM with the stack interpreter")
+    parser.add_argument("--workload", nargs="+", choices=sorted(WORKLOADS), default=LOOP_WORKLOADS, help="synthetic workloads to run")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per program and VM (default: 5)")
+    parser.add_argument("--no-samples", action="store_true", help="skip the sample_inputs programs")
+    args = parser.parse_args()
+
+    programs = [] if args.no_samples else sample_programs()
+    programs += [(name, *generate(name, args.scale)) for name in args.workload]
+
+    print(f"{'Program':<16} {'Stack ins':>9} {'Reg ins':>8} {'Stack ms':>10} {'Reg ms':>10} {'Speedup':>8}")
+    speedups = []
+    for name, source, stdin in programs:
+        result = measure(name, source, stdin, args.repeat)
+        speedup = result['stack_time'] / result['register_time'] if result['register_time'] else float('inf')
+        speedups.append(speedup)
+        print(f"{name:<16} {result['stack_instructions']:>9} {result['register_instructions']:>8} "
+              f"{result['stack_time'] * 1000:>10.3f} {result['register_time'] * 1000:>10.3f} {speedup:>7.2f}x")
+    if speedups:
+        geometric_mean = math.exp(sum(math.log(speedup) for speedup in speedups) / len(speedups))
+        print(f"Geometric mean speedup: {geometric_mean:.2f}x (outputs identical)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
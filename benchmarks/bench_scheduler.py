@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark kooperativního plánovače (src/scheduler/scheduler.py) s mnoha programy v jednom procesu
+# Spustí --programs programů (střídavě workloady z benchmarks/workloads.py), programy čtoucí
+# vstup ho dostávají postupně: po každém kole kvant dostane každý čekající program jeden řádek
+# (nakonec se vstup uzavře). Výstupy se musí shodovat se samostatným během každého programu.
+# Vypisuje propustnost proti samostatnému během, férovost, prodlevy kvant a paměť na program
+# (tracemalloc, přírůstek alokací po submit všech programů).
+#
+# Použití:
+#   python -m benchmarks.bench_scheduler [--programs 1000] [--quantum 1000] [--scale 0.02]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.scheduler.scheduler import Scheduler, DEFAULT_QUANTUM
+from benchmarks.workloads import generate
+
+WORKLOAD_MIX = ['counting_loop', 'nested_loops', 'numeric_loop', 'io_heavy', 'many_variables', 'counted_loops']
+
+def compile_stack_code(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = compile_source(source)
+    if not result.success:
+        raise RuntimeError(f"compilation failed: {result.errors[:1]}")
+    return result.generated_code
+
+def standalone_outputs(programs):
+    # Výstup a čas samostatného běhu každého různého programu
+    outputs = {}
+    started = time.perf_counter()
+    for name, code, stdin in programs:
+        output = io.StringIO()
+        interpreter = Interpreter(io.StringIO(stdin), output)
+        interpreter.load_code(code)
+        interpreter.run()
+        outputs[name] = output.getvalue()
+    return outputs, time.perf_counter() - started
+
+def run_scheduled(programs, count, quantum):
+    # Spustí count programů v plánovači; vrací (plánovač, [(jméno, Program)], paměť na program)
+    scheduler = Scheduler(quantum=quantum)
+    submitted = []
+    pending_input = {} # id programu -> řádky vstupu, které ještě nedostal
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        name, code, stdin = programs[index % len(programs)]
+        program = scheduler.submit(code, close_input=not stdin)
+        if stdin:
+            pending_input[program.id] = stdin.splitlines(keepends=True)
+        submitted.append((name, program))
+    per_program = (tracemalloc.get_traced_memory()[0] - baseline) / count
+    tracemalloc.stop()
+
+    while scheduler.ready or pending_input:
+        scheduler.run(max_slices=len(scheduler.ready))
+        for program in scheduler.waiting():
+            lines = pending_input.get(program.id)
+            if lines:
+                scheduler.feed(program.id, lines.pop(0), close=not lines)
+            if not lines:
+                pending_input.pop(program.id, None)
+        if not scheduler.ready and not scheduler.waiting():
+            break
+    return scheduler, submitted, per_program
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many programs round-robin in one process")
+    parser.add_argument("--programs", type=int, default=1000, help="number of programs to run (default: 1000)")
+    parser.add_argument("--quantum", type=int, default=DEFAULT_QUANTUM, help="instructions per slice")
+    parser.add_argument("--scale", type=float, default=0.02, help="multiplier of the default workload sizes")
+    args = parser.parse_args()
+
+    programs = []
+    for name in WORKLOAD_MIX:
+        source, stdin = generate(name, args.scale)
+        programs.append((name, compile_stack_code(source), stdin))
+    expected, standalone_time = standalone_outputs(programs)
+
+    started = time.perf_counter()
+    scheduler, submitted, per_program = run_scheduled(programs, args.programs, args.quantum)
+    elapsed = time.perf_counter() - started
+
+    for name, program in submitted:
+        if program.status != 'finished' or program.output.getvalue() != expected[name]:
+            raise SystemExit(f"{name} (program {program.id}): {program.status}, output differs from a standalone run")
+
+    # Samostatný běh (načtení kódu a run) každého programu jednou, odhad pro stejný počet programů;
+    # plánovač načte kód každého různého programu jen jednou
+    sequential = standalone_time / len(programs) * args.programs
+    print(f"programs:                {args.programs} ({len(programs)} distinct, quantum {args.quantum})")
+    print(f"standalone load+run:     {sequential * 1000:.0f} ms")
+    print(f"scheduled:               {elapsed * 1000:.0f} ms ({sequential / elapsed:.2f}x of standalone throughput)")
+    print(f"memory per program:      {per_program:.0f} B after submit")
+    scheduler.print_metrics()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark hromadění řetězců v cyklu (s = s . x) s Rope (src/interpreter/rope.py) a bez něj
+# Varianta str spojuje vždy obyčejné řetězce (ROPE_MIN_LENGTH se dočasně nastaví na nekonečno),
+# jako Interpreter před zavedením Rope; její čas roste s kvadrátem počtu iterací, proto se nad
+# --max-str-iterations vynechá. Pokud běží obě varianty, jejich výstupy se musí shodovat.
+#
+# Použití:
+#   python -m benchmarks.bench_string_concat [--iterations 100000 1000000] [--repeat 1] [--max-str-iterations 200000]
+
+import argparse
+import contextlib
+import hashlib
+import io
+import math
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.interpreter import rope
+
+# Program -> zdrojový kód pro daný počet iterací
+PROGRAMS = {
+    'append': lambda n: f"""int i;
+string s;
+for (i = 0; i < {n}; i = i + 1) {{
+    s = s . "ab";
+}}
+write s;
+""",
+    'report': lambda n: f"""int i;
+string s, row;
+row = "item;";
+for (i = 0; i < {n}; i = i + 1) {{
+    s = s . (i % 3 == 0 ? "fizz;" : row) . "\\t";
+    if (s == "never") {{ write "unreachable"; }}
+}}
+write s;
+""",
+    # Připojování zepředu Rope nezrychlí, jen se nesmí zpomalit
+    'prepend': lambda n: f"""int i;
+string s;
+for (i = 0; i < {n // 10}; i = i + 1) {{
+    s = "ab" . s;
+}}
+write s;
+""",
+}
+
+@contextlib.contextmanager
+def plain_strings():
+    original = rope.ROPE_MIN_LENGTH
+    rope.ROPE_MIN_LENGTH = math.inf
+    try:
+        yield
+    finally:
+        rope.ROPE_MIN_LENGTH = original
+
+def compile_stack_code(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = compile_source(source)
+    if not result.success:
+        raise RuntimeError(f"compilation failed: {result.errors[:1]}")
+    return result.generated_code
+
+def run_time(code, repeat):
+    times = []
+    digest = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        interpreter = Interpreter(io.StringIO(""), output)
+        interpreter.load_code(code)
+        started = time.perf_counter()
+        interpreter.run()
+        times.append(time.perf_counter() - started)
+        digest = hashlib.sha256(output.getvalue().encode()).hexdigest()
+    return statistics.median(times), digest
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure string accumulation loops with and without ropes")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--program", nargs="+", choices=sorted(PROGRAMS), default=sorted(PROGRAMS))
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per variant (default: 1)")
+    parser.add_argument("--max-str-iterations", type=int, default=200000,
+                        help="skip the quadratic plain-string variant above this many iterations")
+    args = parser.parse_args()
+
+    print(f"{'Program':<10} {'Iterations':>10} {'str ms':>10} {'rope ms':>10} {'Speedup':>8}")
+    for iterations in args.iterations:
+        for name in args.program:
+            code = compile_stack_code(PROGRAMS[name](iterations))
+            rope_time, rope_digest = run_time(code, args.repeat)
+            if iterations > args.max_str_iterations:
+                print(f"{name:<10} {iterations:>10} {'-':>10} {rope_time * 1000:>10.1f} {'-':>8}")
+                continue
+            with plain_strings():
+                str_time, str_digest = run_time(code, args.repeat)
+            if str_digest != rope_digest:
+                raise SystemExit(f"{name}: output with ropes differs from plain strings")
+            print(f"{name:<10} {iterations:>10} {str_time * 1000:>10.1f} {rope_time * 1000:>10.1f} "
+                  f"{str_time / rope_time:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
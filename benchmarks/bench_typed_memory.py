@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Benchmark typované paměti proměnných (Interpreter(typed_storage=True), src/interpreter/typed_memory.py)
+# proti výchozímu slovníku jméno -> objekt.
+#   Paměť: K instancí Interpreter sdílí načtené instrukce (a rozložení proměnných), každá program
+#          doběhne a zůstane v paměti; tracemalloc měří přírůstek alokací na jednu instanci.
+#   Propustnost: medián času run() pro cykly nad int a float proměnnými, výstupy obou pamětí
+#          se musí shodovat.
+#
+# Použití:
+#   python -m benchmarks.bench_typed_memory [--scale 1.0] [--repeat 5] [--instances 100]
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from benchmarks.workloads import generate
+
+MEMORY_WORKLOADS = ['many_variables', 'numeric_loop']
+LOOP_WORKLOADS = ['counting_loop', 'nested_loops', 'numeric_loop']
+
+def compile_stack_code(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = compile_source(source)
+    if not result.success:
+        raise RuntimeError(f"compilation failed: {result.errors[:1]}")
+    return result.generated_code
+
+def new_instance(template, typed, output):
+    # Instance se sdílenými instrukcemi, jako u předem načtených programů serveru
+    interpreter = Interpreter(io.StringIO(""), output)
+    interpreter.instructions = template.instructions
+    interpreter.labels = template.labels
+    interpreter.line_table = template.line_table
+    if typed:
+        interpreter.use_memory_layout(template.memory_layout)
+    return interpreter
+
+def memory_per_instance(code, typed, instances):
+    template = Interpreter(typed_storage=True)
+    template.load_code(code)
+    with open(os.devnull, 'w') as output:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        retained = []
+        for _ in range(instances):
+            interpreter = new_instance(template, typed, output)
+            interpreter.run()
+            retained.append(interpreter)
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+    promotions = retained[-1].memory.promotions if typed else 0
+    return allocated / instances, promotions
+
+def run_time(code, typed, repeat):
+    times = []
+    output_text = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        interpreter = Interpreter(io.StringIO(""), output, typed_storage=typed)
+        interpreter.load_code(code)
+        started = time.perf_counter()
+        interpreter.run()
+        times.append(time.perf_counter() - started)
+        output_text = output.getvalue()
+    return statistics.median(times), output_text
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare typed variable storage with the dict memory")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default workload sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per workload and memory (default: 5)")
+    parser.add_argument("--instances", type=int, default=100, help="interpreter instances for the memory measurement")
+    args = parser.parse_args()
+
+    print(f"Memory per program instance ({args.instances} instances after run)")
+    print(f"{'Program':<16} {'Dict B':>10} {'Typed B':>10} {'Saved':>7} {'Promotions':>11}")
+    for name in MEMORY_WORKLOADS:
+        # Pro měření paměti stačí kratší cyklus
+        code = compile_stack_code(generate(name, args.scale * 0.1)[0])
+        dict_bytes, _ = memory_per_instance(code, False, args.instances)
+        typed_bytes, promotions = memory_per_instance(code, True, args.instances)
+        saved = 1 - typed_bytes / dict_bytes if dict_bytes else 0.0
+        print(f"{name:<16} {dict_bytes:>10.0f} {typed_bytes:>10.0f} {saved:>6.0%} {promotions:>11}")
+
+    print()
+    print("Loop throughput")
+    print(f"{'Program':<16} {'Dict ms':>10} {'Typed ms':>10} {'Ratio':>7}")
+    for name in LOOP_WORKLOADS:
+        code = compile_stack_code(generate(name, args.scale)[0])
+        dict_time, dict_output = run_time(code, False, args.repeat)
+        typed_time, typed_output = run_time(code, True, args.repeat)
+        if dict_output != typed_output:
+            raise SystemExit(f"{name}: typed storage output differs from the dict memory")
+        print(f"{name:<16} {dict_time * 1000:>10.2f} {typed_time * 1000:>10.2f} {typed_time / dict_time:>6.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
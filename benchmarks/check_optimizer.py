@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Kontrola, že optimalizace nemění chování programů
+# Každý program z REGRESSION_PROGRAMS (programy, na kterých se dřív optimalizátor mýlil)
+# a z benchmarks/workloads.py se přeloží bez optimalizace a s každou úrovní -O a spustí se se
+# stejným vstupem. Výstup, stav ukončení i hlášení běhové chyby (bez čísla instrukce) se musí
+# shodovat; jinak se vypíše rozdíl a skript skončí se stavem 1.
+#
+# Použití:
+#   python -m benchmarks.check_optimizer [--levels 1 2 3] [--scale 0.05] [--no-workloads]
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.compiler.compiler import compile_source
+from src.interpreter.interpreter import Interpreter
+from src.optimizer import optimizer
+from benchmarks.workloads import WORKLOADS, generate
+
+# Jméno -> (zdrojový kód, vstup)
+REGRESSION_PROGRAMS = {
+    # select se stejnými větvemi, jehož podmínka obsahuje přiřazení (operandy nenavazují)
+    'select_assign_condition': ('int x; read x; write "B", ((x > (x = 5)) ? 1 : 1), x;', "9\n"),
+    'select_assign_in_loop': ("""bool p;
+float g, h;
+string s, t;
+int i;
+read p;
+for (i = 0; i < 3; i = i + 1) {
+    write (p ? g : (h = 0.76)), ((t == (s = s)) ? "" : ""), "ab";
+}
+write h;
+""", "false\n"),
+    # Hodnoty přes MAX_CONSTANT_SIZE se do předehry částečného vyhodnocení nezapisují
+    'huge_int_before_read': ("""int x;
+int y;
+int i;
+x = 3;
+for (i = 0; i < 14; i = i + 1) {
+    x = x * x;
+}
+read y;
+write x % 1000 + y;
+""", "5\n"),
+    'huge_string_before_read': ("""string s;
+int i, y;
+s = "ab";
+for (i = 0; i < 22; i = i + 1) {
+    s = s . s;
+}
+read y;
+write y, " ", s == "ab";
+""", "5\n"),
+}
+
+def compile_level(source, level):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = compile_source(source, optimize_level=level)
+    return result
+
+def run(code, stdin):
+    output = io.StringIO()
+    errors = io.StringIO()
+    interpreter = Interpreter(io.StringIO(stdin), output)
+    interpreter.load_code(code)
+    try:
+        with contextlib.redirect_stderr(errors):
+            interpreter.run()
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code
+    return output.getvalue(), exit_code, re.sub(r'instruction \d+', 'instruction N', errors.getvalue())
+
+def check_program(name, source, stdin, levels):
+    # Seznam rozdílů proti běhu bez optimalizace
+    baseline = compile_level(source, 0)
+    if not baseline.success:
+        return [f"{name}: does not compile: {baseline.errors[:1]}"]
+    expected = run(baseline.generated_code, stdin)
+    problems = []
+    for level in levels:
+        result = compile_level(source, level)
+        if not result.success:
+            problems.append(f"{name}: -O {level} fails to compile: {result.errors[:1]}")
+            continue
+        actual = run(result.generated_code, stdin)
+        if actual != expected:
+            problems.append(f"{name}: -O {level} gives {actual!r}, expected {expected!r}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that optimized programs behave like unoptimized ones")
+    parser.add_argument("--levels", type=int, nargs="+", choices=range(1, optimizer.MAX_LEVEL + 1),
+                        default=list(range(1, optimizer.MAX_LEVEL + 1)))
+    parser.add_argument("--scale", type=float, default=0.05, help="multiplier of the default workload sizes")
+    parser.add_argument("--no-workloads", action="store_true", help="check only the regression programs")
+    args = parser.parse_args()
+
+    programs = list((name, source, stdin) for name, (source, stdin) in REGRESSION_PROGRAMS.items())
+    if not args.no_workloads:
+        programs.extend((name,) + generate(name, args.scale) for name in WORKLOADS)
+    problems = []
+    for name, source, stdin in programs:
+        problems.extend(check_program(name, source, stdin, args.levels))
+    for problem in problems:
+        print(problem)
+    print(f"{len(programs)} programs, {len(problems)} differences")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Generátory syntetických programů pro benchmarky
+# Každý generátor dostane parametr velikosti a vrátí dvojici (zdrojový kód, vstup pro read).
+
+def counting_loop(n):
+    # Jednoduchý počítací cyklus s n iteracemi
+    source = f"""int i, sum;
+sum = 0;
+for (i = 0; i < {n}; i = i + 1) {{
+    sum = sum + i;
+}}
+write "sum: ", sum;
+"""
+    return source, ""
+
+def nested_loops(n):
+    # Dva vnořené while cykly, celkem zhruba n iterací vnitřního cyklu
+    side = max(1, int(n ** 0.5))
+    source = f"""int i, j, count;
+count = 0;
+i = 0;
+while (i < {side}) {{
+    j = 0;
+    while (j < {side}) {{
+        count = count + i * j % 3;
+        j = j + 1;
+    }}
+    i = i + 1;
+}}
+write "count: ", count;
+"""
+    return source, ""
+
+def numeric_loop(n):
+    # while cyklus se smíšenou int a float aritmetikou a porovnáním
+    source = f"""int i, acc;
+float x, y;
+i = 0;
+acc = 0;
+x = 0.0;
+y = 1.0;
+while (i < {n}) {{
+    x = x + y * 0.5;
+    y = y - x / 1000.0;
+    acc = acc + i % 7 * 3 - 1;
+    if (x > 100.0) x = x - 100.0;
+    i = i + 1;
+}}
+write "x: ", x, " y: ", y, " acc: ", acc;
+"""
+    return source, ""
+
+def string_concat(n):
+    # Postupné skládání řetězce v cyklu (s = s . x)
+    source = f"""int i;
+string s;
+s = "";
+for (i = 0; i < {n}; i = i + 1) {{
+    s = s . "ab";
+}}
+write "done";
+"""
+    return source, ""
+
+def long_expressions(n, terms=40):
+    # n příkazů, každý s dlouhým aritmetickým výrazem o daném počtu členů
+    lines = ["int x;", "float y;"]
+    for statement in range(n):
+        operators = ['+', '-', '*']
+        expression = " ".join(f"{(statement + term) % 97 + 1} {operators[term % 3]}" for term in range(terms)) + " 1"
+        lines.append(f"x = {expression};")
+        lines.append(f"y = x * 1.5 + {statement} / 2;")
+    lines.append('write "x: ", x, " y: ", y;')
+    return "\n".join(lines) + "\n", ""
+
+def deep_nesting(depth):
+    # Hluboce vnořené if/while bloky (zátěž pro parser a rekurzivní visitory)
+    lines = ["int i, total;", "total = 0;", "i = 0;"]
+    for level in range(depth):
+        indent = "    " * level
+        if level % 2 == 0:
+            lines.append(f"{indent}if (i < {depth + level}) {{")
+        else:
+            lines.append(f"{indent}while (i < {level}) {{ i = i + 1; total = total + 1; }}")
+            lines.append(f"{indent}{{")
+    lines.append("    " * depth + "total = total + i;")
+    for level in reversed(range(depth)):
+        lines.append("    " * level + "}")
+    lines.append('write "total: ", total;')
+    return "\n".join(lines) + "\n", ""
+
+def many_variables(n):
+    # n deklarovaných proměnných, každá přiřazena a použita ve výrazu
+    lines = []
+    names = [f"v{index}" for index in range(n)]
+    types = ['int', 'float', 'bool', 'string']
+    for index, name in enumerate(names):
+        lines.append(f"{types[index % 4]} {name};")
+    for index, name in enumerate(names):
+        kind = types[index % 4]
+        if kind == 'int':
+            lines.append(f"{name} = {index} * 2 + 1;")
+        elif kind == 'float':
+            lines.append(f"{name} = {index}.5;")
+        elif kind == 'bool':
+            lines.append(f"{name} = {index} < {n // 2};")
+        else:
+            lines.append(f'{name} = "s{index}";')
+    int_names = [name for index, name in enumerate(names) if index % 4 == 0]
+    lines.append(f"write {' + '.join(int_names) if int_names else '0'};")
+    return "\n".join(lines) + "\n", ""
+
+def io_heavy(n):
+    # Program, který n-krát čte a vypisuje hodnoty (read/write)
+    source = f"""int i, value, total;
+string name;
+total = 0;
+for (i = 0; i < {n}; i = i + 1) {{
+    read value, name;
+    total = total + value;
+    write name, ": ", value, " (", total, ")";
+}}
+"""
+    stdin = "".join(f"{index * 7 % 1000}\nitem{index}\n" for index in range(n))
+    return source, stdin
+
+def invariant_loops(n):
+    # Vnořené cykly s výrazy, které se uvnitř cyklu nemění (podmínka i tělo); meze se čtou
+    # ze vstupu, aby se program nedal vyhodnotit už při překladu
+    side = max(1, int(n ** 0.5))
+    source = f"""int n, i, j, scale, offset, total;
+float ratio, weighted;
+read n, scale, offset;
+total = 0;
+weighted = 0.0;
+ratio = 1.0 / n;
+for (i = 0; i < n; i = i + 1) {{
+    j = 0;
+    while (j < n * 2 / 2 + offset - offset) {{
+        total = total + i * scale + offset * 3 - (scale + offset) % 7;
+        weighted = weighted + ratio * (scale * 2.0 + 1.5);
+        j = j + 1;
+    }}
+}}
+write "total: ", total, " weighted: ", weighted;
+"""
+    return source, f"{side}\n3\n4\n"
+
+def counted_loops(n):
+    # Cykly for s konstantními mezemi uvnitř cyklu, jehož počet iterací se čte ze vstupu
+    source = """int n, i, j, k, total, checksum;
+read n;
+for (i = 0; i < n; i = i + 1) {
+    for (j = 0; j < 8; j = j + 1) {
+        total = total + i * j;
+    }
+    for (k = 0; k < 50; k = k + 1) {
+        checksum = (checksum * 31 + k + i) % 1000003;
+    }
+}
+write "total: ", total, " checksum: ", checksum;
+"""
+    return source, f"{n}\n"
+
+# Registr workloadů: jméno -> (generátor, výchozí velikost)
+WORKLOADS = {
+    'counting_loop': (counting_loop, 20000),
+    'nested_loops': (nested_loops, 10000),
+    'numeric_loop': (numeric_loop, 10000),
+    'string_concat': (string_concat, 5000),
+    'long_expressions': (long_expressions, 200),
+    'deep_nesting': (deep_nesting, 40),
+    'many_variables': (many_variables, 500),
+    'io_heavy': (io_heavy, 2000),
+    'invariant_loops': (invariant_loops, 10000),
+    'counted_loops': (counted_loops, 500),
+}
+
+def generate(name, scale=1.0):
+    # Vygeneruje workload daného jména, velikost se násobí parametrem scale
+    generator, size = WORKLOADS[name]
+    return generator(max(1, int(size * scale)))
@@ -1,86 +1,268 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+# Hlavní vstupní bod: překlad a spuštění programů
+#
+# Použití:
+#   python main.py compile <zdroj> [<výstup>]     jen překlad do vygenerovaného kódu
+#   python main.py run <vygenerovaný kód>         jen spuštění existujícího kódu
+#   python main.py exec <zdroj> [<výstup>]        překlad a spuštění
+#   python main.py <zdroj> [<výstup>]             totéž co exec (původní rozhraní)
+#
+# compile a exec s --backend register generují kód pro registrový stroj (src/register_vm),
+# run ho pozná podle hlavičky souboru.
+#
+# Moduly jednotlivých fází se importují až ve chvíli, kdy jsou potřeba, takže "run"
+# načte jen virtuální stroj a ne antlr4, parser, TypeChecker ani CodeGenerator.
 
 import sys
 import os
-from antlr4 import *
-from src.parser.LanguageLexer import LanguageLexer
-from src.parser.LanguageParser import LanguageParser
-from src.type_checker.type_checker import TypeChecker
-from src.code_generator.code_generator import CodeGenerator
-from src.interpreter.interpreter import Interpreter
-
-def compile_file(input_path, output_path=None):
+import argparse
+
+COMMANDS = ('compile', 'run', 'exec')
+
+# Fáze, které se započítávají do propustnosti překladače
+COMPILE_STAGES = ('file_load', 'lex', 'parse', 'lower', 'type_check', 'codegen', 'optimize', 'file_write')
+
+def compile_file(input_path, output_path=None, timer=None, backend='stack', optimize_level=0):
+    # timer je volitelný StageTimer pro měření jednotlivých fází překladu
+    from src.compiler.compiler import compile_path, default_output_path
+    from src.profiler.stage_timer import StageTimer
+    timer = timer if timer is not None else StageTimer(enabled=False)
     try:
         print(f"Compiling {input_path}...")
-        
-        input_stream = FileStream(input_path, encoding='utf-8')
-        
-        lexer = LanguageLexer(input_stream)
-        
-        token_stream = CommonTokenStream(lexer)
-        
-        parser = LanguageParser(token_stream)
-        
-        parse_tree = parser.program()
-        
-        if parser.getNumberOfSyntaxErrors() > 0:
-            print(f"Syntax errors found in {input_path}")
+
+        if output_path is None:
+            output_path = default_output_path(input_path)
+
+        # Vygenerovaný kód se zapisuje do output_path průběžně během generování
+        result = compile_path(input_path, timer, output_path, backend, optimize_level)
+
+        if result.failed_stage == 'syntax':
+            print(f"Syntax errors found in {input_path}:")
+            for error in result.errors:
+                print(error)
             return False
-        
-        type_checker = TypeChecker()
-        type_checker.visit(parse_tree)
-        
-        if type_checker.has_errors():
+
+        if result.failed_stage == 'type':
             print(f"Type errors found in {input_path}:")
-            type_checker.report_errors()
+            for error in result.errors:
+                print(error)
             return False
-        
-        code_generator = CodeGenerator()
-        try:
-            code_generator.visit(parse_tree)
-        except Exception as e:
-            print(f"Error during code generation: {e}")
-            print("Partial generated code:")
-            code_generator.print_generated_code()
+
+        if result.failed_stage == 'codegen':
+            print(result.errors[0])
+            if result.partial_code:
+                print("Partial generated code:")
+                print("Generovaný kód:")
+                print(result.partial_code)
             return False
-        
-        generated_code = code_generator.get_generated_code()
-        
-        if output_path is None:
-            input_dir = os.path.dirname(input_path)
-            input_name = os.path.splitext(os.path.basename(input_path))[0]
-            output_path = os.path.join(input_dir, f"generated_{input_name}.txt")
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(generated_code)
-        
+
+        for name, counts in result.optimization_counts.items():
+            print(f"Optimization {name}: " + ", ".join(f"{key.replace('_', ' ')} {value}" for key, value in counts.items()))
         print(f"Successfully compiled {input_path} to {output_path}")
         return True
-    
+
     except Exception as e:
         print(f"Error compiling {input_path}: {e}")
         return False
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <input_file> [<output_file>]")
+def run_file(bytecode_path, args, timer, source_name):
+    # Načte a spustí vygenerovaný kód, volitelně s profilerem nebo statistikami
+    from src.register_vm.encoding import is_register_code
+    if os.path.exists(bytecode_path) and is_register_code(bytecode_path):
+        return run_register_file(bytecode_path, args, timer)
+    from src.interpreter.interpreter import Interpreter
+    print(f"--- Running Interpreter on {bytecode_path} ---")
+    cache = None
+    if args.output_cache and not (args.stats or args.profile):
+        cache, cache_key = open_output_cache(bytecode_path, args)
+        output = cache.get(cache_key)
+        if output is not None:
+            # Uložený výstup má jen program bez read, kód se nemusí ani načítat
+            with timer.stage('execute'):
+                sys.stdout.write(output)
+            report_timings(timer, args.timings)
+            print("--- Interpreter finished (cached output) ---")
+            return
+    interpreter = Interpreter(typed_storage=args.typed_memory)
+    with timer.stage('instruction_load'):
+        interpreter.load_instructions(bytecode_path)
+    if cache is not None and interpreter.output_is_deterministic():
+        return run_and_cache(interpreter, cache, cache_key, args, timer)
+    stats = None
+    if args.stats:
+        from src.profiler.execution_stats import ExecutionStats
+        stats = ExecutionStats(timing=args.stats_timing)
+    profiler = None
+    if args.profile:
+        from src.profiler.sampling_profiler import SamplingProfiler
+        profiler = SamplingProfiler(interpreter, args.profile_interval / 1000.0, source_name)
+        profiler.start()
+    try:
+        with timer.stage('execute'):
+            if stats is not None:
+                interpreter.run_instrumented(stats)
+            else:
+                interpreter.run()
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.write_collapsed(args.profile)
+            profiler.report()
+        if stats is not None:
+            if args.stats == "-":
+                stats.report(interpreter.instructions)
+            else:
+                stats.write_json(args.stats)
+        report_timings(timer, args.timings)
+    print("--- Interpreter finished ---")
+
+def open_output_cache(bytecode_path, args):
+    from src.interpreter.output_cache import OutputCache, DEFAULT_CACHE_DIRECTORY, file_key
+    directory = DEFAULT_CACHE_DIRECTORY if args.output_cache is True else args.output_cache
+    cache = OutputCache(directory, max_output_size=args.cache_max_output * 1024,
+                        min_run_time=args.cache_min_time / 1000.0)
+    return cache, file_key(bytecode_path)
+
+def run_and_cache(interpreter, cache, cache_key, args, timer):
+    # Spustí deterministický program, výstup zároveň vypisuje a zachytává pro cache
+    # Při běhové chybě (sys.exit) se nic neuloží
+    import time
+    from src.interpreter.output_cache import CapturingOutput
+    interpreter.output_stream = CapturingOutput(sys.stdout, cache.max_output_size)
+    try:
+        with timer.stage('execute'):
+            started = time.perf_counter()
+            interpreter.run()
+            run_time = time.perf_counter() - started
+        cache.put(cache_key, interpreter.output_stream.getvalue(), run_time)
+    finally:
+        report_timings(timer, args.timings)
+    print("--- Interpreter finished ---")
+
+def run_register_file(bytecode_path, args, timer):
+    # Spustí registrový kód; profiler a statistiky umí jen zásobníkový Interpreter
+    from src.register_vm.register_machine import RegisterMachine
+    if args.profile or args.stats:
+        print("Error: --profile and --stats are not supported for register code", file=sys.stderr)
+        sys.exit(1)
+    print(f"--- Running RegisterMachine on {bytecode_path} ---")
+    machine = RegisterMachine()
+    with timer.stage('instruction_load'):
+        machine.load_instructions(bytecode_path)
+    try:
+        with timer.stage('execute'):
+            machine.run()
+    finally:
+        report_timings(timer, args.timings)
+    print("--- Interpreter finished ---")
+
+def report_timings(timer, destination):
+    # Vypíše nebo uloží naměřené časy fází (destination: None = vypnuto, "-" = výpis, jinak JSON soubor)
+    timer.stop()
+    if destination is None:
         return
-    
-    input_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    if destination == "-":
+        timer.report(compile_stages=COMPILE_STAGES)
+    else:
+        timer.write_json(destination, compile_stages=COMPILE_STAGES)
+
+def create_timer(args):
+    from src.profiler.stage_timer import StageTimer
+    timer = StageTimer(enabled=args.timings is not None, trace_memory=not args.timings_no_memory)
+    timer.start()
+    return timer
+
+def command_compile(args):
+    timer = create_timer(args)
+    success = compile_file(args.input_file, args.output_file, timer, args.backend, args.optimize)
+    report_timings(timer, args.timings)
+    return 0 if success else 1
+
+def command_run(args):
+    timer = create_timer(args)
+    run_file(args.input_file, args, timer, os.path.basename(args.input_file))
+    return 0
+
+def command_exec(args):
+    from src.compiler.compiler import default_output_path
+    input_path = args.input_file
+    output_path = args.output_file if args.output_file else default_output_path(input_path)
+
+    timer = create_timer(args)
+    success = compile_file(input_path, output_path, timer, args.backend, args.optimize)
 
-    success = compile_file(input_path, output_path)
-    
     if success:
-        print(f"--- Running Interpreter on {output_path} ---")
-        interpreter = Interpreter()
-        interpreter.load_instructions(output_path)
-        interpreter.run()
-        print("--- Interpreter finished ---")
-    
-    sys.exit(0 if success else 1)
+        run_file(output_path, args, timer, os.path.basename(input_path))
+    else:
+        report_timings(timer, args.timings)
+
+    return 0 if success else 1
+
+def build_parser():
+    timing_options = argparse.ArgumentParser(add_help=False)
+    timing_options.add_argument("--timings", metavar="FILE", nargs="?", const="-",
+                                help="measure wall time and peak memory of every pipeline stage; "
+                                     "print a report, or write JSON to FILE")
+    timing_options.add_argument("--timings-no-memory", action="store_true",
+                                help="with --timings, skip tracemalloc (it slows down execution considerably)")
+
+    backend_options = argparse.ArgumentParser(add_help=False)
+    backend_options.add_argument("--backend", choices=("stack", "register"), default="stack",
+                                 help="generate code for the stack interpreter (default) or the register VM")
+    backend_options.add_argument("-O", "--optimize", metavar="LEVEL", type=int, choices=(0, 1, 2, 3), default=0,
+                                 help="optimization level of stack code: 0 none (default), "
+                                      "1 evaluate the input-independent start of the program at compile time, "
+                                      "2 also run data-flow, loop and expression optimizations, "
+                                      "3 also unroll for loops with a constant trip count")
+
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument("--profile", metavar="FILE",
+                             help="sample the running program and write collapsed stacks (flame graph input) to FILE")
+    run_options.add_argument("--profile-interval", metavar="MS", type=float, default=1.0,
+                             help="sampling interval in milliseconds (default: 1)")
+    run_options.add_argument("--stats", metavar="FILE", nargs="?", const="-",
+                             help="count executed opcodes, instructions and variable accesses; "
+                                  "print a report, or write JSON to FILE")
+    run_options.add_argument("--stats-timing", action="store_true",
+                             help="with --stats, also measure cumulative time per opcode")
+    run_options.add_argument("--typed-memory", action="store_true",
+                             help="keep int and float variables in typed arrays instead of a dict")
+    run_options.add_argument("--output-cache", metavar="DIR", nargs="?", const=True,
+                             help="reuse the stored output of programs without read, keyed by the code hash "
+                                  "(default directory: $PJP_OUTPUT_CACHE or ~/.cache/pjp/output)")
+    run_options.add_argument("--cache-min-time", metavar="MS", type=float, default=0.0,
+                             help="with --output-cache, store only programs that ran at least MS milliseconds")
+    run_options.add_argument("--cache-max-output", metavar="KB", type=int, default=1024,
+                             help="with --output-cache, store only outputs up to KB kilobytes (default: 1024)")
+
+    parser = argparse.ArgumentParser(description="Compile and run programs",
+                                     epilog="python main.py <input_file> [<output_file>] is the same as exec")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", parents=[backend_options, timing_options], help="compile a source file")
+    compile_parser.add_argument("input_file")
+    compile_parser.add_argument("output_file", nargs="?", help="default: generated_<name>.txt next to the source")
+    compile_parser.set_defaults(handler=command_compile)
+
+    run_parser = subparsers.add_parser("run", parents=[run_options, timing_options], help="run generated code")
+    run_parser.add_argument("input_file", help="generated code")
+    run_parser.set_defaults(handler=command_run)
+
+    exec_parser = subparsers.add_parser("exec", parents=[backend_options, run_options, timing_options], help="compile and run a source file")
+    exec_parser.add_argument("input_file")
+    exec_parser.add_argument("output_file", nargs="?", help="default: generated_<name>.txt next to the source")
+    exec_parser.set_defaults(handler=command_exec)
+    return parser
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Původní rozhraní bez podpříkazu se chová jako exec
+    if argv and argv[0] not in COMMANDS and argv[0] not in ('-h', '--help'):
+        argv.insert(0, 'exec')
+    args = build_parser().parse_args(argv)
+    sys.exit(args.handler(args))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Dávkový překlad mnoha zdrojových souborů
+# Vstupem jsou soubory, adresáře, glob vzory nebo manifest (soubor se seznamem cest).
+# Lexer, parser, kontrola typů a generování kódu běží v ProcessPoolExecutor. Workery se
+# při startu zahřejí překladem ukázkového programu (DFA cache ANTLR je pak "teplá")
+# a zůstávají živé po celou dávku. Chyba v jednom souboru dávku nezastaví.
+#
+# Použití:
+#   python -m src.batch.batch_compiler <soubor|adresář|glob> ... [--manifest FILE]
+#                                      [--jobs N] [--output-dir DIR] [--report FILE]
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+def collect_inputs(specs, manifest=None, pattern="*.txt"):
+    # Rozbalí zadané cesty na seznam souborů (bez duplicit, v pořadí zadání)
+    # Adresáře se prohledávají rekurzivně podle vzoru, vygenerované soubory (generated_*) se přeskakují
+    paths = []
+    if manifest is not None:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            base_dir = os.path.dirname(manifest)
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+
+    for spec in specs:
+        if os.path.isdir(spec):
+            for root, _, files in os.walk(spec):
+                for name in sorted(fnmatch.filter(files, pattern)):
+                    if not name.startswith('generated_'):
+                        paths.append(os.path.join(root, name))
+        elif glob.has_magic(spec):
+            paths.extend(sorted(glob.glob(spec, recursive=True)))
+        else:
+            paths.append(spec)
+
+    unique = []
+    seen = set()
+    for path in paths:
+        normalized = os.path.normpath(path)
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(normalized)
+    return unique
+
+def output_path_for(input_path, output_dir=None):
+    # Cesta pro vygenerovaný kód (vedle zdroje, nebo v output_dir se zachováním jména)
+    from src.compiler.compiler import default_output_path
+    if output_dir is None:
+        return default_output_path(input_path)
+    input_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"generated_{input_name}.txt")
+
+def _init_worker():
+    # Inicializace workeru: import celé pipeline a zahřátí DFA cache parseru
+    from src.compiler.compiler import warm_up
+    warm_up()
+
+def compile_one(input_path, output_path):
+    # Přeloží jeden soubor a zapíše výsledek; vrací slovník s výsledkem (chyby se nevyhazují)
+    from src.compiler.compiler import compile_path
+    started = time.perf_counter()
+    record = {'input': input_path, 'output': None, 'success': False, 'errors': [], 'instructions': 0, 'bytes': 0}
+    try:
+        record['bytes'] = os.path.getsize(input_path)
+        result = compile_path(input_path, output_path=output_path)
+        record['errors'] = result.errors
+        if result.success:
+            record['output'] = output_path
+            record['instructions'] = result.instruction_count
+            record['success'] = True
+    except Exception as e:
+        record['errors'] = [f"Error compiling {input_path}: {e}"]
+    record['time'] = time.perf_counter() - started
+    return record
+
+def compile_batch(paths, output_dir=None, jobs=None):
+    # Přeloží všechny soubory v procesovém poolu, vrátí seznam záznamů ve stejném pořadí
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    outputs = [output_path_for(path, output_dir) for path in paths]
+
+    if jobs == 1:
+        _init_worker()
+        return [compile_one(path, output) for path, output in zip(paths, outputs)]
+
+    # Malé soubory posíláme po dávkách, aby se režie komunikace rozložila
+    chunksize = max(1, len(paths) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+        return list(executor.map(compile_one, paths, outputs, chunksize=chunksize))
+
+def summarize(records, elapsed):
+    succeeded = sum(1 for record in records if record['success'])
+    total_bytes = sum(record['bytes'] for record in records)
+    return {
+        'files': len(records),
+        'succeeded': succeeded,
+        'failed': len(records) - succeeded,
+        'source_bytes': total_bytes,
+        'instructions': sum(record['instructions'] for record in records),
+        'elapsed': elapsed,
+        'files_per_s': len(records) / elapsed if elapsed > 0 else 0.0,
+        'kb_per_s': total_bytes / 1024 / elapsed if elapsed > 0 else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile many source files in parallel")
+    parser.add_argument("inputs", nargs="*", help="source files, directories or glob patterns")
+    parser.add_argument("--manifest", metavar="FILE", help="file with one source path per line")
+    parser.add_argument("--pattern", default="*.txt", help="file name pattern used for directories (default: *.txt)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--output-dir", metavar="DIR", help="write generated code here instead of next to the sources")
+    parser.add_argument("--report", metavar="FILE", help="write per-file results and the summary as JSON")
+    parser.add_argument("--quiet", "-q", action="store_true", help="print only failures and the summary")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.inputs, args.manifest, args.pattern)
+    if not paths:
+        print("No input files found.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    records = compile_batch(paths, args.output_dir, args.jobs)
+    summary = summarize(records, time.perf_counter() - started)
+
+    for record in records:
+        if record['success']:
+            if not args.quiet:
+                print(f"OK    {record['input']} -> {record['output']} ({record['instructions']} instructions)")
+        else:
+            print(f"FAIL  {record['input']}")
+            for error in record['errors']:
+                print(f"      {error}")
+
+    print(f"{summary['succeeded']}/{summary['files']} files compiled in {summary['elapsed']:.3f} s "
+          f"({summary['files_per_s']:.1f} files/s, {summary['kb_per_s']:.1f} KB/s)")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'files': records}, f, indent=2)
+
+    return 0 if summary['failed'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,17 +2,29 @@
 # -*- coding: utf-8 -*-
 
 import sys
-from antlr4 import *
-from src.parser.LanguageParser import LanguageParser
-from src.parser.LanguageVisitor import LanguageVisitor
+from src.ir import nodes
+from src.ir.nodes import IRVisitor, source_text
 from src.type_checker.type_checker import Type
-
-class CodeGenerator(LanguageVisitor):
-    # Třída pro generování kódu z parse tree
-    def __init__(self):
-        self.code = []
+from src.code_generator.emitter import ListEmitter
+
+class CodeGenerator(IRVisitor):
+    # Třída pro generování kódu z IR programu (src/ir/nodes.py)
+    # Instrukce se předávají emitteru: ListEmitter je drží v paměti, StreamEmitter je rovnou zapisuje do souboru
+    def __init__(self, emitter=None):
+        self.emitter = emitter if emitter is not None else ListEmitter()
+        self.current_position = (0, 0)
         self.variables = {}
         self.label_counter = 0
+
+    def visit(self, node):
+        # Před návštěvou uzlu si zapamatujeme jeho pozici ve zdrojovém kódu,
+        # aby instrukce, které uzel vygeneruje, odkazovaly na správný řádek a sloupec
+        previous_position = self.current_position
+        self.current_position = (node.line, node.column)
+        try:
+            return node.accept(self)
+        finally:
+            self.current_position = previous_position
     
     def get_new_label(self):
         # Funkce pro generování nového unikátního čísla pro label
@@ -22,11 +34,25 @@ class CodeGenerator(LanguageVisitor):
     
     def add_instruction(self, instruction):
         # Funkce pro přidání instrukce do generovaného kódu
-        self.code.append(instruction)
-    
-    def get_generated_code(self):
-        # Funkce pro získání generovaného kódu jako řetězec
-        return '\n'.join(self.code)
+        self.emitter.emit(instruction, self.current_position)
+
+    @property
+    def code(self):
+        # Seznam vygenerovaných instrukcí (jen s ListEmitter)
+        return self.emitter.code
+
+    @property
+    def instruction_count(self):
+        return self.emitter.instruction_count
+
+    def get_line_table(self):
+        # Funkce pro sestavení tabulky řádků (instrukce -> řádek, sloupec ve zdrojovém kódu)
+        return self.emitter.get_line_table()
+
+    def get_generated_code(self, include_line_table=True):
+        # Funkce pro získání generovaného kódu jako řetězec (jen s ListEmitter)
+        # Za instrukce se přidá sekce .linetable, kterou interpreter použije pro mapování na zdrojový kód
+        return self.emitter.get_generated_code(include_line_table)
     
     def type_to_code(self, type_value):
         # Funkce pro převod typu na kód I, S, B, F
@@ -43,7 +69,7 @@ class CodeGenerator(LanguageVisitor):
     
     def visitProgram(self, ctx):
         # Funkce pro zpracování celého programu
-        for statement in ctx.statement():
+        for statement in ctx.statements:
             self.visit(statement)
         
         return None
@@ -70,7 +96,7 @@ class CodeGenerator(LanguageVisitor):
         Visit a variable declaration statement.
 
         Args:
-            ctx: The declaration statement context
+            ctx: The declaration statement node
 
         Returns:
             None
@@ -78,15 +104,16 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro zpracování příkazu pro deklaraci proměnné
 
         # Získáme typ proměnné
-        type_name = ctx.type_().getText()
+        type_name = ctx.type_name
         var_type_enum = self._string_to_type(type_name) # Převod na enum pomocí _string_to_type pomocníka
 
         # Získáme jména proměnných
-        variables = ctx.variableList().ID()
+        variables = ctx.identifiers
 
         for var in variables:
-            var_name = var.getText()
+            var_name = var.name
             self.variables[var_name] = var_type_enum 
+            self.emitter.declare_variable(var_name, self.type_to_code(var_type_enum))
 
             if var_type_enum == Type.INT:
                 self.add_instruction(f"push I 0")
@@ -103,22 +130,69 @@ class CodeGenerator(LanguageVisitor):
     
     def visitExpressionStatement(self, ctx):
         # Funkce pro zpracování příkazu pro výraz
+        self._visit_discarded(ctx.expression)
+        return None
+
+    def _visit_discarded(self, ctx):
+        # Výraz, jehož hodnota se nepoužije (příkaz, init a krok cyklu for)
+        # s = s . a . b se přeloží na a; b; concat; append s (bez load/save/load/pop)
+        operands = self._append_operands(ctx)
+        if operands is not None:
+            previous_position = self.current_position
+            self.current_position = (ctx.line, ctx.column)
+            try:
+                for index, operand in enumerate(operands):
+                    self.visit(operand)
+                    if index > 0:
+                        self.add_instruction("concat")
+                self.add_instruction(f"append {ctx.name}")
+            finally:
+                self.current_position = previous_position
+            return
 
         # Zpracujeme výraz (což způsobí, že se hodnota vloží na zásobník)
-        self.visit(ctx.expression())
-        
+        self.visit(ctx)
+
         # Popnutí hodnoty ze zásobníku
         self.add_instruction("pop")
-        return None
+
+    def _append_operands(self, ctx):
+        # Pravé operandy [a, b, ...] přiřazení s = s . a . b ... do string proměnné, nebo None
+        # Operandy nesmí do s přiřazovat, jinak by append viděl jinou hodnotu s než původní load s
+        if not isinstance(ctx, nodes.AssignmentExpr) or self.variables.get(ctx.name) != Type.STRING:
+            return None
+        operands = []
+        expression = ctx.expression
+        while isinstance(expression, nodes.AdditiveExpr) and expression.operator == '.':
+            operands.append(expression.right)
+            expression = expression.left
+        if not operands or not isinstance(expression, nodes.VariableExpr) or expression.name != ctx.name:
+            return None
+        if any(self._assigns_variable(operand, ctx.name) for operand in operands):
+            return None
+        operands.reverse()
+        return operands
+
+    def _assigns_variable(self, ctx, name):
+        # Obsahuje výraz přiřazení do proměnné name?
+        if isinstance(ctx, nodes.AssignmentExpr):
+            return ctx.name == name or self._assigns_variable(ctx.expression, name)
+        if isinstance(ctx, nodes.BinaryExpr):
+            return self._assigns_variable(ctx.left, name) or self._assigns_variable(ctx.right, name)
+        if isinstance(ctx, nodes.TernaryExpr):
+            return any(self._assigns_variable(part, name) for part in (ctx.cond, ctx.th, ctx.el))
+        if isinstance(ctx, (nodes.ParenExpr, nodes.NotExpr, nodes.UnaryMinusExpr)):
+            return self._assigns_variable(ctx.expression, name)
+        return False
     
     def visitReadStatement(self, ctx):
         # Funkce pro zpracování příkazu pro čtení hodnoty do proměnné
 
         # Získání všech jmen proměnných
-        variables = ctx.variableList().ID()
+        variables = ctx.identifiers
 
         for var in variables:
-            var_name = var.getText()
+            var_name = var.name
             var_type_enum = self.variables[var_name] 
 
             self.add_instruction(f"read {self.type_to_code(var_type_enum)}")
@@ -129,7 +203,7 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit statementu pro zápis proměnné. (write)
 
         # Získáme všechny výrazy k zápisu
-        expressions = ctx.expressionList().expression()
+        expressions = ctx.expressions
         num_expressions = len(expressions)
 
         # zpracujeme každý výraz, abychom jeho hodnotu vložili na zásobník
@@ -146,7 +220,7 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit bloku.
 
         # zpracujeme všechny příkazy v bloku
-        for statement in ctx.statement():
+        for statement in ctx.statements:
             self.visit(statement)
 
         return None
@@ -159,13 +233,13 @@ class CodeGenerator(LanguageVisitor):
         end_label = self.get_new_label()
 
         # zpracujeme podmínku
-        self.visit(ctx.expression())
+        self.visit(ctx.condition)
 
         # Pokud je podmínka false, skočíme na else návěští
         self.add_instruction(f"fjmp {else_label}")
 
         # zpracujeme 'then' příkaz
-        self.visit(ctx.statement(0))
+        self.visit(ctx.then_statement)
 
         # Skočíme na konec if statementu
         self.add_instruction(f"jmp {end_label}")
@@ -174,8 +248,8 @@ class CodeGenerator(LanguageVisitor):
         self.add_instruction(f"label {else_label}")
 
         # Pokud existuje 'else' příkaz, zpracujeme ho
-        if len(ctx.statement()) > 1:
-            self.visit(ctx.statement(1))
+        if ctx.else_statement is not None:
+            self.visit(ctx.else_statement)
 
         # Přidáme koncové návěští
         self.add_instruction(f"label {end_label}")
@@ -193,13 +267,13 @@ class CodeGenerator(LanguageVisitor):
         self.add_instruction(f"label {start_label}")
 
         # zpracujeme podmínku
-        self.visit(ctx.expression())
+        self.visit(ctx.condition)
 
         # Pokud je podmínka false, skočíme na koncové návěští
         self.add_instruction(f"fjmp {end_label}")
 
         # zpracujeme tělo příkazu
-        self.visit(ctx.statement())
+        self.visit(ctx.body)
 
         # Skočíme zpět na počáteční návěští
         self.add_instruction(f"jmp {start_label}")
@@ -220,9 +294,8 @@ class CodeGenerator(LanguageVisitor):
 
         # 1. generovani pro první část for cyklu (init)
         if ctx.init:
-            self.visit(ctx.init)
             # Výsledek inicializace zahodíme
-            self.add_instruction("pop")
+            self._visit_discarded(ctx.init)
 
         # 2. Návěští pro podmínku
         self.add_instruction(f"label {condition_label}")
@@ -241,9 +314,8 @@ class CodeGenerator(LanguageVisitor):
 
         # 4. Generování kódu pro krok (step)
         if ctx.step:
-            self.visit(ctx.step)
             # Výsledek kroku se zahodíme
-            self.add_instruction("pop")
+            self._visit_discarded(ctx.step)
 
         # Po kroku skočíme zpět na kontrolu podmínky
         self.add_instruction(f"jmp {condition_label}")
@@ -253,7 +325,7 @@ class CodeGenerator(LanguageVisitor):
 
         # Tady začne tělo cyklu:
         # 5. Generování kódu pro tělo cyklu (body)
-        self.visit(ctx.statement())
+        self.visit(ctx.body)
 
         # Po těle cyklu skočíme na krok (step)
         self.add_instruction(f"jmp {step_label}")
@@ -267,7 +339,7 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit výrazu proměnné.
 
         # Získáme název proměnné
-        var_name = ctx.ID().getText()
+        var_name = ctx.name
 
         # Načteme hodnotu proměnné na zásobník
         # Zkontrolujeme, zda proměnná existuje (mělo by být zachyceno type checkerem, ale je to dobrá praxe)
@@ -281,30 +353,30 @@ class CodeGenerator(LanguageVisitor):
     def visitLiteralExpr(self, ctx):
         # Funkce pro visit literálového výrazu.
 
-        # Získáme literál
-        literal = ctx.literal()
+        # Získáme druh literálu
+        kind = ctx.kind
 
         # Zkontrolujeme, o jaký literál se jedná
-        if literal.IntegerLiteral() is not None: # INT
-            value = literal.IntegerLiteral().getText()
+        if kind == 'int': # INT
+            value = ctx.text
             self.add_instruction(f"push I {value}")
             return Type.INT
         
-        elif literal.FloatLiteral() is not None: # FLOAT
-            value = literal.FloatLiteral().getText()
+        elif kind == 'float': # FLOAT
+            value = ctx.text
             self.add_instruction(f"push F {value}")
             return Type.FLOAT
         
-        elif literal.BooleanLiteral() is not None: # BOOL
-            value_text = literal.BooleanLiteral().getText()
+        elif kind == 'bool': # BOOL
+            value_text = ctx.text
             instruction_value = value_text.lower()
             if instruction_value not in ['true', 'false']:
                  raise ValueError(f"Interní chyba: Neočekávaný text boolean literálu '{value_text}'")
             self.add_instruction(f"push B {instruction_value}")
             return Type.BOOL
         
-        elif literal.StringLiteral() is not None: # STRING
-            value = literal.StringLiteral().getText()
+        elif kind == 'string': # STRING
+            value = ctx.text
             # Odstraníme okolní uvozovky z ANTLR tokenu
             if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
                 processed_value = value[1:-1]
@@ -320,13 +392,13 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit výrazu v závorkách.
 
         # Jen zpracujeme výraz uvnitř závorek
-        return self.visit(ctx.expression())
+        return self.visit(ctx.expression)
     
     def visitUnaryMinusExpr(self, ctx):
         # Funkce pro visit unárního mínus výrazu.
 
         # zpracujeme operand
-        operand_type = self.visit(ctx.expression())
+        operand_type = self.visit(ctx.expression)
         
         # Aplikujeme unární mínus
         if operand_type == Type.INT:
@@ -343,7 +415,7 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit logického NOT výrazu.
 
         # zpracujeme operand
-        self.visit(ctx.expression())
+        self.visit(ctx.expression)
         
         # Aplikujeme logické NOT
         self.add_instruction("not")
@@ -354,9 +426,9 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit multiplikativního výrazu (* / %).
         
         # zpracujeme levý a pravý operand
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
-        operator = ctx.getChild(1).getText()
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
+        operator = ctx.operator
         result_type = Type.ERROR
 
         # Ošetříme itof konverzi: konvertujeme pouze pokud je zásobník [F, I]
@@ -389,9 +461,9 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit aditivního výrazu (+ - .).
         
         # zpracujeme levý a pravý operand
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
-        operator = ctx.getChild(1).getText()
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
+        operator = ctx.operator
         result_type = Type.ERROR
 
         if operator == '.': # Spojení řetězců
@@ -427,35 +499,34 @@ class CodeGenerator(LanguageVisitor):
     
     # Pomocná metoda pro určení typu výrazu bez generování kódu
     def _determine_expression_type(self, ctx):
-        if isinstance(ctx, LanguageParser.LiteralExprContext):
-            lit = ctx.literal()
-            if lit.IntegerLiteral(): return Type.INT
-            if lit.FloatLiteral(): return Type.FLOAT
-            if lit.BooleanLiteral(): return Type.BOOL
-            if lit.StringLiteral(): return Type.STRING
-        elif isinstance(ctx, LanguageParser.VariableExprContext):
-            var_name = ctx.ID().getText()
+        if isinstance(ctx, nodes.LiteralExpr):
+            if ctx.kind == 'int': return Type.INT
+            if ctx.kind == 'float': return Type.FLOAT
+            if ctx.kind == 'bool': return Type.BOOL
+            if ctx.kind == 'string': return Type.STRING
+        elif isinstance(ctx, nodes.VariableExpr):
+            var_name = ctx.name
             # Použijeme uložené typy proměnných, pokud jsou k dispozici
             return self.variables.get(var_name, Type.ERROR)
-        elif isinstance(ctx, LanguageParser.ParenExprContext):
+        elif isinstance(ctx, nodes.ParenExpr):
             # Podíváme se dovnitř závorek
-            return self._determine_expression_type(ctx.expression())
-        elif isinstance(ctx, LanguageParser.UnaryMinusExprContext):
+            return self._determine_expression_type(ctx.expression)
+        elif isinstance(ctx, nodes.UnaryMinusExpr):
             # Typ závisí na typu operandu
-            operand_type = self._determine_expression_type(ctx.expression())
+            operand_type = self._determine_expression_type(ctx.expression)
             if operand_type in [Type.INT, Type.FLOAT]:
                 return operand_type
-        elif isinstance(ctx, LanguageParser.NotExprContext):
+        elif isinstance(ctx, nodes.NotExpr):
              return Type.BOOL # Výsledek 'not' je vždy bool
 
-        print(f"Varování: Nelze určit typ pro uzel {ctx.getText()} bez plné návštěvy.")
+        print(f"Varování: Nelze určit typ pro uzel {source_text(ctx)} bez plné návštěvy.")
         return Type.ERROR # Indikuje neznámý typ
 
     def visitRelationalExpr(self, ctx):
         # Funkce pro visit relačního výrazu (< >). Upraveno pro správné zpracování int/float povýšení.
-        left_expr_ctx = ctx.expression(0)
-        right_expr_ctx = ctx.expression(1)
-        operator = ctx.getChild(1).getText()
+        left_expr_ctx = ctx.left
+        right_expr_ctx = ctx.right
+        operator = ctx.operator
 
         # zpracujeme levý operand jako první
         left_type = self.visit(left_expr_ctx)
@@ -502,11 +573,11 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit výrazu rovnosti (== !=).
 
         # zpracujeme levý a pravý operand
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
 
         # Získáme operátor
-        operator = ctx.getChild(1).getText()
+        operator = ctx.operator
 
         # Určíme typ pro porovnání a zpracujeme int/float povýšení
         comparison_type = Type.ERROR
@@ -560,9 +631,40 @@ class CodeGenerator(LanguageVisitor):
         # Výsledek porovnání je vždy bool
         return Type.BOOL
     
-    def visitTernaryExpr(self, ctx: LanguageParser.TernaryExprContext):
+    def _is_cheap_expression(self, ctx):
+        # Literál nebo proměnná (i v závorkách a s unárním mínus): výpočet bez vedlejších účinků
+        # na jednu až dvě instrukce, který se může vyhodnotit, i když se jeho hodnota nepoužije
+        if isinstance(ctx, (nodes.LiteralExpr, nodes.VariableExpr)):
+            return True
+        if isinstance(ctx, nodes.ParenExpr):
+            return self._is_cheap_expression(ctx.expression)
+        if isinstance(ctx, nodes.UnaryMinusExpr):
+            return isinstance(ctx.expression, (nodes.LiteralExpr, nodes.VariableExpr))
+        return False
+
+    def visitTernaryExpr(self, ctx):
         # Funkce pro návštěvu ternárního výrazu: cond ? th : el
 
+        # Výsledný typ podle pravidel kontroly typů (int a float větev dají float)
+        def result_type_of(true_type, false_type):
+            if true_type == false_type:
+                return true_type
+            if {true_type, false_type} == {Type.INT, Type.FLOAT}:
+                return Type.FLOAT
+            return Type.ERROR
+
+        # Levné větve bez vedlejších účinků se vyhodnotí obě a hodnotu vybere instrukce select
+        # (bez skoků); select ponechá vybranou hodnotu beze změny typu stejně jako skoková verze
+        if self._is_cheap_expression(ctx.th) and self._is_cheap_expression(ctx.el):
+            select_type = result_type_of(self._determine_expression_type(ctx.th),
+                                         self._determine_expression_type(ctx.el))
+            if select_type != Type.ERROR:
+                self.visit(ctx.cond)
+                self.visit(ctx.th)
+                self.visit(ctx.el)
+                self.add_instruction(f"select {self.type_to_code(select_type)}")
+                return select_type
+
         false_label = self.get_new_label()
         end_label = self.get_new_label()
 
@@ -589,49 +691,15 @@ class CodeGenerator(LanguageVisitor):
         # 7. Přidání koncového návěští (hodnota z pravdivé nebo nepravdivé větve je nyní na zásobníku)
         self.add_instruction(f"label {end_label}")
 
-        # Určení výsledného typu na základě logiky kontroly typů (pro návratovou hodnotu)
-        # a případné přidání itof, pokud je potřeba (i když to je složité)
-        result_type = Type.ERROR
-        if true_type == false_type:
-            result_type = true_type
-        elif (true_type == Type.FLOAT and false_type == Type.INT) or \
-             (true_type == Type.INT and false_type == Type.FLOAT):
-            result_type = Type.FLOAT
-
         # Vrátíme určený výsledný typ (jak je odvozen podle pravidel kontroly typů)
-        return result_type
-
-    def visitAppendExpr(self, ctx: LanguageParser.AppendExprContext):
-        # Zpracovává výrazy typu: file_handle << value
-        # Generuje kód pro:
-        # 1. Načtení handle souboru (levý operand)
-        # 2. Vyhodnocení výrazu hodnoty (pravý operand)
-        # 3. Volání fappend
-
-        # Navštívíme levý výraz (měl by to být handle souboru)
-        left_type = self.visit(ctx.expression(0))
-        if left_type != Type.FILE:
-            # Toto by mělo být ideálně zachyceno kontrolou typů
-            print(f"Varování: Levý operand '<<' není Type.FILE (dostal {left_type}). Generování kódu může selhat.", file=sys.stderr)
-
-        # Navštívíme pravý výraz (hodnota pro připojení)
-        right_type = self.visit(ctx.expression(1))
-        # Pro generování zde není potřeba kontrola typů, interpret zpracovává konverzi
-
-        # Přidáme instrukci fappend
-        # Interpreter očekává: hodnotu, pak handle na zásobníku
-        # fappend spotřebuje obojí, vrátí handle zpět
-        self.add_instruction("fappend")
-
-        # Výsledkem výrazu připojení je samotný handle souboru
-        return Type.FILE
+        return result_type_of(true_type, false_type)
 
     def visitAndExpr(self, ctx):
         # Funkce pro visit logického AND výrazu.
 
         # zpracujeme levý a pravý operand
-        self.visit(ctx.expression(0))
-        self.visit(ctx.expression(1))
+        self.visit(ctx.left)
+        self.visit(ctx.right)
         
         # Aplikujeme logické AND
         self.add_instruction("and")
@@ -642,8 +710,8 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit logického OR výrazu.
 
         # zpracujeme levý a pravý operand
-        self.visit(ctx.expression(0))
-        self.visit(ctx.expression(1))
+        self.visit(ctx.left)
+        self.visit(ctx.right)
         
         # Aplikujeme logické OR
         self.add_instruction("or")
@@ -654,7 +722,7 @@ class CodeGenerator(LanguageVisitor):
         # Funkce pro visit výrazu přiřazení.
 
         # Získáme název proměnné
-        var_name = ctx.ID().getText()
+        var_name = ctx.name
 
         if not var_name or not isinstance(var_name, str):
              raise TypeError(f"Interní chyba: Neplatný název proměnné '{var_name}' v přiřazení")
@@ -664,7 +732,7 @@ class CodeGenerator(LanguageVisitor):
         var_type = self.variables[var_name]
 
         # zpracujeme výraz na pravé straně JAKO PRVNÍ
-        rhs_expr_ctx = ctx.expression()
+        rhs_expr_ctx = ctx.expression
 
         expr_type = None # Inicializujeme expr_type
         try:
@@ -699,4 +767,4 @@ class CodeGenerator(LanguageVisitor):
     def print_generated_code(self):
         # Vytiskne generovaný kód do konzole pro účely ladění.
         print("Generovaný kód:")
-        print(self.get_generated_code())
+        print(self.get_generated_code(include_line_table=False))
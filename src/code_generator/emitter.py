@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Výstup generátoru kódu
+# CodeGenerator předává každou instrukci (a její pozici ve zdrojovém kódu) emitteru.
+#   ListEmitter    drží instrukce v paměti (výchozí; pro server, testy a částečný kód při chybě)
+#   StreamEmitter  zapisuje instrukce průběžně do souboru, paměť nezávisí na velikosti výstupu
+# Skoky odkazují na symbolická návěští (label N), která interpreter rozliší až při načtení,
+# takže už zapsané instrukce není potřeba zpětně opravovat.
+# Za instrukce se zapisuje sekce .linetable a (jsou-li deklarované proměnné) sekce .variables
+# s řádky '<jméno> <typový kód>' v pořadí deklarací; pořadí je zároveň číslo proměnné.
+
+import io
+import shutil
+import tempfile
+
+LINE_TABLE_SECTION = ".linetable"
+VARIABLES_SECTION = ".variables"
+
+class ListEmitter:
+    # Instrukce a jejich pozice ve zdrojovém kódu se ukládají do seznamů
+    def __init__(self):
+        self.code = []
+        self.positions = [] # (řádek, sloupec) pro každou instrukci
+        self.variables = [] # (jméno, typový kód) v pořadí deklarací
+
+    def emit(self, instruction, position):
+        self.code.append(instruction)
+        self.positions.append(position)
+
+    def declare_variable(self, name, type_code):
+        self.variables.append((name, type_code))
+
+    @property
+    def instruction_count(self):
+        return len(self.code)
+
+    def get_line_table(self):
+        # Ukládáme jen místa, kde se pozice mění: (index první instrukce, řádek, sloupec)
+        line_table = []
+        previous_position = None
+        for index, position in enumerate(self.positions):
+            if position != previous_position:
+                line_table.append((index, position[0], position[1]))
+                previous_position = position
+        return line_table
+
+    def get_generated_code(self, include_line_table=True):
+        lines = list(self.code)
+        if include_line_table:
+            lines.append(LINE_TABLE_SECTION)
+            for index, line, column in self.get_line_table():
+                lines.append(f"{index} {line} {column}")
+            if self.variables:
+                lines.append(VARIABLES_SECTION)
+                lines.extend(f"{name} {type_code}" for name, type_code in self.variables)
+        return '\n'.join(lines)
+
+    def finish(self):
+        pass
+
+class StreamEmitter:
+    # Instrukce se zapisují hned do sink (textový nebo binární soubor, zápis je bufferovaný)
+    # Tabulka řádků se musí zapsat až za instrukce, proto se průběžně odkládá do dočasného
+    # souboru (do spool_size bajtů v paměti) a na konec se připojí ve finish()
+    def __init__(self, sink, spool_size=64 * 1024):
+        self._binary_sink = None
+        if isinstance(sink, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(sink, 'mode', ''):
+            self._binary_sink = sink
+            sink = io.TextIOWrapper(sink, encoding='utf-8', newline='\n')
+        self.sink = sink
+        self.line_table = tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+', encoding='utf-8')
+        self.instruction_count = 0
+        self.previous_position = None
+        self.variables = [] # (jméno, typový kód), zapíší se ve finish()
+        self.finished = False
+
+    def emit(self, instruction, position):
+        # Oddělovač se píše před instrukci, výstup tak odpovídá '\n'.join(...) z ListEmitter
+        if self.instruction_count:
+            self.sink.write('\n')
+        self.sink.write(instruction)
+        if position != self.previous_position:
+            self.line_table.write(f"\n{self.instruction_count} {position[0]} {position[1]}")
+            self.previous_position = position
+        self.instruction_count += 1
+
+    def declare_variable(self, name, type_code):
+        self.variables.append((name, type_code))
+
+    def finish(self, include_line_table=True):
+        # Připojí tabulku řádků a vyprázdní buffery; sink zůstává otevřený
+        if self.finished:
+            return
+        self.finished = True
+        if include_line_table:
+            if self.instruction_count:
+                self.sink.write('\n')
+            self.sink.write(LINE_TABLE_SECTION)
+            self.line_table.seek(0)
+            shutil.copyfileobj(self.line_table, self.sink)
+            if self.variables:
+                self.sink.write(f"\n{VARIABLES_SECTION}")
+                for name, type_code in self.variables:
+                    self.sink.write(f"\n{name} {type_code}")
+        self.line_table.close()
+        self.sink.flush()
+        if self._binary_sink is not None:
+            self.sink.detach() # Binární sink nezavíráme spolu s obalem
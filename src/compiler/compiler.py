@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Jádro překladače
+# Provede lexikální a syntaktickou analýzu, kontrolu typů a generování kódu nad jedním
+# zdrojovým textem. Chyby se nevypisují, ale sbírají do CompileResult, takže stejné
+# jádro může používat main.py, dávkový překlad i server.
+#
+# Parse tree se převádí na IR (src/ir) už během parsování, po příkazech nejvyšší úrovně,
+# a objekty ANTLR (strom, tokeny, vstupní proud) se hned po parsování uvolní; kontrola
+# typů a generování kódu už drží v paměti jen IR.
+#
+# backend určuje cílový kód: 'stack' (CodeGenerator, zásobníkový Interpreter) nebo
+# 'register' (RegisterGenerator, src/register_vm).
+# optimize_level > 0 spustí nad zásobníkovým kódem průchody src/optimizer; kód se pak
+# generuje celý do paměti a do souboru se zapíše až po optimalizaci.
+
+import os
+from antlr4 import CommonTokenStream, InputStream
+from src.parser.LanguageLexer import LanguageLexer
+from src.parser.LanguageParser import LanguageParser
+from src.parser.parser_main import SyntaxErrorListener
+from src.parser.dfa_cache import ensure_loaded as load_prediction_cache
+from src.parser.chunked_stream import ChunkedFileStream, copy_token_text
+from src.ir.lowering import StatementLowering, count_nodes, release_parse_tree
+from src.type_checker.type_checker import TypeChecker
+from src.code_generator.code_generator import CodeGenerator
+from src.code_generator.emitter import StreamEmitter
+from src.profiler.stage_timer import StageTimer
+
+class CompileResult:
+    # Výsledek překladu jednoho zdrojového textu
+    def __init__(self, source_name):
+        self.source_name = source_name
+        self.success = False
+        self.failed_stage = None # 'syntax', 'type' nebo 'codegen' při neúspěchu
+        self.errors = [] # Chybová hlášení jako řetězce
+        self.generated_code = None # Vygenerovaný kód včetně sekcí metadat (None, pokud se zapisoval rovnou do souboru)
+        self.output_path = None # Soubor s vygenerovaným kódem při překladu s output_path
+        self.partial_code = None # Částečně vygenerovaný kód při chybě generování
+        self.instruction_count = 0
+        self.optimization_counts = {} # Průchod optimalizace -> počty změn
+
+# Ukázkový program pro zahřátí parseru, obsahuje všechny konstrukce jazyka
+WARMUP_SOURCE = """
+int i, n; float f; bool b; string s;
+i = 0; n = 10; f = 1.5; b = true; s = "a";
+for (i = 0; i < n; i = i + 1) { f = f * 2 + i / 3 % 2; }
+while (i > 0 && !b || i == 3) { i = i - 1; }
+if (f < 2.5 || s == "a") write "x", -i, s . "b"; else { write b ? 1 : 2; }
+read n;
+"""
+
+def default_output_path(input_path):
+    # Výchozí cesta pro vygenerovaný kód: generated_<jméno>.txt vedle zdrojového souboru
+    input_dir = os.path.dirname(input_path)
+    input_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(input_dir, f"generated_{input_name}.txt")
+
+def parse_stream(input_stream, result, timer):
+    # Lexikální a syntaktická analýza a převod na IR
+    # Vrací nodes.Program, nebo None při syntaktické chybě (chyby jsou v result)
+    # Objekty ANTLR se před návratem rozpojí, vstupní proud pak drží jen volající
+    load_prediction_cache() # Uložené DFA parseru se načtou jen před prvním překladem v procesu
+    error_listener = SyntaxErrorListener()
+
+    with timer.stage('lex'):
+        lexer = copy_token_text(LanguageLexer(input_stream)) # Tokeny nesou vlastní text, nečtou ho z proudu
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(error_listener)
+
+        token_stream = CommonTokenStream(lexer)
+        token_stream.fill() # Tokenizujeme celý vstup najednou, aby lexer a parser šly měřit zvlášť
+    timer.count('tokens', len(token_stream.tokens))
+
+    with timer.stage('parse'):
+        parser = LanguageParser(token_stream)
+        parser.removeErrorListeners()
+        parser.addErrorListener(error_listener)
+        statement_lowering = StatementLowering(error_listener)
+        parser.addParseListener(statement_lowering)
+
+        parse_tree = parser.program()
+
+    if error_listener.has_errors():
+        result.failed_stage = 'syntax'
+        result.errors = error_listener.errors_in_source_order()
+        release_parse_tree(parse_tree, parser)
+        return None
+    timer.count('parse_tree_nodes', statement_lowering.tree_nodes)
+
+    with timer.stage('lower'):
+        program = statement_lowering.program(parse_tree)
+        release_parse_tree(parse_tree, parser)
+    if timer.enabled:
+        timer.count('ir_nodes', count_nodes(program))
+    return program
+
+def compile_program(program, result, timer, emitter=None, backend='stack', optimize_level=0):
+    # Kontrola typů a generování kódu nad IR programu
+    # Registrový kód se generuje celý v paměti (skoky se doplňují až na konci), emitter se nepoužije;
+    # stejně tak při optimalizaci, průchody potřebují celý kód
+    with timer.stage('type_check'):
+        type_checker = TypeChecker()
+        type_checker.visit(program)
+
+    if type_checker.has_errors():
+        result.failed_stage = 'type'
+        result.errors = [str(error) for error in type_checker.errors]
+        return result
+
+    if backend == 'register':
+        from src.register_vm.register_generator import RegisterGenerator
+        code_generator = RegisterGenerator()
+        emitter = None
+    else:
+        if optimize_level > 0:
+            emitter = None
+        code_generator = CodeGenerator(emitter)
+    try:
+        optimizing = backend == 'stack' and optimize_level > 0
+        with timer.stage('codegen'):
+            code_generator.visit(program)
+            if emitter is None and not optimizing:
+                result.generated_code = code_generator.get_generated_code()
+        if optimizing:
+            from src.optimizer.optimizer import optimize
+            with timer.stage('optimize'):
+                result.optimization_counts = optimize(code_generator.emitter, optimize_level)
+                result.generated_code = code_generator.get_generated_code()
+    except Exception as e:
+        result.failed_stage = 'codegen'
+        result.errors = [f"Error during code generation: {e}"]
+        if backend == 'stack' and emitter is None:
+            result.partial_code = code_generator.get_generated_code(include_line_table=False)
+        return result
+
+    if emitter is not None:
+        with timer.stage('file_write'):
+            emitter.finish()
+    result.instruction_count = code_generator.instruction_count
+    timer.count('instructions', result.instruction_count)
+    result.success = True
+    return result
+
+def compile_stream(input_stream, source_name="<source>", timer=None, emitter=None, backend='stack', optimize_level=0):
+    # Přeloží ANTLR vstupní proud, volitelně měří jednotlivé fáze pomocí StageTimer
+    # S emitterem (např. StreamEmitter) se kód nevrací v result.generated_code, ale předává emitteru
+    timer = timer if timer is not None else StageTimer(enabled=False)
+    result = CompileResult(source_name)
+    program = parse_stream(input_stream, result, timer)
+    if program is None:
+        return result
+    return compile_program(program, result, timer, emitter, backend, optimize_level)
+
+def compile_source(source_text, source_name="<source>", timer=None, backend='stack', optimize_level=0):
+    # Přeloží zdrojový text předaný jako řetězec
+    return compile_stream(InputStream(source_text), source_name, timer, backend=backend, optimize_level=optimize_level)
+
+def compile_path(input_path, timer=None, output_path=None, backend='stack', optimize_level=0):
+    # Přeloží zdrojový soubor
+    # S output_path se vygenerovaný kód zapisuje průběžně (StreamEmitter) do dočasného souboru,
+    # který po úspěšném překladu nahradí output_path; v paměti tak není celý výstup najednou
+    timer = timer if timer is not None else StageTimer(enabled=False)
+    # Soubor se čte po blocích až během lexikální analýzy, file_load jen otevře soubor
+    with timer.stage('file_load'):
+        input_stream = ChunkedFileStream(input_path, encoding='utf-8')
+    timer.count('source_bytes', os.path.getsize(input_path))
+    result = CompileResult(input_path)
+    program = parse_stream(input_stream, result, timer)
+    del input_stream # Zdrojový text už není potřeba, uvolní se před kontrolou typů
+    if program is None:
+        return result
+    if output_path is None:
+        return compile_program(program, result, timer, backend=backend, optimize_level=optimize_level)
+
+    temporary_path = f"{output_path}.tmp"
+    try:
+        with open(temporary_path, 'w', encoding='utf-8') as output_file:
+            if backend == 'register' or optimize_level > 0:
+                result = compile_program(program, result, timer, backend=backend, optimize_level=optimize_level)
+                if result.success:
+                    with timer.stage('file_write'):
+                        output_file.write(result.generated_code)
+            else:
+                result = compile_program(program, result, timer, StreamEmitter(output_file))
+        if result.success:
+            os.replace(temporary_path, output_path)
+            result.output_path = output_path
+        elif result.failed_stage == 'codegen':
+            # Částečný kód (instrukce vygenerované před chybou) pro chybové hlášení
+            with open(temporary_path, 'r', encoding='utf-8') as f:
+                result.partial_code = f.read()
+    finally:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+    return result
+
+def warm_up(sources=None):
+    # Přeloží ukázkové programy, aby se naplnila DFA cache lexeru a parseru
+    # (první překlady ve studeném procesu jsou výrazně pomalejší než další)
+    for source in (sources if sources is not None else [WARMUP_SOURCE]):
+        compile_source(source, "<warmup>")
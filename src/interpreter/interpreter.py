@@ -2,52 +2,47 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import json
+import time
+from bisect import bisect_right
+from src.interpreter.typed_memory import MemoryLayout, TypedMemory
+from src.interpreter.rope import concat, is_string
+
+# Instrukce, jejichž výsledek závisí jen na vygenerovaném kódu (ne na vstupu); viz output_is_deterministic
+DETERMINISTIC_OPCODES = frozenset(('push', 'pop', 'dup', 'load', 'save', 'tee', 'inc', 'append', 'add', 'sub', 'mul', 'div', 'mod', 'uminus',
+                                   'concat', 'itof', 'eq', 'lt', 'gt', 'not', 'and', 'or',
+                                   'label', 'jmp', 'fjmp', 'select', 'print', 'emit'))
+
+class InputPending(Exception):
+    # Vstupní proud zatím nemá řádek pro read, ale ještě neskončil (src/scheduler/scheduler.py);
+    # run_slice instrukci read nevykoná a vrátí se, aby se mohla zopakovat po dodání vstupu
+    pass
 
 class Interpreter:
     # Třída Interpreter pro provádění instrukcí na zásobníkové bázi
 
-    def __init__(self):
+    def __init__(self, input_stream=None, output_stream=None, typed_storage=False):
         # Inicializuje stav interpretru
+        # input_stream/output_stream umožňují přesměrovat read/print (None = konzole)
+        # typed_storage: ukládat int a float proměnné do typovaných polí (TypedMemory),
+        # pokud kód obsahuje sekci .variables; jinak je paměť slovník jméno -> hodnota
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.typed_storage = typed_storage
         self.stack = []
         self.memory = {}
         self.instructions = []
         self.labels = {}
+        self.line_table = [] # Tabulka řádků: (index první instrukce, řádek, sloupec) seřazená podle indexu
+        self.variable_types = [] # (jméno, typový kód) ze sekce .variables
+        self.memory_layout = None # MemoryLayout sdílený instancemi se stejným kódem
         self.pc = 0 # Counter programu (program counter)
 
     def load_instructions(self, filepath):
         # Načítá instrukce ze souboru a zpracovává je
-        self.instructions = []
-        self.labels = {}
-
         try:
             with open(filepath, 'r') as f:
-                for index, line in enumerate(f):
-                    line = line.strip()
-                    if not line: # Přeskočit prázdné řádky
-                        continue
-                    
-                    parts = line.split(None, 2) # Rozdělit na opcode a argumenty, opcode je první slovo a argumenty zbytek
-                    opcode = parts[0].lower() # Převeďte opcode na malá písmena pro konzistenci
-                    args = parts[1:]
-                    
-                    # Uložit instrukci do seznamu instrukcí
-                    parsed_instruction = [opcode] + args
-                    self.instructions.append(parsed_instruction)
-                    
-                    # Pokud je opcode 'label', zpracovat jako label
-                    if opcode == 'label':
-                        # Zpracovat label, očekáváme formát 'label <number>'
-                        if len(args) == 1 and args[0].isdigit():
-                            label_num = int(args[0])
-
-                            # Check jestli label_num je již v self.labels (duplikát)
-                            if label_num in self.labels:
-                                print(f"Warning: Duplicate label {label_num} found at line {index + 1}", file=sys.stderr)
-
-                            self.labels[label_num] = index
-                        else:
-                            print(f"Warning: Invalid label format at line {index + 1}: {line}", file=sys.stderr)
-                            
+                self.load_lines(f)
         except FileNotFoundError:
             print(f"Error: Instruction file not found: {filepath}", file=sys.stderr)
             sys.exit(1)
@@ -55,6 +50,105 @@ class Interpreter:
             print(f"Error reading instruction file {filepath}: {e}", file=sys.stderr)
             sys.exit(1)
 
+    def load_code(self, code):
+        # Načítá instrukce z řetězce (obsah souboru s vygenerovaným kódem)
+        self.load_lines(code.splitlines())
+
+    def load_lines(self, lines):
+        # Zpracuje řádky vygenerovaného kódu (instrukce a sekce metadat)
+        self.instructions = []
+        self.labels = {}
+        self.line_table = []
+        self.variable_types = []
+        section = None # Aktuální sekce metadat (např. .linetable), None = instrukce
+
+        for index, line in enumerate(lines):
+            line = line.strip()
+            if not line: # Přeskočit prázdné řádky
+                continue
+
+            # Sekce metadat začínají tečkou a následují za instrukcemi
+            if line.startswith('.'):
+                section = line
+                if section not in ('.linetable', '.variables'):
+                    print(f"Warning: Unknown section {section} at line {index + 1}", file=sys.stderr)
+                continue
+
+            if section == '.linetable':
+                # Záznam tabulky řádků ve formátu '<index instrukce> <řádek> <sloupec>'
+                entry = line.split()
+                if len(entry) == 3 and all(part.isdigit() for part in entry):
+                    self.line_table.append(tuple(int(part) for part in entry))
+                else:
+                    print(f"Warning: Invalid line table entry at line {index + 1}: {line}", file=sys.stderr)
+                continue
+            elif section == '.variables':
+                # Deklarovaná proměnná ve formátu '<jméno> <typový kód>'
+                entry = line.split()
+                if len(entry) == 2:
+                    self.variable_types.append((entry[0], entry[1]))
+                else:
+                    print(f"Warning: Invalid variable entry at line {index + 1}: {line}", file=sys.stderr)
+                continue
+            elif section is not None:
+                continue
+            
+            parts = line.split(None, 2) # Rozdělit na opcode a argumenty, opcode je první slovo a argumenty zbytek
+            opcode = parts[0].lower() # Převeďte opcode na malá písmena pro konzistenci
+            args = parts[1:]
+            if opcode == 'emit':
+                # Argument emit je jeden řetězec v JSON zápisu, může obsahovat mezery
+                args = line.split(None, 1)[1:]
+            
+            # Pokud je opcode 'label', zpracovat jako label
+            if opcode == 'label':
+                # Zpracovat label, očekáváme formát 'label <number>'
+                if len(args) == 1 and args[0].isdigit():
+                    label_num = int(args[0])
+
+                    # Check jestli label_num je již v self.labels (duplikát)
+                    if label_num in self.labels:
+                        print(f"Warning: Duplicate label {label_num} found at line {index + 1}", file=sys.stderr)
+
+                    # Label ukazuje na index instrukce (ne na řádek souboru, ty se mohou lišit)
+                    self.labels[label_num] = len(self.instructions)
+                else:
+                    print(f"Warning: Invalid label format at line {index + 1}: {line}", file=sys.stderr)
+
+            # Uložit instrukci do seznamu instrukcí
+            parsed_instruction = [opcode] + args
+            self.instructions.append(parsed_instruction)
+
+        self.line_table.sort()
+        if self.typed_storage and self.variable_types:
+            self.use_memory_layout(MemoryLayout(self.variable_types))
+
+    def use_memory_layout(self, layout):
+        # Přepne paměť na TypedMemory s daným rozložením (např. sdíleným z jiné instance)
+        self.memory_layout = layout
+        self.memory = TypedMemory(layout)
+
+    def output_is_deterministic(self):
+        # Výstup programu závisí jen na kódu, pokud neobsahuje read ani neznámou instrukci
+        # (ta by vypsala varování); ověřuje se staticky nad načtenými instrukcemi
+        return all(instruction[0] in DETERMINISTIC_OPCODES for instruction in self.instructions)
+
+    def source_position(self, pc):
+        # Vrátí pozici (řádek, sloupec) ve zdrojovém kódu pro instrukci na indexu pc
+        # Pokud bytecode neobsahuje tabulku řádků, vrátí None
+        position = bisect_right(self.line_table, (pc, float('inf'), float('inf'))) - 1
+        if position < 0:
+            return None
+        _, line, column = self.line_table[position]
+        return (line, column)
+
+    def describe_location(self, pc):
+        # Popis místa v programu pro chybová hlášení, včetně řádku ve zdrojovém kódu (pokud je znám)
+        position = self.source_position(pc)
+        if position is None:
+            return f"instruction {pc}"
+        return f"instruction {pc} (line {position[0]}, column {position[1]})"
+
     def run(self):
         # Spustí vykonávání instrukcí
         self.pc = 0
@@ -69,15 +163,119 @@ class Interpreter:
             self.pc += 1 
             try:
                 self.execute_instruction(instruction)
-            except IndexError: # Stack underflow
-                print(f"Runtime Error: Stack underflow at instruction {current_pc}: {instruction}", file=sys.stderr)
-                sys.exit(1)
-            except KeyError as e: # Undefined variable/label
-                print(f"Runtime Error: Unknown variable or label {e} at instruction {current_pc}: {instruction}", file=sys.stderr)
-                sys.exit(1)
-            except Exception as e: # Jiné chyby
-                print(f"Runtime Error at instruction {current_pc} ({instruction}): {e}", file=sys.stderr)
-                sys.exit(1)
+            except Exception as e:
+                self.runtime_error(e, current_pc, instruction)
+
+    def is_finished(self):
+        # Program skončil, pokud je pc mimo rozsah instrukcí
+        return not (0 <= self.pc < len(self.instructions))
+
+    def run_slice(self, max_steps):
+        # Vykoná nejvýše max_steps instrukcí od aktuálního pc (bez resetu) a vrátí počet vykonaných
+        # Slouží pro běh s limity a pro střídání více programů; při InputPending skončí dřív
+        # a pc zůstane na instrukci read
+        instructions = self.instructions
+        steps = 0
+        while steps < max_steps and 0 <= self.pc < len(instructions):
+            instruction = instructions[self.pc]
+            current_pc = self.pc
+            self.pc += 1
+            try:
+                self.execute_instruction(instruction)
+            except InputPending:
+                self.pc = current_pc
+                break
+            except Exception as e:
+                self.runtime_error(e, current_pc, instruction)
+            steps += 1
+        return steps
+
+    def run_limited(self, max_instructions=None, time_limit=None, quantum=1000):
+        # Spustí program s limitem počtu instrukcí a/nebo času (v sekundách)
+        # Vrací dvojici (stav, počet vykonaných instrukcí), stav je 'finished',
+        # 'instruction_limit' nebo 'time_limit'. Čas se kontroluje vždy po quantum instrukcích.
+        self.pc = 0
+        executed = 0
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+        while True:
+            steps = quantum
+            if max_instructions is not None:
+                steps = min(quantum, max_instructions - executed)
+                if steps <= 0:
+                    return ('finished' if self.is_finished() else 'instruction_limit'), executed
+
+            executed += self.run_slice(steps)
+            if self.is_finished():
+                return 'finished', executed
+            if deadline is not None and time.perf_counter() > deadline:
+                return 'time_limit', executed
+
+    def run_instrumented(self, stats):
+        # Spustí vykonávání instrukcí a sbírá statistiky do objektu ExecutionStats
+        # Jde o samostatnou smyčku, aby běžná smyčka v run() neměla žádnou režii navíc
+        self.pc = 0
+        instructions = self.instructions
+        instruction_counts = stats.start(len(instructions))
+        opcode_counts = stats.opcode_counts
+        variable_loads = stats.variable_loads
+        variable_saves = stats.variable_saves
+        opcode_time = stats.opcode_time if stats.timing else None
+        clock = stats.clock
+        max_stack_depth = stats.max_stack_depth
+        dispatch_count = 0
+
+        try:
+            while 0 <= self.pc < len(instructions):
+                instruction = instructions[self.pc]
+                current_pc = self.pc
+                opcode = instruction[0]
+
+                instruction_counts[current_pc] += 1
+                opcode_counts[opcode] = opcode_counts.get(opcode, 0) + 1
+                dispatch_count += 1
+                if opcode in ('load', 'inc', 'append'):
+                    variable_loads[instruction[1]] = variable_loads.get(instruction[1], 0) + 1
+                if opcode in ('save', 'tee', 'inc', 'append'):
+                    variable_saves[instruction[1]] = variable_saves.get(instruction[1], 0) + 1
+
+                self.pc += 1
+                try:
+                    if opcode_time is None:
+                        self.execute_instruction(instruction)
+                    else:
+                        started = clock()
+                        self.execute_instruction(instruction)
+                        opcode_time[opcode] = opcode_time.get(opcode, 0.0) + (clock() - started)
+                except Exception as e:
+                    self.runtime_error(e, current_pc, instruction)
+
+                if len(self.stack) > max_stack_depth:
+                    max_stack_depth = len(self.stack)
+        finally:
+            # Statistiky uložíme i v případě běhové chyby (sys.exit)
+            stats.dispatch_count += dispatch_count
+            stats.max_stack_depth = max_stack_depth
+            stats.finish()
+
+    def runtime_error(self, error, current_pc, instruction):
+        # Vypíše běhovou chybu s místem v programu a ukončí interpreter
+        if isinstance(error, IndexError): # Stack underflow
+            print(f"Runtime Error: Stack underflow at {self.describe_location(current_pc)}: {instruction}", file=sys.stderr)
+        elif isinstance(error, KeyError): # Undefined variable/label
+            print(f"Runtime Error: Unknown variable or label {error} at {self.describe_location(current_pc)}: {instruction}", file=sys.stderr)
+        else: # Jiné chyby
+            print(f"Runtime Error at {self.describe_location(current_pc)} ({instruction}): {error}", file=sys.stderr)
+        sys.exit(1)
+
+    def read_line(self):
+        # Načte jeden řádek vstupu, chová se stejně jako input() (bez konce řádku, EOFError na konci)
+        if self.input_stream is None:
+            return input()
+        line = self.input_stream.readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return line.rstrip('\n').rstrip('\r')
 
     def execute_instruction(self, instruction):
         # Zpracovává jednotlivé instrukce
@@ -123,20 +321,20 @@ class Interpreter:
                 raise IndexError("POP on empty stack")
             self.stack.pop()
 
+        # Instrukce dup - zduplikuje hodnotu na vrcholu zásobníku (opakovaný výraz hned za sebou)
+        elif opcode == 'dup':
+            if not self.stack:
+                raise IndexError("DUP on empty stack")
+            self.stack.append(self.stack[-1])
+
         # Instrukce load:
         elif opcode == 'load':
             # Očekáváme formát 'LOAD <var_name>'
             if len(args) != 1:
                 raise ValueError(f"Invalid LOAD format: {instruction}")
             
-            var_name = args[0]
-            
-            # Zkontrolujeme, zda je proměnná v paměti
-            if var_name not in self.memory:
-                 raise KeyError(var_name)
-        
-            # Pokud je v paměti, tak ji načteme na zásobník
-            self.stack.append(self.memory[var_name])
+            # Hodnotu z paměti načteme na zásobník, neznámá proměnná vyvolá KeyError
+            self.stack.append(self.memory[args[0]])
         
         # Instrukce save:
         elif opcode == 'save':
@@ -153,6 +351,38 @@ class Interpreter:
             value = self.stack.pop()
             self.memory[var_name] = value
 
+        # Instrukce tee - uloží vrchol zásobníku do proměnné, ale na zásobníku ho nechá
+        elif opcode == 'tee':
+            # Očekáváme formát 'TEE <var_name>'
+            if len(args) != 1:
+                raise ValueError(f"Invalid TEE format: {instruction}")
+            if not self.stack:
+                raise IndexError("TEE on empty stack")
+            self.memory[args[0]] = self.stack[-1]
+
+        # Instrukce append - připojí řetězec na vrcholu zásobníku k proměnné (s = s . x bez load/save)
+        # Proměnná tak drží Rope, který se spojí až při výpisu nebo porovnání
+        elif opcode == 'append':
+            # Očekáváme formát 'APPEND <var_name>'
+            if len(args) != 1:
+                raise ValueError(f"Invalid APPEND format: {instruction}")
+            if not self.stack:
+                raise IndexError("APPEND on empty stack")
+            value = self.stack.pop()
+            current = self.memory[args[0]]
+            if not (is_string(current) and is_string(value)):
+                raise TypeError(f"APPEND requires string operands, got {type(current)}, {type(value)}")
+            self.memory[args[0]] = concat(current, value)
+
+        # Instrukce inc - přičte číselnou konstantu k proměnné (x = x + c bez zásobníku)
+        elif opcode == 'inc':
+            # Očekáváme formát 'INC <var_name> <hodnota>', celé číslo nebo float podle zápisu
+            if len(args) != 2:
+                raise ValueError(f"Invalid INC format: {instruction}")
+            value_str = args[1]
+            value = int(value_str) if value_str.lstrip('-').isdigit() else float(value_str)
+            self.memory[args[0]] = self.memory[args[0]] + value
+
         # add, sub, mul, div - aritmetické operace
         elif opcode in ('add', 'sub', 'mul', 'div'):
             # Očekává se formát s jedným argumentem: 'ADD <type_code>'
@@ -260,11 +490,12 @@ class Interpreter:
             op1 = self.stack.pop()
 
             # Kontrola, že obě hodnoty jsou řetězce
-            if not (isinstance(op1, str) and isinstance(op2, str)):
+            if not (is_string(op1) and is_string(op2)):
                  raise TypeError(f"CONCAT requires string operands, got {type(op1)}, {type(op2)}")
             
             # Spojíme řetězce a vložíme výsledek zpět na zásobník
-            self.stack.append(op1 + op2)
+            # (dlouhé výsledky jako Rope, spojí se až při výpisu nebo porovnání)
+            self.stack.append(concat(op1, op2))
 
         # Instrukce Itof - konverze int na float
         elif opcode == 'itof':
@@ -335,7 +566,7 @@ class Interpreter:
                 # STRING:
                 elif type_code == 'S': 
                     # Kontrola, že oba operandy jsou řetězce
-                    if not (isinstance(op1, str) and isinstance(op2, str)):
+                    if not (is_string(op1) and is_string(op2)):
                          raise TypeError(f"EQ S requires string operands, got {type(op1)}, {type(op2)}")
                     
                     # Provádíme operaci EQ
@@ -448,6 +679,20 @@ class Interpreter:
                 # Pokud je label_num v self.labels, nastavíme pc na index labelu
                 self.pc = self.labels[label_num]
 
+        # Instrukce select - vybere jednu ze dvou hodnot podle podmínky (ternární výraz bez skoků)
+        elif opcode == 'select':
+            # Očekáváme formát 'SELECT <type_code>', zásobník: podmínka, hodnota pro true, hodnota pro false
+            if len(args) != 1:
+                raise ValueError(f"Invalid SELECT format: {instruction}")
+            if len(self.stack) < 3:
+                raise IndexError("SELECT requires three operands on the stack")
+            false_value = self.stack.pop()
+            true_value = self.stack.pop()
+            condition = self.stack.pop()
+            if not isinstance(condition, bool):
+                raise TypeError(f"SELECT requires a boolean condition, got {type(condition)}")
+            self.stack.append(true_value if condition else false_value)
+
         # Instrukce print
         elif opcode == 'print':
             # Očekáváme formát 'PRINT <num_values>'
@@ -481,7 +726,14 @@ class Interpreter:
                 else:
                     output.append(str(val))
             
-            print("".join(output))
+            print("".join(output), file=self.output_stream)
+
+        # Instrukce emit - vypíše předem vypočítaný blok výstupu (z částečného vyhodnocení při překladu)
+        elif opcode == 'emit':
+            # Očekáváme formát 'EMIT "<text v JSON zápisu>"', text obsahuje i konce řádků
+            if len(args) != 1:
+                raise ValueError(f"Invalid EMIT format: {instruction}")
+            print(json.loads(args[0]), end='', file=self.output_stream)
 
         # Instrukce read
         elif opcode == 'read':
@@ -493,7 +745,7 @@ class Interpreter:
             type_code = args[0]
             
             try:
-                line = input() # Načteme řádek z konzole
+                line = self.read_line() # Načteme řádek z konzole (nebo ze vstupního proudu)
 
                 value = None
                 
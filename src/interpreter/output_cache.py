@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Cache výstupu deterministických programů
+# Program, který nevykoná read (Interpreter.output_is_deterministic), má výstup daný jen
+# vygenerovaným kódem. Jeho celý stdout se uloží pod otiskem kódu (sha256) a opakované spuštění
+# stejného kódu výstup jen vypíše. Ukládá se jen výstup programu, který doběhl bez chyby.
+#
+# Dvě úrovně, obě s vyřazováním nejdéle nepoužitých záznamů (LRU):
+#   paměť   OrderedDict otisk -> výstup, omezený počtem záznamů a součtem velikostí
+#   disk    soubory <otisk>.out v adresáři; pořadí použití určuje čas změny souboru,
+#           který se při zásahu obnoví
+# Které programy se ukládají, omezují min_run_time (kratší běh se nevyplatí ukládat)
+# a max_output_size (větší výstup se neukládá ani nezachytává celý).
+# Proměnná prostředí PJP_OUTPUT_CACHE určuje výchozí adresář diskové úrovně.
+
+import hashlib
+import io
+import os
+import tempfile
+from collections import OrderedDict
+
+# Mění se se změnou sémantiky interpretru, starší záznamy pak nebudou nalezeny
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = os.environ.get('PJP_OUTPUT_CACHE',
+                                         os.path.join(os.path.expanduser('~'), '.cache', 'pjp', 'output'))
+
+def bytecode_key(bytecode):
+    # Otisk vygenerovaného kódu (str nebo bytes) spolu s verzí cache
+    if isinstance(bytecode, str):
+        bytecode = bytecode.encode('utf-8')
+    digest = hashlib.sha256(f"output cache {CACHE_VERSION}\n".encode('utf-8'))
+    digest.update(bytecode)
+    return digest.hexdigest()
+
+def file_key(path, chunk_size=64 * 1024):
+    # Otisk souboru s vygenerovaným kódem, soubor se čte po částech
+    digest = hashlib.sha256(f"output cache {CACHE_VERSION}\n".encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class CapturingOutput:
+    # Výstupní proud, který text předává dál (target) a zároveň ho zachytává pro cache
+    # Po překročení limit znaků se zachytávání vzdá (výstup by se stejně neuložil)
+    def __init__(self, target, limit=None):
+        self.target = target
+        self.limit = limit
+        self.buffer = io.StringIO()
+        self.size = 0
+        self.overflowed = False
+
+    def write(self, text):
+        if not self.overflowed:
+            self.size += len(text)
+            if self.limit is not None and self.size > self.limit:
+                self.overflowed = True
+                self.buffer = None
+            else:
+                self.buffer.write(text)
+        return self.target.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def getvalue(self):
+        # Zachycený text, nebo None po překročení limitu
+        return None if self.overflowed else self.buffer.getvalue()
+
+class OutputCache:
+    def __init__(self, directory=None, max_entries=64, max_memory_size=16 * 1024 * 1024,
+                 max_disk_size=256 * 1024 * 1024, max_output_size=1024 * 1024, min_run_time=0.0):
+        self.directory = directory # None = jen paměťová úroveň
+        self.max_entries = max_entries
+        # Velikosti jsou ve znacích výstupu
+        self.max_memory_size = max_memory_size
+        self.max_disk_size = max_disk_size
+        self.max_output_size = max_output_size
+        self.min_run_time = min_run_time # v sekundách
+        self.entries = OrderedDict() # otisk -> výstup, naposledy použitý na konci
+        self.memory_size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        # Vrátí uložený výstup, nebo None
+        output = self.entries.get(key)
+        if output is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return output
+        output = self._read_disk(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.disk_hits += 1
+        self._remember(key, output)
+        return output
+
+    def should_store(self, output, run_time):
+        return output is not None and len(output) <= self.max_output_size and run_time >= self.min_run_time
+
+    def put(self, key, output, run_time):
+        # Uloží výstup programu, pokud splňuje limity; vrací True, pokud se uložil
+        if not self.should_store(output, run_time):
+            return False
+        self._remember(key, output)
+        self._write_disk(key, output)
+        return True
+
+    def _remember(self, key, output):
+        size = len(output)
+        if size > self.max_memory_size:
+            return
+        if key in self.entries:
+            self.memory_size -= len(self.entries.pop(key))
+        self.entries[key] = output
+        self.memory_size += size
+        while len(self.entries) > self.max_entries or self.memory_size > self.max_memory_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.memory_size -= len(evicted)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.out")
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                output = f.read()
+            os.utime(path) # Záznam je nově naposledy použitý
+        except OSError:
+            return None
+        return output
+
+    def _write_disk(self, key, output):
+        # Zápis přes dočasný soubor a os.replace, souběžný čtenář nikdy neuvidí polovinu záznamu
+        # Chyba zápisu cache nesmí shodit běh programu, záznam se pak jen neuloží
+        if self.directory is None:
+            return
+        temporary_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(descriptor, 'w', encoding='utf-8', newline='') as f:
+                f.write(output)
+            os.replace(temporary_path, self._path(key))
+            temporary_path = None
+            self._evict_disk()
+        except OSError:
+            if temporary_path is not None and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def _evict_disk(self):
+        # Smaže nejdéle nepoužité záznamy, dokud součet velikostí nepřekračuje max_disk_size
+        files = []
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.out'):
+                    info = entry.stat()
+                    files.append((info.st_mtime, info.st_size, entry.path))
+                    total += info.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
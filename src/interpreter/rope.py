@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Řetězcové hodnoty Interpreter s odloženým spojováním (rope)
+# concat, jehož výsledek má alespoň ROPE_MIN_LENGTH znaků, nevytváří nový řetězec, ale Rope:
+#   chunks  n-tice dlouhých částí s nerostoucími délkami
+#   tail    krátký konec (méně než ROPE_MIN_LENGTH znaků), ke kterému se připojuje
+# Připojení ke Rope zkopíruje jen tail; když tail dosáhne ROPE_MIN_LENGTH, přesune se do chunks
+# a poslední části se slučují, dokud je poslední alespoň tak dlouhá jako předposlední (jako
+# přenos u binárního čítače). Částí je tak nejvýše log2(délka) a hromadění s = s . x v cyklu
+# trvá celkem O(n log n) místo O(n^2). Celý řetězec se spojí až při prvním čtení (print, eq S)
+# a zapamatuje se. Rope je neměnná hodnota (každé spojení vytvoří novou), takže t = s; s = s . x
+# hodnotu t nezmění. Kratší výsledky zůstávají obyčejným str.
+
+ROPE_MIN_LENGTH = 4096
+
+class Rope:
+    __slots__ = ('chunks', 'tail', 'length', 'text')
+
+    def __init__(self, chunks, tail, length):
+        self.chunks = chunks
+        self.tail = tail
+        self.length = length
+        self.text = None # Spojený řetězec po prvním čtení
+
+    def __str__(self):
+        if self.text is None:
+            self.text = ''.join(self.chunks) + self.tail
+            self.chunks, self.tail = (self.text,), ''
+        return self.text
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if isinstance(other, Rope):
+            return self.length == other.length and str(self) == str(other)
+        if isinstance(other, str):
+            return self.length == len(other) and str(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"Rope({str(self)!r})"
+
+def is_string(value):
+    return isinstance(value, (str, Rope))
+
+def add_chunk(chunks, chunk):
+    # Nová n-tice částí s připojenou částí (sloučení jako přenos u binárního čítače)
+    chunks = list(chunks)
+    chunks.append(chunk)
+    while len(chunks) > 1 and len(chunks[-1]) >= len(chunks[-2]):
+        last = chunks.pop()
+        chunks[-1] += last
+    return tuple(chunks)
+
+def concat(left, right):
+    # Spojení dvou řetězcových hodnot (str nebo Rope); výsledek je str nebo Rope
+    length = len(left) + len(right)
+    if type(left) is str:
+        if length < ROPE_MIN_LENGTH and type(right) is str:
+            return left + right
+        chunks, tail = (), left
+    else:
+        chunks, tail = left.chunks, left.tail
+    tail += str(right)
+    if len(tail) >= ROPE_MIN_LENGTH:
+        chunks, tail = add_chunk(chunks, tail), ''
+    return Rope(chunks, tail, length)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Typovaná paměť proměnných pro zásobníkový Interpreter
+# Místo slovníku jméno -> objekt se hodnoty ukládají podle deklarovaného typu ze sekce .variables:
+#   float       array('d'), 8 bajtů na proměnnou bez samostatného objektu float
+#   int         array('q'), dokud se hodnota vejde do 64 bitů
+#   bool/string seznam objektů
+# Rozložení (jméno -> úložiště, index) se sestaví jednou pro program a sdílí se mezi všemi
+# instancemi; každá instance má jen vlastní pole hodnot.
+#
+# Hodnota, kterou typované pole neudrží, proměnnou povýší do seznamu objektů:
+#   int mimo 64bitový rozsah (OverflowError při zápisu do array('q'))
+#   float proměnná s hodnotou jiného typu (výsledek ternárního operátoru se nepřevádí,
+#   float proměnná tak může držet int a vypsat se jako '5')
+# Povýšení zkopíruje rozložení instance (sdílené rozložení se nemění) a platí do konce běhu.
+
+from array import array
+
+FLOAT_STORAGE = 0
+INT_STORAGE = 1
+OBJECT_STORAGE = 2
+
+# Výchozí hodnoty odpovídají inicializaci v deklaraci (push I 0, push F 0.0, ...)
+DEFAULT_VALUES = {'B': False, 'S': ""}
+
+class MemoryLayout:
+    # Rozložení proměnných podle typů; variables je seznam (jméno, typový kód) ze sekce .variables
+    def __init__(self, variables):
+        self.slots = {} # jméno -> (úložiště, index)
+        self.object_defaults = []
+        float_count = int_count = 0
+        for name, type_code in variables:
+            if name in self.slots: # Opakovaná deklarace stejného jména sdílí jedno místo
+                continue
+            if type_code == 'F':
+                self.slots[name] = (FLOAT_STORAGE, float_count)
+                float_count += 1
+            elif type_code == 'I':
+                self.slots[name] = (INT_STORAGE, int_count)
+                int_count += 1
+            else:
+                self.slots[name] = (OBJECT_STORAGE, len(self.object_defaults))
+                self.object_defaults.append(DEFAULT_VALUES.get(type_code))
+        self.float_count = float_count
+        self.int_count = int_count
+
+class TypedMemory:
+    # Náhrada slovníku Interpreter.memory (memory[jméno], memory[jméno] = hodnota, jméno in memory)
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.slots = layout.slots # Sdílené, při prvním povýšení se zkopíruje
+        self.storage = (array('d', bytes(8 * layout.float_count)),
+                        array('q', bytes(8 * layout.int_count)),
+                        list(layout.object_defaults))
+        self.promotions = 0 # Počet proměnných přesunutých do seznamu objektů
+
+    def __getitem__(self, name):
+        storage, index = self.slots[name]
+        return self.storage[storage][index]
+
+    def __setitem__(self, name, value):
+        slot = self.slots.get(name)
+        if slot is None: # Proměnná, která není v .variables
+            self.promote(name, value)
+            return
+        storage, index = slot
+        if storage == OBJECT_STORAGE:
+            self.storage[OBJECT_STORAGE][index] = value
+        elif storage == FLOAT_STORAGE:
+            if type(value) is float:
+                self.storage[FLOAT_STORAGE][index] = value
+            else:
+                self.promote(name, value)
+        elif type(value) is int:
+            try:
+                self.storage[INT_STORAGE][index] = value
+            except OverflowError:
+                self.promote(name, value)
+        else:
+            self.promote(name, value)
+
+    def __contains__(self, name):
+        return name in self.slots
+
+    def promote(self, name, value):
+        # Přesune proměnnou do seznamu objektů (místo v typovaném poli zůstane nevyužité)
+        if self.slots is self.layout.slots:
+            self.slots = dict(self.slots)
+        objects = self.storage[OBJECT_STORAGE]
+        self.slots[name] = (OBJECT_STORAGE, len(objects))
+        objects.append(value)
+        self.promotions += 1
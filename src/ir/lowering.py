@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Převod parse tree z ANTLR na IR (src/ir/nodes.py)
+# lower() projde hotový strom a vrátí Program. StatementLowering dělá totéž už během
+# parsování: každý příkaz nejvyšší úrovně převede hned, jak ho parser dokončí, a jeho
+# podstrom odpojí, takže celý parse tree není v paměti nikdy najednou.
+# release_parse_tree() nakonec rozpojí zbytek stromu, tokeny, lexer a parser, aby je
+# uvolnilo počítání referencí hned a nečekalo se na cyklický garbage collector
+# (kontexty odkazují na rodiče i potomky, lexer a parser na své simulátory a ty zpět na ně).
+
+from antlr4.tree.Tree import ParseTreeListener
+from src.parser.LanguageParser import LanguageParser
+from src.parser.LanguageVisitor import LanguageVisitor
+from src.ir import nodes
+
+class Lowering(LanguageVisitor):
+    # Visitor, který z každého kontextu vytvoří odpovídající uzel IR
+    def visitProgram(self, ctx):
+        statements = [self.visit(statement) for statement in ctx.statement()]
+        return nodes.Program(statements, ctx.start.line, ctx.start.column)
+
+    def visitStatement(self, ctx):
+        # Obalový kontext, uzel vytvoří jeho jediný potomek
+        return self.visit(ctx.getChild(0))
+
+    def visitEmptyStatement(self, ctx):
+        return nodes.EmptyStatement(ctx.start.line, ctx.start.column)
+
+    def _identifiers(self, variable_list):
+        return [nodes.Identifier(var.getText(), var.symbol.line, var.symbol.column)
+                for var in variable_list.ID()]
+
+    def visitDeclarationStatement(self, ctx):
+        return nodes.DeclarationStatement(ctx.type_().getText(), self._identifiers(ctx.variableList()),
+                                          ctx.start.line, ctx.start.column)
+
+    def visitExpressionStatement(self, ctx):
+        return nodes.ExpressionStatement(self.visit(ctx.expression()), ctx.start.line, ctx.start.column)
+
+    def visitReadStatement(self, ctx):
+        return nodes.ReadStatement(self._identifiers(ctx.variableList()), ctx.start.line, ctx.start.column)
+
+    def visitWriteStatement(self, ctx):
+        expressions = [self.visit(expr) for expr in ctx.expressionList().expression()]
+        return nodes.WriteStatement(expressions, ctx.start.line, ctx.start.column)
+
+    def visitBlockStatement(self, ctx):
+        statements = [self.visit(statement) for statement in ctx.statement()]
+        return nodes.BlockStatement(statements, ctx.start.line, ctx.start.column)
+
+    def visitIfStatement(self, ctx):
+        statements = ctx.statement()
+        else_statement = self.visit(statements[1]) if len(statements) > 1 else None
+        return nodes.IfStatement(self.visit(ctx.expression()), self.visit(statements[0]), else_statement,
+                                 ctx.start.line, ctx.start.column)
+
+    def visitWhileStatement(self, ctx):
+        return nodes.WhileStatement(self.visit(ctx.expression()), self.visit(ctx.statement()),
+                                    ctx.start.line, ctx.start.column)
+
+    def visitForStatement(self, ctx: LanguageParser.ForStatementContext):
+        init = self.visit(ctx.init) if ctx.init else None
+        cond = self.visit(ctx.cond) if ctx.cond else None
+        step = self.visit(ctx.step) if ctx.step else None
+        return nodes.ForStatement(init, cond, step, self.visit(ctx.statement()), ctx.start.line, ctx.start.column)
+
+    # -------------------------------------------------------------------------------
+    # Výrazy
+
+    def visitLiteralExpr(self, ctx):
+        literal = ctx.literal()
+        if literal.IntegerLiteral() is not None:
+            kind = 'int'
+        elif literal.FloatLiteral() is not None:
+            kind = 'float'
+        elif literal.BooleanLiteral() is not None:
+            kind = 'bool'
+        else:
+            kind = 'string'
+        return nodes.LiteralExpr(kind, literal.getText(), ctx.start.line, ctx.start.column)
+
+    def visitVariableExpr(self, ctx):
+        return nodes.VariableExpr(ctx.ID().getText(), ctx.start.line, ctx.start.column)
+
+    def visitParenExpr(self, ctx):
+        return nodes.ParenExpr(self.visit(ctx.expression()), ctx.start.line, ctx.start.column)
+
+    def visitNotExpr(self, ctx):
+        return nodes.NotExpr(self.visit(ctx.expression()), ctx.start.line, ctx.start.column)
+
+    def visitUnaryMinusExpr(self, ctx):
+        return nodes.UnaryMinusExpr(self.visit(ctx.expression()), ctx.start.line, ctx.start.column)
+
+    def _binary(self, node_class, ctx):
+        return node_class(ctx.getChild(1).getText(), self.visit(ctx.expression(0)), self.visit(ctx.expression(1)),
+                          ctx.start.line, ctx.start.column)
+
+    def visitMultiplicativeExpr(self, ctx):
+        return self._binary(nodes.MultiplicativeExpr, ctx)
+
+    def visitAdditiveExpr(self, ctx):
+        return self._binary(nodes.AdditiveExpr, ctx)
+
+    def visitRelationalExpr(self, ctx):
+        return self._binary(nodes.RelationalExpr, ctx)
+
+    def visitEqualityExpr(self, ctx):
+        return self._binary(nodes.EqualityExpr, ctx)
+
+    def visitAndExpr(self, ctx):
+        return self._binary(nodes.AndExpr, ctx)
+
+    def visitOrExpr(self, ctx):
+        return self._binary(nodes.OrExpr, ctx)
+
+    def visitTernaryExpr(self, ctx: LanguageParser.TernaryExprContext):
+        return nodes.TernaryExpr(self.visit(ctx.cond), self.visit(ctx.th), self.visit(ctx.el),
+                                 ctx.start.line, ctx.start.column)
+
+    def visitAssignmentExpr(self, ctx):
+        return nodes.AssignmentExpr(ctx.ID().getText(), self.visit(ctx.expression()),
+                                    ctx.start.line, ctx.start.column)
+
+def lower(parse_tree):
+    # Převede parse tree (ProgramContext bez syntaktických chyb) na nodes.Program
+    return Lowering().visit(parse_tree)
+
+class StatementLowering(ParseTreeListener):
+    # Parse listener (parser.addParseListener), který převádí příkazy nejvyšší úrovně na IR
+    # během parsování. Po první syntaktické chybě převod vypne, strom se pak už nepoužije.
+    def __init__(self, error_listener):
+        self.error_listener = error_listener
+        self.lowering = Lowering()
+        self.statements = []
+        self.tree_nodes = 0 # Počet uzlů parse tree (pravidla i terminály) pro statistiky
+
+    def visitTerminal(self, node):
+        self.tree_nodes += 1
+
+    def visitErrorNode(self, node):
+        self.tree_nodes += 1
+
+    def exitEveryRule(self, ctx):
+        self.tree_nodes += 1
+        parent = ctx.parentCtx
+        if not isinstance(ctx, LanguageParser.StatementContext) or not isinstance(parent, LanguageParser.ProgramContext):
+            return
+        if self.error_listener.has_errors():
+            return
+        self.statements.append(self.lowering.visit(ctx))
+        # Příkaz je posledním potomkem programu; odpojíme ho i s podstromem
+        # (parentCtx samotného příkazu zůstává, parser ho po návratu z pravidla ještě čte)
+        parent.children.pop()
+        _unlink_children(ctx)
+
+    def program(self, parse_tree):
+        # Sestaví nodes.Program z už převedených příkazů
+        return nodes.Program(self.statements, parse_tree.start.line, parse_tree.start.column)
+
+def count_nodes(node):
+    # Spočítá uzly IR bez rekurze (pro statistiky překladu)
+    count = 0
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        count += 1
+        for name in _child_slots(type(item)):
+            child = getattr(item, name)
+            if isinstance(child, list):
+                pending.extend(child)
+            elif isinstance(child, nodes.Node):
+                pending.append(child)
+    return count
+
+_CHILD_SLOTS = {}
+
+def _child_slots(node_class):
+    # Jména slotů, které mohou obsahovat podřízené uzly (vše kromě pozice)
+    slots = _CHILD_SLOTS.get(node_class)
+    if slots is None:
+        slots = tuple(name for klass in node_class.__mro__ for name in getattr(klass, '__slots__', ())
+                      if name not in ('line', 'column'))
+        _CHILD_SLOTS[node_class] = slots
+    return slots
+
+def _unlink_children(ctx):
+    # Rozpojí odkazy rodič <-> potomek v podstromu pod ctx (ctx.parentCtx zůstává)
+    pending = list(ctx.children or ())
+    ctx.children = None
+    while pending:
+        node = pending.pop()
+        children = getattr(node, 'children', None)
+        if children:
+            pending.extend(children)
+            node.children = None
+        node.parentCtx = None
+        if getattr(node, 'exception', None) is not None:
+            node.exception = None # Výjimka z obnovy po syntaktické chybě drží rámce i tokeny
+
+def release_parse_tree(parse_tree, parser):
+    # Rozpojí parse tree a objekty ANTLR, které na něj nebo na vstup odkazují
+    # Po návratu drží tokeny a zdrojový text jen případné další odkazy volajícího
+    _unlink_children(parse_tree)
+    parse_tree.exception = None
+
+    token_stream = parser.getTokenStream()
+    lexer = token_stream.tokenSource
+    token_stream.tokens = []
+    # Lexer a parser jsou v cyklu se svými simulátory, proto jim odebereme vstup ručně
+    lexer._input = None
+    lexer._tokenFactorySourcePair = None
+    lexer._token = None # Poslední token (EOF) odkazuje na vstupní proud
+    parser._input = None
+    parser._ctx = None
+    parser._interp._input = None
+    parser._interp._outerContext = None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Kompaktní mezireprezentace (IR) programu
+# Parse tree z ANTLR se po syntaktické analýze jednou převede na tyto uzly (src/ir/lowering.py)
+# a TypeChecker i CodeGenerator pak pracují jen s nimi. Uzel drží jen to, co další fáze
+# potřebují: operátor, podvýrazy, text literálu nebo jméno proměnné a pozici (řádek, sloupec)
+# svého prvního tokenu. Parse tree, tokeny a vstupní proud se tak mohou hned uvolnit.
+#
+# Pozice uzlu odpovídá ctx.start původního kontextu, takže chybová hlášení i tabulka
+# řádků vygenerovaného kódu zůstávají stejné. Obalové kontexty (statement, expressionList,
+# variableList) se nepřevádějí, jejich pozice je stejná jako pozice jejich obsahu.
+
+class Node:
+    # Společný předek všech uzlů; accept() zavolá metodu visit<Jméno třídy> visitoru
+    __slots__ = ('line', 'column')
+
+    def __init__(self, line, column):
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return getattr(visitor, self.visit_method)(self)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visit_method = f"visit{cls.__name__}"
+
+class IRVisitor:
+    # Základ visitorů nad IR (obdoba LanguageVisitor pro parse tree)
+    def visit(self, node):
+        return node.accept(self)
+
+# -------------------------------------------------------------------------------
+# Příkazy
+
+class Program(Node):
+    __slots__ = ('statements',)
+
+    def __init__(self, statements, line, column):
+        super().__init__(line, column)
+        self.statements = statements
+
+class EmptyStatement(Node):
+    __slots__ = ()
+
+class Identifier(Node):
+    # Jméno proměnné v deklaraci nebo v příkazu read (s vlastní pozicí pro chybová hlášení)
+    __slots__ = ('name',)
+
+    def __init__(self, name, line, column):
+        super().__init__(line, column)
+        self.name = name
+
+class DeclarationStatement(Node):
+    __slots__ = ('type_name', 'identifiers')
+
+    def __init__(self, type_name, identifiers, line, column):
+        super().__init__(line, column)
+        self.type_name = type_name # 'int', 'float', 'bool' nebo 'string'
+        self.identifiers = identifiers # Seznam Identifier
+
+class ExpressionStatement(Node):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, line, column):
+        super().__init__(line, column)
+        self.expression = expression
+
+class ReadStatement(Node):
+    __slots__ = ('identifiers',)
+
+    def __init__(self, identifiers, line, column):
+        super().__init__(line, column)
+        self.identifiers = identifiers
+
+class WriteStatement(Node):
+    __slots__ = ('expressions',)
+
+    def __init__(self, expressions, line, column):
+        super().__init__(line, column)
+        self.expressions = expressions
+
+class BlockStatement(Node):
+    __slots__ = ('statements',)
+
+    def __init__(self, statements, line, column):
+        super().__init__(line, column)
+        self.statements = statements
+
+class IfStatement(Node):
+    __slots__ = ('condition', 'then_statement', 'else_statement')
+
+    def __init__(self, condition, then_statement, else_statement, line, column):
+        super().__init__(line, column)
+        self.condition = condition
+        self.then_statement = then_statement
+        self.else_statement = else_statement # None, pokud if nemá else
+
+class WhileStatement(Node):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body, line, column):
+        super().__init__(line, column)
+        self.condition = condition
+        self.body = body
+
+class ForStatement(Node):
+    __slots__ = ('init', 'cond', 'step', 'body')
+
+    def __init__(self, init, cond, step, body, line, column):
+        super().__init__(line, column)
+        self.init = init # Výrazy init, cond a step mohou chybět (None)
+        self.cond = cond
+        self.step = step
+        self.body = body
+
+# -------------------------------------------------------------------------------
+# Výrazy
+
+class LiteralExpr(Node):
+    __slots__ = ('kind', 'text')
+
+    def __init__(self, kind, text, line, column):
+        super().__init__(line, column)
+        self.kind = kind # 'int', 'float', 'bool' nebo 'string'
+        self.text = text # Text tokenu beze změny (řetězec včetně uvozovek)
+
+class VariableExpr(Node):
+    __slots__ = ('name',)
+
+    def __init__(self, name, line, column):
+        super().__init__(line, column)
+        self.name = name
+
+class ParenExpr(Node):
+    # Závorky se zachovávají kvůli pozici uzlu (začíná na '(') a textu výrazu
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, line, column):
+        super().__init__(line, column)
+        self.expression = expression
+
+class NotExpr(Node):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, line, column):
+        super().__init__(line, column)
+        self.expression = expression
+
+class UnaryMinusExpr(Node):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, line, column):
+        super().__init__(line, column)
+        self.expression = expression
+
+class BinaryExpr(Node):
+    # Binární výraz; konkrétní třída určuje skupinu operátorů, operator je jejich text
+    __slots__ = ('operator', 'left', 'right')
+
+    def __init__(self, operator, left, right, line, column):
+        super().__init__(line, column)
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+class MultiplicativeExpr(BinaryExpr):
+    __slots__ = () # * / %
+
+class AdditiveExpr(BinaryExpr):
+    __slots__ = () # + - .
+
+class RelationalExpr(BinaryExpr):
+    __slots__ = () # < >
+
+class EqualityExpr(BinaryExpr):
+    __slots__ = () # == !=
+
+class AndExpr(BinaryExpr):
+    __slots__ = () # &&
+
+class OrExpr(BinaryExpr):
+    __slots__ = () # ||
+
+class TernaryExpr(Node):
+    __slots__ = ('cond', 'th', 'el')
+
+    def __init__(self, cond, th, el, line, column):
+        super().__init__(line, column)
+        self.cond = cond
+        self.th = th
+        self.el = el
+
+class AssignmentExpr(Node):
+    __slots__ = ('name', 'expression')
+
+    def __init__(self, name, expression, line, column):
+        super().__init__(line, column)
+        self.name = name
+        self.expression = expression
+
+def is_boolean_literal(node):
+    # Výraz je přímo literál true nebo false (ne např. výraz v závorkách)
+    return isinstance(node, LiteralExpr) and node.kind == 'bool'
+
+def source_text(node):
+    # Text výrazu složený z textů jeho tokenů bez mezer (jako ctx.getText() v ANTLR)
+    parts = []
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, LiteralExpr):
+            parts.append(item.text)
+        elif isinstance(item, VariableExpr):
+            parts.append(item.name)
+        elif isinstance(item, ParenExpr):
+            pending.extend((')', item.expression, '('))
+        elif isinstance(item, NotExpr):
+            pending.extend((item.expression, '!'))
+        elif isinstance(item, UnaryMinusExpr):
+            pending.extend((item.expression, '-'))
+        elif isinstance(item, BinaryExpr):
+            pending.extend((item.right, item.operator, item.left))
+        elif isinstance(item, TernaryExpr):
+            pending.extend((item.el, ':', item.th, '?', item.cond))
+        elif isinstance(item, AssignmentExpr):
+            pending.extend((item.expression, '=', item.name))
+    return ''.join(parts)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Algebraické zjednodušení výrazů ve vygenerovaném kódu
+# Pravidla zachovávají přesně chování Interpreter včetně typů výsledků:
+#   konstanty       operace nad konstantami se spočítají při překladu (vyhodnocuje je přímo
+#                   Interpreter); operace, která by skončila chybou (dělení nulou), zůstane
+#   identity        x + 0, x - 0, x * 1, 1 * x, x / 1 (int), x . "", "" . x, b && true,
+#                   b || false se nahradí samotným x
+#   dvojí negace    -(-x) a !!b se odstraní
+#   select          s konstantní podmínkou nebo stejnými větvemi se nahradí vybranou větví
+#   násobení 2      x * 2 se nahradí dup; add
+#   inkrement       x = x + c a x = x - c (c číselná konstanta) se nahradí instrukcí inc x c,
+#                   přiřazení x = x (zbylé po x = x + 0) se odstraní
+# U float operací (x - 0.0, x * 1.0, x / 1.0, x * 2.0) musí být x prokazatelně float: proměnná
+# typu float může kvůli ternárnímu výrazu s int větví obsahovat int a 5 * 1.0 vypíše 5.0.
+# Proměnná je prokazatelně float, pokud se do ní ukládají jen prokazatelně float hodnoty.
+# x + 0.0 se nezjednodušuje, pro x = -0.0 je výsledek 0.0.
+
+import io
+import math
+from src.interpreter.interpreter import Interpreter
+from src.optimizer.cfg import ControlFlowGraph, block_expressions, load_program, parse_instruction, store_program
+from src.optimizer.opcodes import PURE_OPCODES, VALUE_OPCODES, stack_effect
+from src.optimizer.partial_evaluator import constant_instruction
+
+def produces_float(instruction, operand_floats, float_variables):
+    # Je hodnota, kterou instrukce vytvoří, vždy float?
+    opcode = instruction[0]
+    if opcode in ('push', 'read'):
+        return instruction[1] == 'F'
+    if opcode == 'load':
+        return instruction[1] in float_variables
+    if opcode == 'itof' or instruction == ['div', 'F']:
+        return True
+    if opcode in ('add', 'sub', 'mul') and instruction[1] == 'F':
+        return any(operand_floats)
+    if opcode in ('uminus', 'dup', 'tee'):
+        return all(operand_floats)
+    if opcode == 'select':
+        return all(operand_floats[1:])
+    return False
+
+def operand_floats(operands, is_float):
+    return [operand is not None and is_float[operand[1] - 1] for operand in operands]
+
+def float_variables(instructions, variables):
+    # Proměnné typu float, do kterých se ukládají jen prokazatelně float hodnoty
+    # (největší pevný bod: vychází se ze všech a odebírají se proměnné s jiným uložením)
+    floats = set(name for name, type_code in variables if type_code == 'F')
+    cfg = ControlFlowGraph(instructions)
+    changed = True
+    while changed:
+        changed = False
+        for block in cfg.blocks:
+            is_float = {}
+            for index, operands, _ in block_expressions(instructions, block):
+                instruction = instructions[index]
+                floats_in = operand_floats(operands, is_float)
+                is_float[index] = produces_float(instruction, floats_in, floats)
+                if instruction[0] in ('save', 'tee') and instruction[1] in floats and not floats_in[0]:
+                    floats.discard(instruction[1])
+                    changed = True
+    return floats
+
+def constant_operand(instructions, operand):
+    # Instrukce push, pokud je operand jedinou konstantou
+    if operand is not None and operand[1] - operand[0] == 1 and instructions[operand[0]][0] == 'push':
+        return instructions[operand[0]]
+    return None
+
+def complete_expression(instructions, operand):
+    # Vytvoří instrukce rozsahu operandu samy jednu hodnotu? block_expressions pro výraz, jehož
+    # operandy nenavazují (např. x > (x = 5)), zaznamená jen jeho poslední instrukci
+    depth = 0
+    for instruction in instructions[operand[0]:operand[1]]:
+        popped, pushed = stack_effect(instruction)
+        if popped > depth:
+            return False
+        depth += pushed - popped
+    return depth == 1
+
+def numeric_value(constant):
+    if constant[1] == 'I':
+        return int(constant[2])
+    if constant[1] == 'F':
+        return float(constant[2])
+    return None
+
+def simplify(instructions, index, operands, is_float, evaluator):
+    # Úpravy (index -> náhradní instrukce) pro výraz končící instrukcí index a druh úpravy, nebo None
+    instruction = instructions[index]
+    opcode = instruction[0]
+    constants = [constant_operand(instructions, operand) for operand in operands]
+
+    if opcode in VALUE_OPCODES and operands and None not in constants:
+        evaluator.stack = []
+        try:
+            for constant in constants:
+                evaluator.execute_instruction(constant)
+            evaluator.execute_instruction(instruction)
+        except Exception:
+            return None
+        folded = constant_instruction(evaluator.stack[-1])
+        if folded is None:
+            return None
+        edits = dict((operand[0], []) for operand in operands)
+        edits[index] = [parse_instruction(folded)]
+        return edits, 'folded_constants'
+
+    if opcode in ('uminus', 'not') and operands[0][1] - operands[0][0] > 1 and instructions[index - 1] == instruction:
+        return {index - 1: [], index: []}, 'simplified_operations'
+
+    if opcode == 'select' and None not in operands and all(complete_expression(instructions, operand)
+                                                           for operand in operands):
+        # Konstantní podmínka nebo stejné větve: zůstane jen vybraná větev (větve jsou čisté výpočty)
+        condition, true_value, false_value = operands
+        if constants[0] is not None:
+            dropped = false_value if constants[0][2].lower() == 'true' else true_value
+        elif instructions[true_value[0]:true_value[1]] == instructions[false_value[0]:false_value[1]]:
+            dropped = false_value
+        else:
+            return None
+        removed = list(range(*condition)) + list(range(*dropped)) + [index]
+        if any(instructions[position][0] not in PURE_OPCODES for position in removed[:-1]):
+            return None
+        return dict((position, []) for position in removed), 'simplified_operations'
+
+    if len(operands) != 2:
+        return None
+    type_code = instruction[1] if len(instruction) > 1 else None
+    for position, constant in enumerate(constants):
+        if constant is None:
+            continue
+        other = operands[1 - position]
+        on_right = position == 1
+        other_float = is_float[other[1] - 1]
+        value = numeric_value(constant) if constant[1] == type_code else None
+        identity = False
+        if opcode == 'add' and type_code == 'I':
+            identity = value == 0
+        elif opcode == 'sub' and on_right:
+            if type_code == 'I':
+                identity = value == 0
+            elif type_code == 'F' and other_float:
+                identity = value == 0 and math.copysign(1.0, value) > 0
+        elif opcode in ('mul', 'div') and (on_right or opcode == 'mul'):
+            identity = value == 1 and (type_code == 'I' or other_float)
+        elif opcode == 'concat':
+            identity = constant == ['push', 'S', '""']
+        elif opcode in ('and', 'or'):
+            identity = constant[1] == 'B' and constant[2].lower() == ('true' if opcode == 'and' else 'false')
+        if identity:
+            return {operands[position][0]: [], index: []}, 'simplified_operations'
+        if opcode == 'mul' and value == 2 and (type_code == 'I' or other_float):
+            return {operands[position][0]: [], index: [['dup'], ['add', type_code]]}, 'simplified_operations'
+    return None
+
+def simplification_edits(instructions, floats, evaluator, counts):
+    cfg = ControlFlowGraph(instructions)
+    edits = {}
+    for block in cfg.blocks:
+        is_float = {}
+        touched = set() # Instrukce výrazů upravených v tomto kole; nadřazené výrazy počkají na další
+        for index, operands, start in block_expressions(instructions, block):
+            is_float[index] = produces_float(instructions[index], operand_floats(operands, is_float), floats)
+            if start is None or touched.intersection(range(start, index + 1)):
+                continue
+            result = simplify(instructions, index, operands, is_float, evaluator)
+            if result is not None:
+                expression_edits, kind = result
+                edits.update(expression_edits)
+                touched.update(range(start, index + 1))
+                counts[kind] += 1
+    return edits
+
+def increment_edits(instructions, counts):
+    # load x; push c; add; save x (a varianty c + x a x - c) -> inc x c, load x; save x se odstraní
+    edits = {}
+    index = 0
+    instructions = instructions + [['']] * 2 # load x; save x může být i na konci programu
+    while index + 3 < len(instructions):
+        first, second, operation, store = instructions[index:index + 4]
+        if first[0] == 'load' and second == ['save', first[1]]:
+            # x = x (např. po x = x + 0) nic nemění
+            edits.update(((index, []), (index + 1, [])))
+            counts['simplified_operations'] += 1
+            index += 2
+            continue
+        step = None
+        if store[0] == 'save' and operation[0] in ('add', 'sub') and operation[1] in ('I', 'F'):
+            name = store[1]
+            if first == ['load', name] and second[0] == 'push' and second[1] == operation[1]:
+                step = numeric_value(second)
+                if operation[0] == 'sub':
+                    step = -step
+            elif operation[0] == 'add' and second == ['load', name] and first[0] == 'push' and first[1] == operation[1]:
+                step = numeric_value(first)
+        if step is None:
+            index += 1
+            continue
+        edits[index] = [['inc', name, repr(step)]]
+        edits.update((following, []) for following in range(index + 1, index + 4))
+        counts['increments'] += 1
+        index += 4
+    return edits
+
+def apply_edits(instructions, positions, edits):
+    result, result_positions = [], []
+    for index, instruction in enumerate(instructions):
+        replacement = edits.get(index, [instruction])
+        result.extend(replacement)
+        result_positions.extend([positions[index]] * len(replacement))
+    return result, result_positions
+
+def simplify_expressions(emitter):
+    instructions, positions = load_program(emitter)
+    original_count = len(instructions)
+    counts = {'folded_constants': 0, 'simplified_operations': 0, 'increments': 0}
+    evaluator = Interpreter(io.StringIO(""), io.StringIO())
+    # Opakuje se, dokud se něco mění: po úpravě podvýrazu může jít zjednodušit i nadřazený výraz
+    while True:
+        edits = simplification_edits(instructions, float_variables(instructions, emitter.variables), evaluator, counts)
+        if not edits:
+            break
+        instructions, positions = apply_edits(instructions, positions, edits)
+    instructions, positions = apply_edits(instructions, positions, increment_edits(instructions, counts))
+
+    store_program(emitter, instructions, positions)
+    counts['removed_instructions'] = original_count - len(instructions)
+    return counts
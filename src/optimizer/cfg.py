@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Graf toku řízení (CFG) zásobníkového kódu a datové toky nad ním
+# Základní blok začíná na začátku programu, na každém návěští a za každým skokem;
+# končí před dalším takovým místem. Následníky určuje poslední instrukce bloku
+# (jmp jen cíl, fjmp cíl i další blok, jinak další blok). Analýzy sledují jen proměnné
+# (load/save), hodnoty na zásobníku mezi bloky (např. výsledek ternárního výrazu) neřeší.
+# Cykly se hledají jako přirozené cykly: zpětná hrana vede do bloku (hlavičky cyklu),
+# který dominuje jejímu zdroji.
+
+from src.optimizer.opcodes import JUMP_OPCODES, STORE_OPCODES, READ_OPCODES, stack_effect
+
+def parse_instruction(line):
+    # Rozdělí řádek kódu stejně jako Interpreter.load_lines (opcode a nejvýše dva argumenty)
+    parts = line.split(None, 2)
+    parts[0] = parts[0].lower()
+    if parts[0] == 'emit':
+        return ['emit', line.split(None, 1)[1]]
+    return parts
+
+def format_instruction(instruction):
+    return ' '.join(instruction)
+
+def load_program(emitter):
+    # Instrukce z ListEmitter jako seznamy [opcode, argumenty...] a jejich pozice
+    return [parse_instruction(line) for line in emitter.code], list(emitter.positions)
+
+def store_program(emitter, instructions, positions):
+    emitter.code = [format_instruction(instruction) for instruction in instructions]
+    emitter.positions = positions
+
+def block_expressions(instructions, block, remaining=None):
+    # Pro každou instrukci bloku vrátí (index, operandy, začátek): operandy jsou rozsahy
+    # (začátek, konec) podvýrazů, které instrukce odebere ze zásobníku (None = hodnota z jiného
+    # bloku), začátek je index první instrukce celého výrazu, nebo None, pokud operandy
+    # neleží souvisle těsně před instrukcí.
+    # dup nechá spodní kopii s rozsahem původního výrazu a horní kopie je samotné dup; výraz,
+    # který začíná instrukcí dup (potřebuje hodnotu pod sebou), nemá začátek, x; dup; add ano.
+    # Do seznamu remaining se doplní rozsahy hodnot, které na konci bloku zůstanou na zásobníku.
+    entries = []
+    for index in range(block.start, block.end):
+        instruction = instructions[index]
+        popped, pushed = stack_effect(instruction)
+        operands = entries[len(entries) - popped:] if popped else []
+        del entries[len(entries) - len(operands):]
+        operands = [None] * (popped - len(operands)) + operands
+        start = index
+        for operand in reversed(operands):
+            if operand is None or operand[1] != start:
+                start = None
+                break
+            start = operand[0]
+        if start is not None and start < index and instructions[start][0] == 'dup':
+            start = None
+        yield index, operands, start
+        if instruction[0] == 'dup':
+            entries.extend([operands[0], (index, index + 1)])
+        else:
+            entries.extend([(index if start is None else start, index + 1)] * pushed)
+    if remaining is not None:
+        remaining.extend(entries)
+
+class BasicBlock:
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start # Index první instrukce
+        self.end = end # Index za poslední instrukcí
+        self.successors = []
+        self.predecessors = []
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.start}..{self.end}, successors={[block.index for block in self.successors]})"
+
+class ControlFlowGraph:
+    def __init__(self, instructions):
+        self.instructions = instructions
+        self.labels = dict((int(instruction[1]), index) for index, instruction in enumerate(instructions)
+                           if instruction[0] == 'label')
+        self.blocks = []
+        self.block_at = {} # index první instrukce -> blok
+        self._build()
+
+    def _build(self):
+        instructions = self.instructions
+        starts = {0} if instructions else set()
+        for index, instruction in enumerate(instructions):
+            if instruction[0] == 'label':
+                starts.add(index)
+            elif instruction[0] in JUMP_OPCODES and index + 1 < len(instructions):
+                starts.add(index + 1)
+        starts = sorted(starts)
+        for number, start in enumerate(starts):
+            end = starts[number + 1] if number + 1 < len(starts) else len(instructions)
+            block = BasicBlock(number, start, end)
+            self.blocks.append(block)
+            self.block_at[start] = block
+
+        for block in self.blocks:
+            last = instructions[block.end - 1]
+            if last[0] in JUMP_OPCODES:
+                block.successors.append(self.block_at[self.labels[int(last[1])]])
+            if last[0] != 'jmp' and block.end in self.block_at:
+                block.successors.append(self.block_at[block.end])
+            for successor in block.successors:
+                successor.predecessors.append(block)
+
+    @property
+    def entry(self):
+        return self.blocks[0] if self.blocks else None
+
+    def reachable_blocks(self):
+        # Bloky dosažitelné ze začátku programu
+        reachable = set()
+        pending = [self.entry] if self.blocks else []
+        while pending:
+            block = pending.pop()
+            if block.index in reachable:
+                continue
+            reachable.add(block.index)
+            pending.extend(block.successors)
+        return reachable
+
+    def block_instructions(self, block):
+        return ((index, self.instructions[index]) for index in range(block.start, block.end))
+
+    def liveness(self):
+        # Živé proměnné na konci každého bloku (zpětná analýza, sjednocení přes následníky)
+        uses, definitions = [], []
+        for block in self.blocks:
+            used, defined = set(), set()
+            for _, instruction in self.block_instructions(block):
+                if instruction[0] in READ_OPCODES and instruction[1] not in defined:
+                    used.add(instruction[1])
+                if instruction[0] in STORE_OPCODES:
+                    defined.add(instruction[1])
+            uses.append(used)
+            definitions.append(defined)
+
+        live_in = [set() for _ in self.blocks]
+        live_out = [set() for _ in self.blocks]
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                out = set()
+                for successor in block.successors:
+                    out |= live_in[successor.index]
+                new_in = uses[block.index] | (out - definitions[block.index])
+                if out != live_out[block.index] or new_in != live_in[block.index]:
+                    live_out[block.index] = out
+                    live_in[block.index] = new_in
+                    changed = True
+        return live_out
+
+    def definite_assignment(self, ignored_stores=frozenset()):
+        # Proměnné jistě přiřazené na začátku každého bloku (dopředná analýza, průnik přes
+        # předchůdce); instrukce save s indexem v ignored_stores se nepočítají
+        reachable = self.reachable_blocks()
+        assigned = []
+        for block in self.blocks:
+            assigned.append(set(instruction[1] for index, instruction in self.block_instructions(block)
+                                if instruction[0] in STORE_OPCODES and index not in ignored_stores))
+
+        everything = set()
+        for names in assigned:
+            everything |= names
+        assigned_in = [set() if block is self.entry else set(everything) for block in self.blocks]
+        changed = True
+        while changed:
+            changed = False
+            for block in self.blocks:
+                if block is self.entry or block.index not in reachable:
+                    continue
+                predecessors = [predecessor for predecessor in block.predecessors if predecessor.index in reachable]
+                new_in = set(everything)
+                for predecessor in predecessors:
+                    new_in &= assigned_in[predecessor.index] | assigned[predecessor.index]
+                if new_in != assigned_in[block.index]:
+                    assigned_in[block.index] = new_in
+                    changed = True
+        return assigned_in
+
+    def dominators(self):
+        # Pro každý dosažitelný blok množina indexů bloků, které mu dominují (včetně něj samého)
+        reachable = self.reachable_blocks()
+        dominators = {index: set(reachable) for index in reachable}
+        if self.entry is not None:
+            dominators[self.entry.index] = {self.entry.index}
+        changed = True
+        while changed:
+            changed = False
+            for block in self.blocks:
+                if block is self.entry or block.index not in reachable:
+                    continue
+                new_dominators = set(reachable)
+                for predecessor in block.predecessors:
+                    if predecessor.index in reachable:
+                        new_dominators &= dominators[predecessor.index]
+                new_dominators.add(block.index)
+                if new_dominators != dominators[block.index]:
+                    dominators[block.index] = new_dominators
+                    changed = True
+        return dominators
+
+    def natural_loops(self):
+        # Hlavička cyklu (index bloku) -> množina indexů bloků cyklu; cykly se stejnou
+        # hlavičkou se sloučí
+        dominators = self.dominators()
+        loops = {}
+        for block in self.blocks:
+            if block.index not in dominators:
+                continue
+            for successor in block.successors:
+                if successor.index not in dominators[block.index]:
+                    continue
+                body = loops.setdefault(successor.index, {successor.index})
+                pending = [block]
+                while pending:
+                    member = pending.pop()
+                    if member.index in body:
+                        continue
+                    body.add(member.index)
+                    pending.extend(member.predecessors)
+        return loops
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Průchody nad grafem toku řízení (src/optimizer/cfg.py)
+#   unreachable_code           podmíněné skoky s konstantní podmínkou (if (true), while (false))
+#                              se nahradí, nedosažitelné bloky a nepoužitá návěští se odstraní
+#   redundant_initializations  inicializace z deklarace (push I 0; save x) se odstraní, pokud je
+#                              proměnná podle analýzy jistého přiřazení při každém čtení už
+#                              přiřazená jinou instrukcí
+#   dead_stores                uložení hodnoty, kterou podle analýzy živosti nikdo nepřečte, se
+#                              nahradí pop (tee a inc se odstraní); nepoužité čisté výpočty
+#                              (push/load/aritmetika před pop) se pak odstraní celé
+# Každý průchod vrací počty změn a odstraněných instrukcí.
+
+from src.optimizer.cfg import ControlFlowGraph, load_program, store_program
+from src.optimizer.opcodes import PURE_OPCODES, STORE_OPCODES, READ_OPCODES, DEFAULT_VALUES, stack_effect
+
+def remove_unreachable_code(emitter):
+    instructions, positions = load_program(emitter)
+    original_count = len(instructions)
+    folded_branches = 0
+
+    # push B true; fjmp N nikdy neskočí, push B false; fjmp N skočí vždy
+    index = 1
+    while index < len(instructions):
+        instruction, previous = instructions[index], instructions[index - 1]
+        if instruction[0] == 'fjmp' and previous[0] == 'push' and previous[1] == 'B':
+            if previous[2].lower() == 'true':
+                replacement = []
+            else:
+                replacement = [['jmp', instruction[1]]]
+            instructions[index - 1:index + 1] = replacement
+            positions[index - 1:index + 1] = [positions[index]] * len(replacement)
+            folded_branches += 1
+        else:
+            index += 1
+
+    changed = True
+    while changed:
+        changed = False
+        cfg = ControlFlowGraph(instructions)
+        reachable = cfg.reachable_blocks()
+        kept = []
+        for block in cfg.blocks:
+            if block.index in reachable:
+                kept.extend(range(block.start, block.end))
+        # Skok na návěští hned za ním (jen přes další návěští) je zbytečný
+        jump_targets = set()
+        for position, index in enumerate(kept):
+            instruction = instructions[index]
+            if instruction[0] == 'jmp':
+                following = position + 1
+                while following < len(kept) and instructions[kept[following]][0] == 'label':
+                    if instructions[kept[following]][1] == instruction[1]:
+                        break
+                    following += 1
+                if following < len(kept) and instructions[kept[following]] == ['label', instruction[1]]:
+                    kept[position] = None
+                    continue
+            if instruction[0] in ('jmp', 'fjmp'):
+                jump_targets.add(instruction[1])
+        kept = [index for index in kept if index is not None
+                and not (instructions[index][0] == 'label' and instructions[index][1] not in jump_targets)]
+        if len(kept) != len(instructions):
+            instructions = [instructions[index] for index in kept]
+            positions = [positions[index] for index in kept]
+            changed = True
+
+    store_program(emitter, instructions, positions)
+    return {'folded_branches': folded_branches, 'removed_instructions': original_count - len(instructions)}
+
+def initialization_stores(instructions):
+    # Indexy save z deklarací: push s výchozí hodnotou, save x a za ním ne load x
+    # (přiřazení x = 0 jako výraz vždy pokračuje load x)
+    stores = {}
+    for index in range(1, len(instructions)):
+        instruction, previous = instructions[index], instructions[index - 1]
+        if instruction[0] != 'save' or previous[0] != 'push' or len(previous) != 3:
+            continue
+        if DEFAULT_VALUES.get(previous[1]) != previous[2]:
+            continue
+        if index + 1 < len(instructions) and instructions[index + 1] == ['load', instruction[1]]:
+            continue
+        stores.setdefault(instruction[1], []).append(index)
+    return stores
+
+def remove_redundant_initializations(emitter):
+    instructions, positions = load_program(emitter)
+    stores = initialization_stores(instructions)
+    ignored = frozenset(index for indices in stores.values() for index in indices)
+    cfg = ControlFlowGraph(instructions)
+    assigned_in = cfg.definite_assignment(ignored)
+
+    # Proměnné, které se někde čtou, aniž by byly jistě přiřazené jinak než deklarací
+    needed = set()
+    for block in cfg.blocks:
+        assigned = set(assigned_in[block.index])
+        for index, instruction in cfg.block_instructions(block):
+            if instruction[0] in READ_OPCODES and instruction[1] not in assigned:
+                needed.add(instruction[1])
+            if instruction[0] in STORE_OPCODES and index not in ignored:
+                assigned.add(instruction[1])
+
+    removed = set()
+    for name, indices in stores.items():
+        if name not in needed:
+            for index in indices:
+                removed.update((index - 1, index))
+    if removed:
+        kept = [index for index in range(len(instructions)) if index not in removed]
+        store_program(emitter, [instructions[index] for index in kept], [positions[index] for index in kept])
+    return {'removed_initializations': len(removed) // 2, 'removed_instructions': len(removed)}
+
+def remove_dead_stores(emitter):
+    # Opakuje se, dokud se něco mění: odstraněný výpočet mohl být jediným čtením jiné proměnné
+    instructions, positions = load_program(emitter)
+    original_count = len(instructions)
+    dead_stores = 0
+    while True:
+        # Hodnota přiřazení použitého jako příkaz (save x; load x; pop) se zahodí dřív,
+        # než se počítá živost, jinak by load x držel x živé
+        instructions, positions = remove_unused_values(instructions, positions)
+        cfg = ControlFlowGraph(instructions)
+        live_out = cfg.liveness()
+        found = 0
+        for block in cfg.blocks:
+            live = set(live_out[block.index])
+            for index in range(block.end - 1, block.start - 1, -1):
+                instruction = instructions[index]
+                if instruction[0] in STORE_OPCODES:
+                    if instruction[1] in live:
+                        live.discard(instruction[1])
+                    else:
+                        # Mrtvé save a append se nahradí pop, tee a inc se odstraní celé
+                        instructions[index] = ['pop'] if instruction[0] in ('save', 'append') else None
+                        found += 1
+                        continue
+                if instruction[0] in READ_OPCODES:
+                    live.add(instruction[1])
+        if not found:
+            break
+        dead_stores += found
+        kept = [index for index, instruction in enumerate(instructions) if instruction is not None]
+        instructions = [instructions[index] for index in kept]
+        positions = [positions[index] for index in kept]
+
+    store_program(emitter, instructions, positions)
+    return {'dead_stores': dead_stores, 'removed_instructions': original_count - len(instructions)}
+
+def remove_unused_values(instructions, positions):
+    # Čistá instrukce, jejíž výsledek hned zahodí pop, se odstraní spolu s pop; místo ní se
+    # zahodí její operandy, takže se stejně odstraní i výpočty, které je vytvořily
+    result, result_positions = [], []
+    for instruction, position in zip(instructions, positions):
+        if instruction != ['pop']:
+            result.append(instruction)
+            result_positions.append(position)
+            continue
+        pops = 1
+        # dup; pop se odstraní beze zbytku (zahodí se kopie)
+        while pops and result and (result[-1][0] in PURE_OPCODES or result[-1] == ['dup']):
+            popped, pushed = stack_effect(result.pop())
+            result_positions.pop()
+            pops += popped - pushed
+        result.extend([['pop']] * pops)
+        result_positions.extend([position] * pops)
+    return result, result_positions
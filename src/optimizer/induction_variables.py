@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Redukce síly násobení indukčních proměnných v cyklech
+# Indukční proměnná cyklu je int proměnná, do které se v cyklu ukládá jediným příkazem
+# i = i + c (nebo i = c + i, i = i - c, inc i c) s konstantou c, typicky krok cyklu for. Násobení
+# i * k (nebo k * i, i; dup; add pro k = 2) konstantou k se v cyklu nahradí proměnnou $ivN:
+#   před cyklem      load i; push I k; mul I; save $ivN
+#   za krokem i      inc $ivN k*c
+#   místo i * k      load $ivN
+# V každém místě cyklu tak platí $ivN = i * k a násobení se mění na jedno přičtení za iteraci.
+
+from src.optimizer.cfg import ControlFlowGraph, load_program, store_program
+from src.optimizer.loop_invariants import has_preheader
+from src.optimizer.opcodes import STORE_OPCODES
+
+TEMPORARY_PREFIX = "$iv" # Znak $ nemůže být v identifikátoru jazyka
+
+def increment_step(instructions, index, name):
+    # Konstanta c, pokud instrukce na indexu uloží i = i + c (i = c + i, i = i - c, inc i c), jinak None
+    instruction = instructions[index]
+    if instruction[0] == 'inc' and instruction[1] == name:
+        return int(instruction[2]) if instruction[2].lstrip('-').isdigit() else None
+    if index < 3 or instruction != ['save', name]:
+        return None
+    first, second, operation = instructions[index - 3:index]
+    if operation not in (['add', 'I'], ['sub', 'I']):
+        return None
+    if first == ['load', name] and second[0] == 'push' and second[1] == 'I':
+        step = int(second[2])
+        return -step if operation[0] == 'sub' else step
+    if operation[0] == 'add' and second == ['load', name] and first[0] == 'push' and first[1] == 'I':
+        return int(first[2])
+    return None
+
+def multiplication_factor(instructions, index, name):
+    # Konstanta k, pokud instrukce od indexu počítají name * k, k * name nebo name; dup; add, jinak None
+    first, second, operation = instructions[index:index + 3]
+    if first == ['load', name] and second == ['dup'] and operation == ['add', 'I']:
+        return 2
+    if operation != ['mul', 'I']:
+        return None
+    if first == ['load', name] and second[0] == 'push' and second[1] == 'I':
+        return int(second[2])
+    if second == ['load', name] and first[0] == 'push' and first[1] == 'I':
+        return int(first[2])
+    return None
+
+def reduce_induction_variables(emitter):
+    instructions, positions = load_program(emitter)
+    temporary_count = sum(1 for name, _ in emitter.variables if name.startswith(TEMPORARY_PREFIX))
+    processed = set() # Čísla návěští hlaviček už zpracovaných cyklů
+    counts = {'induction_variables': 0, 'reduced_multiplications': 0}
+
+    while True:
+        cfg = ControlFlowGraph(instructions)
+        loops = [(header, body) for header, body in cfg.natural_loops().items()
+                 if instructions[cfg.blocks[header].start][0] == 'label'
+                 and instructions[cfg.blocks[header].start][1] not in processed]
+        if not loops:
+            break
+        header_index, body = loops[0]
+        header = cfg.blocks[header_index]
+        processed.add(instructions[header.start][1])
+        if not has_preheader(cfg, header, body):
+            continue
+
+        stores = {}
+        for block_index in body:
+            for index, instruction in cfg.block_instructions(cfg.blocks[block_index]):
+                if instruction[0] in STORE_OPCODES:
+                    stores.setdefault(instruction[1], []).append(index)
+        steps = {} # Indukční proměnná -> (index jejího save, krok)
+        for name, indices in stores.items():
+            if len(indices) == 1:
+                step = increment_step(instructions, indices[0], name)
+                if step is not None:
+                    steps[name] = (indices[0], step)
+        if not steps:
+            continue
+
+        temporaries = {} # (proměnná, k) -> pomocná proměnná
+        edits = []
+        for block_index in sorted(body):
+            block = cfg.blocks[block_index]
+            index = block.start
+            while index + 3 <= block.end:
+                loads = [instruction[1] for instruction in instructions[index:index + 2] if instruction[0] == 'load']
+                factor = None
+                if loads and loads[0] in steps:
+                    name = loads[0]
+                    factor = multiplication_factor(instructions, index, name)
+                if factor is None:
+                    index += 1
+                    continue
+                key = (name, factor)
+                if key not in temporaries:
+                    temporary = f"{TEMPORARY_PREFIX}{temporary_count}"
+                    temporary_count += 1
+                    temporaries[key] = temporary
+                    emitter.declare_variable(temporary, 'I')
+                    store_index, step = steps[name]
+                    edits.append((header.start, header.start,
+                                  [['load', name], ['push', 'I', str(factor)], ['mul', 'I'], ['save', temporary]],
+                                  [positions[header.start]] * 4))
+                    edits.append((store_index + 1, store_index + 1, [['inc', temporary, str(factor * step)]],
+                                  [positions[store_index]]))
+                edits.append((index, index + 3, [['load', temporaries[key]]], [positions[index + 2]]))
+                counts['reduced_multiplications'] += 1
+                index += 3
+        if not temporaries:
+            continue
+
+        # Úpravy od konce, aby se indexy dřívějších nezměnily
+        for start, end, replacement, replacement_positions in sorted(edits, key=lambda edit: edit[:2], reverse=True):
+            instructions[start:end] = replacement
+            positions[start:end] = replacement_positions
+        counts['induction_variables'] += len(set(name for name, _ in temporaries))
+
+    store_program(emitter, instructions, positions)
+    return counts
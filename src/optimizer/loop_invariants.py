@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Přesun výpočtů nezávislých na cyklu před cyklus (loop-invariant code motion)
+# Cykly se berou z grafu toku řízení (přirozené cykly, src/optimizer/cfg.py), od vnějších
+# k vnitřním. Invariantní výraz je souvislá posloupnost instrukcí v jednom bloku cyklu, která
+# vytvoří jednu hodnotu jen z konstant a proměnných, do kterých se v cyklu neukládá, a nemá
+# vedlejší účinky ani nemůže skončit chybou (div a mod jen s nenulovým konstantním dělitelem).
+# Každý takový výraz (alespoň dvě instrukce) se před hlavičkou cyklu spočítá do pomocné
+# proměnné $invN a v cyklu se nahradí instrukcí load $invN; stejné výrazy v jednom cyklu
+# sdílejí jednu proměnnou. Výraz z vnitřního cyklu, který nezávisí ani na vnějším, se tak
+# přesune rovnou před vnější cyklus.
+
+from src.optimizer.cfg import ControlFlowGraph, block_expressions, load_program, store_program
+from src.optimizer.opcodes import PURE_OPCODES, STORE_OPCODES, result_type
+
+TEMPORARY_PREFIX = "$inv" # Znak $ nemůže být v identifikátoru jazyka
+
+def nonzero_constant(instruction):
+    if instruction[0] != 'push' or instruction[1] not in ('I', 'F'):
+        return False
+    try:
+        return float(instruction[2]) != 0
+    except ValueError:
+        return False
+
+def invariant_expressions(instructions, block, modified):
+    # Rozsahy (začátek, konec) maximálních invariantních výrazů v bloku
+    invariant = {} # Index poslední instrukce výrazu -> je výraz invariantní
+    found = []
+
+    def candidate(operand):
+        return (operand is not None and invariant[operand[1] - 1] and operand[1] - operand[0] > 1
+                and instructions[operand[0]][0] != 'dup')
+
+    remaining = []
+    for index, operands, start in block_expressions(instructions, block, remaining):
+        instruction = instructions[index]
+        opcode = instruction[0]
+        result = start is not None and all(operand is not None and invariant[operand[1] - 1] for operand in operands)
+        if opcode == 'load':
+            result = instruction[1] not in modified
+        elif opcode in ('div', 'mod'):
+            divisor = operands[-1]
+            result = result and divisor[1] - divisor[0] == 1 and nonzero_constant(instructions[divisor[0]])
+        elif opcode not in PURE_OPCODES and opcode != 'dup':
+            result = False
+        invariant[index] = result
+
+        if not result:
+            found.extend(operand for operand in operands if candidate(operand))
+    found.extend(entry for entry in remaining if candidate(entry))
+    return found
+
+def has_preheader(cfg, header, body):
+    # Před hlavičku lze vložit kód, jen pokud se do cyklu zvenku vstupuje propadnutím
+    # z předchozí instrukce (ne skokem na návěští hlavičky)
+    label = cfg.instructions[header.start]
+    for predecessor in header.predecessors:
+        if predecessor.index in body:
+            continue
+        last = cfg.instructions[predecessor.end - 1]
+        if predecessor.end != header.start or last[0] == 'jmp':
+            return False
+        if last[0] == 'fjmp' and ['label', last[1]] == label:
+            return False
+    return True
+
+def hoist_loop_invariants(emitter):
+    instructions, positions = load_program(emitter)
+    variable_types = dict(emitter.variables)
+    temporary_count = sum(1 for name in variable_types if name.startswith(TEMPORARY_PREFIX))
+    processed = set() # Čísla návěští hlaviček už zpracovaných cyklů
+    counts = {'loops': 0, 'hoisted_expressions': 0, 'replaced_uses': 0}
+
+    while True:
+        cfg = ControlFlowGraph(instructions)
+        loops = [(header, body) for header, body in cfg.natural_loops().items()
+                 if instructions[cfg.blocks[header].start][0] == 'label'
+                 and instructions[cfg.blocks[header].start][1] not in processed]
+        if not loops:
+            break
+        # Vnější cykly před vnitřními (vnější cyklus obsahuje všechny bloky vnitřního)
+        header_index, body = max(loops, key=lambda loop: len(loop[1]))
+        header = cfg.blocks[header_index]
+        processed.add(instructions[header.start][1])
+        if not has_preheader(cfg, header, body):
+            continue
+
+        modified = set()
+        for block_index in body:
+            for _, instruction in cfg.block_instructions(cfg.blocks[block_index]):
+                if instruction[0] in STORE_OPCODES:
+                    modified.add(instruction[1])
+        ranges = []
+        for block_index in sorted(body):
+            ranges.extend(invariant_expressions(instructions, cfg.blocks[block_index], modified))
+        if not ranges:
+            continue
+
+        temporaries = {} # Instrukce výrazu -> pomocná proměnná
+        preheader = []
+        edits = []
+        for start, end in sorted(ranges):
+            expression = tuple(tuple(instruction) for instruction in instructions[start:end])
+            if expression not in temporaries:
+                name = f"{TEMPORARY_PREFIX}{temporary_count}"
+                temporary_count += 1
+                temporaries[expression] = name
+                type_code = result_type(instructions[end - 1], variable_types)
+                if type_code is not None:
+                    variable_types[name] = type_code
+                    emitter.declare_variable(name, type_code)
+                preheader.extend([list(instruction) for instruction in expression])
+                preheader.append(['save', name])
+            edits.append((start, end, [['load', temporaries[expression]]], [positions[end - 1]]))
+        edits.append((header.start, header.start, preheader, [positions[header.start]] * len(preheader)))
+
+        # Úpravy od konce, aby se indexy dřívějších nezměnily
+        for start, end, replacement, replacement_positions in sorted(edits, key=lambda edit: edit[0], reverse=True):
+            instructions[start:end] = replacement
+            positions[start:end] = replacement_positions
+        counts['loops'] += 1
+        counts['hoisted_expressions'] += len(temporaries)
+        counts['replaced_uses'] += len(ranges)
+
+    store_program(emitter, instructions, positions)
+    return counts
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Rozbalení cyklů for s počtem iterací známým při překladu
+# Hledá se rozložení, které generuje CodeGenerator.visitForStatement (po dead_stores):
+#   push I a; save i                      inicializace konstantou
+#   label H; <podmínka>; fjmp E; jmp B    podmínka i < b, i > b nebo i != b (b konstanta)
+#   label S; <krok>; jmp H                jediný krok i = i + c (i - c, inc i c)
+#   label B; <tělo>; jmp S; label E
+# Tělo nesmí do i ukládat ani skákat mimo sebe. Počet iterací n se spočítá z a, b a c.
+#   úplné rozbalení     n kopií těla, v kopii k se load i nahradí push I a+k*c; nakonec se do i
+#                       uloží hodnota po cyklu; jen pokud výsledek nepřesáhne max_unrolled_size
+#   částečné rozbalení  jinak cyklus s faktor kopiemi těla a kroku za jednou podmínkou
+#                       (i < a + m*faktor*c pro m = n // faktor) a zbylých n % faktor iterací
+#                       rozbalených úplně za cyklem (jejich počet je znám, zbytkový cyklus netřeba)
+# Všechna rozbalení dohromady smí program zvětšit nejvýše o max_growth instrukcí. Vnitřní cykly
+# se zpracují dřív než vnější, takže se vnější cyklus s úplně rozbaleným vnitřním může rozbalit také.
+
+from src.optimizer.cfg import load_program, store_program
+from src.optimizer.induction_variables import increment_step
+from src.optimizer.opcodes import JUMP_OPCODES, STORE_OPCODES
+
+DEFAULT_MAX_UNROLLED_SIZE = 128 # instrukcí jednoho rozbaleného cyklu
+DEFAULT_UNROLL_FACTOR = 4
+DEFAULT_MAX_GROWTH = 1024 # instrukcí, o které smí rozbalení zvětšit celý program
+
+def integer_constant(instruction):
+    if instruction[0] == 'push' and instruction[1] == 'I':
+        return int(instruction[2])
+    return None
+
+def trip_count(start, bound, step, comparison):
+    # Počet iterací cyklu i = start; i <comparison> bound; i += step, nebo None (nekonečný cyklus)
+    if comparison == 'lt':
+        if start >= bound:
+            return 0
+        return -(-(bound - start) // step) if step > 0 else None
+    if comparison == 'gt':
+        if start <= bound:
+            return 0
+        return -(-(start - bound) // -step) if step < 0 else None
+    # i != bound: skončí, jen pokud i na bound přesně narazí
+    if step == 0 or (bound - start) % step or (bound - start) // step < 0:
+        return 0 if start == bound else None
+    return (bound - start) // step
+
+def match_counted_loop(instructions, index):
+    # Cyklus for, jehož hlavička (label H) je na indexu, jako slovník, nebo None
+    def at(offset):
+        position = index + offset
+        return instructions[position] if 0 <= position < len(instructions) else ['']
+
+    initial, store = at(-2), at(-1)
+    if store[0] != 'save' or integer_constant(initial) is None:
+        return None
+    name = store[1]
+    if at(1) != ['load', name] or integer_constant(at(2)) is None:
+        return None
+    if at(3) in (['lt', 'I'], ['gt', 'I']):
+        comparison, condition_end = at(3)[0], index + 4
+    elif at(3) == ['eq', 'I'] and at(4) == ['not']:
+        comparison, condition_end = 'ne', index + 5
+    else:
+        return None
+    end_jump, body_jump, step_label = (instructions[condition_end:condition_end + 3] + [[''], [''], ['']])[:3]
+    if end_jump[0] != 'fjmp' or body_jump[0] != 'jmp' or step_label[0] != 'label':
+        return None
+
+    # Krok: instrukce od label S po jmp H, poslední z nich uloží i
+    header_jump = next((position for position in range(condition_end + 3, len(instructions))
+                        if instructions[position][0] in JUMP_OPCODES or instructions[position][0] == 'label'), None)
+    if header_jump is None or instructions[header_jump] != ['jmp', instructions[index][1]]:
+        return None
+    step_start = condition_end + 3
+    step = increment_step(instructions, header_jump - 1, name) if header_jump > step_start else None
+    if step is None:
+        return None
+    if any(instruction[0] in STORE_OPCODES for instruction in instructions[step_start:header_jump - 1]):
+        return None
+    if instructions[header_jump + 1:header_jump + 2] != [['label', body_jump[1]]]:
+        return None
+
+    # Tělo: od label B po jmp S, za kterým je label E
+    body_start = header_jump + 2
+    body_end = None
+    for position in range(body_start, len(instructions) - 1):
+        if instructions[position] == ['jmp', step_label[1]] and instructions[position + 1] == ['label', end_jump[1]]:
+            body_end = position
+            break
+    if body_end is None:
+        return None
+
+    count = trip_count(integer_constant(initial), integer_constant(at(2)), step, comparison)
+    if count is None:
+        return None
+    return {'name': name, 'initial': integer_constant(initial), 'bound': integer_constant(at(2)),
+            'comparison': comparison, 'step': step, 'count': count,
+            'start': index - 2, 'header': index, 'condition_end': condition_end,
+            'step_start': step_start, 'step_end': header_jump,
+            'body_start': body_start, 'body_end': body_end, 'end': body_end + 2,
+            'labels': (instructions[index][1], end_jump[1], body_jump[1], step_label[1])}
+
+def body_is_closed(instructions, loop, references):
+    # Tělo do i neukládá, neskáče mimo sebe a na jeho návěští ani na návěští cyklu
+    # se neskáče odjinud
+    body = instructions[loop['body_start']:loop['body_end']]
+    body_labels = set(instruction[1] for instruction in body if instruction[0] == 'label')
+    for instruction in body:
+        if instruction[0] in STORE_OPCODES and instruction[1] == loop['name']:
+            return False
+        if instruction[0] in JUMP_OPCODES and instruction[1] not in body_labels:
+            return False
+    inside = {}
+    for instruction in instructions[loop['start']:loop['end']]:
+        if instruction[0] in JUMP_OPCODES:
+            inside[instruction[1]] = inside.get(instruction[1], 0) + 1
+    return all(references.get(label, 0) == inside.get(label, 0)
+               for label in body_labels.union(loop['labels']))
+
+class LabelAllocator:
+    def __init__(self, instructions):
+        self.next_label = max((int(instruction[1]) for instruction in instructions if instruction[0] == 'label'),
+                              default=-1) + 1
+
+    def copy(self, instructions, positions, substitute=None):
+        # Kopie instrukcí s novými čísly vnitřních návěští; substitute nahradí load proměnné konstantou
+        renamed = {}
+        for instruction in instructions:
+            if instruction[0] == 'label':
+                renamed[instruction[1]] = str(self.next_label)
+                self.next_label += 1
+        result = []
+        for instruction in instructions:
+            if instruction[0] in JUMP_OPCODES or instruction[0] == 'label':
+                instruction = [instruction[0], renamed[instruction[1]]]
+            elif substitute is not None and instruction == ['load', substitute[0]]:
+                instruction = ['push', 'I', str(substitute[1])]
+            result.append(list(instruction))
+        return result, list(positions)
+
+def unroll_loop(instructions, positions, loop, factor, labels):
+    # Náhradní instrukce a pozice za rozsah cyklu loop['start']:loop['end']
+    name, initial, step, count = loop['name'], loop['initial'], loop['step'], loop['count']
+    body = instructions[loop['body_start']:loop['body_end']]
+    body_positions = positions[loop['body_start']:loop['body_end']]
+    result, result_positions = [], []
+
+    def append(part):
+        result.extend(part[0])
+        result_positions.extend(part[1])
+
+    full_iterations = 0
+    if factor:
+        # Hlavní cyklus: faktor kopií těla a kroku za jednou podmínkou
+        full_iterations = count // factor * factor
+        header, end = loop['labels'][0], loop['labels'][1]
+        condition = instructions[loop['header'] + 1:loop['condition_end']]
+        condition[1] = ['push', 'I', str(initial + full_iterations * step)]
+        step_code = instructions[loop['step_start']:loop['step_end']]
+        step_positions = positions[loop['step_start']:loop['step_end']]
+        append((instructions[loop['start']:loop['header'] + 1], positions[loop['start']:loop['header'] + 1]))
+        append((condition + [['fjmp', end]], positions[loop['header'] + 1:loop['condition_end'] + 1]))
+        for _ in range(factor):
+            append(labels.copy(body, body_positions))
+            append((step_code, step_positions))
+        append(([['jmp', header], ['label', end]], [positions[loop['step_end']], positions[loop['end'] - 1]]))
+    for iteration in range(full_iterations, count):
+        append(labels.copy(body, body_positions, (name, initial + iteration * step)))
+    append(([['push', 'I', str(initial + count * step)], ['save', name]], positions[loop['start']:loop['start'] + 2]))
+    return result, result_positions
+
+def unroll_loops(emitter, max_unrolled_size=DEFAULT_MAX_UNROLLED_SIZE, factor=DEFAULT_UNROLL_FACTOR,
+                 max_growth=DEFAULT_MAX_GROWTH):
+    instructions, positions = load_program(emitter)
+    original_count = len(instructions)
+    labels = LabelAllocator(instructions)
+    processed = set() # Návěští hlaviček cyklů, které se rozbalit nedají
+    counts = {'fully_unrolled': 0, 'partially_unrolled': 0}
+
+    while True:
+        references = {}
+        for instruction in instructions:
+            if instruction[0] in JUMP_OPCODES:
+                references[instruction[1]] = references.get(instruction[1], 0) + 1
+        loops = []
+        for index, instruction in enumerate(instructions):
+            if instruction[0] == 'label' and instruction[1] not in processed:
+                loop = match_counted_loop(instructions, index)
+                if loop is None:
+                    processed.add(instruction[1])
+                else:
+                    loops.append(loop)
+        if not loops:
+            break
+        # Nejvnitřnější cyklus (nejkratší rozsah) jako první
+        loop = min(loops, key=lambda candidate: candidate['end'] - candidate['start'])
+        processed.add(loop['labels'][0])
+        if not body_is_closed(instructions, loop, references):
+            continue
+
+        body_size = loop['body_end'] - loop['body_start']
+        step_size = loop['step_end'] - loop['step_start']
+        original_size = loop['end'] - loop['start']
+        growth = len(instructions) - original_count
+        if loop['count'] * body_size + 2 <= max_unrolled_size:
+            loop_factor = 0
+        else:
+            loop_factor = min(factor, max_unrolled_size // max(body_size + step_size, 1))
+            if loop_factor < 2 or loop['count'] < loop_factor:
+                continue
+        unrolled, unrolled_positions = unroll_loop(instructions, positions, loop, loop_factor, labels)
+        if growth + len(unrolled) - original_size > max_growth:
+            continue
+        instructions[loop['start']:loop['end']] = unrolled
+        positions[loop['start']:loop['end']] = unrolled_positions
+        counts['partially_unrolled' if loop_factor else 'fully_unrolled'] += 1
+
+    store_program(emitter, instructions, positions)
+    counts['added_instructions'] = len(instructions) - original_count
+    return counts
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Vlastnosti instrukcí zásobníkového kódu pro optimalizační průchody
+# Při přidání nové instrukce do Interpreter je potřeba doplnit i tyto tabulky.
+
+# Opcode -> (počet odebraných hodnot, počet přidaných hodnot); print N odebírá N hodnot
+STACK_EFFECTS = {
+    'push': (0, 1), 'load': (0, 1), 'save': (1, 0), 'pop': (1, 0), 'dup': (1, 2), 'tee': (1, 1),
+    'inc': (0, 0), 'append': (1, 0),
+    'add': (2, 1), 'sub': (2, 1), 'mul': (2, 1), 'div': (2, 1), 'mod': (2, 1),
+    'uminus': (1, 1), 'concat': (2, 1), 'itof': (1, 1),
+    'eq': (2, 1), 'lt': (2, 1), 'gt': (2, 1),
+    'not': (1, 1), 'and': (2, 1), 'or': (2, 1),
+    'label': (0, 0), 'jmp': (0, 0), 'fjmp': (1, 0), 'select': (3, 1),
+    'print': (None, 0), 'read': (0, 1), 'emit': (0, 0),
+}
+
+# Instrukce bez vedlejších účinků, které s operandy správných typů (zaručuje TypeChecker)
+# nemohou skončit chybou; jejich nepoužitý výsledek lze i s výpočtem odstranit.
+# div a mod sem nepatří (dělení nulou), load ano (proměnná je vždy inicializovaná deklarací).
+PURE_OPCODES = frozenset(('push', 'load', 'add', 'sub', 'mul', 'uminus', 'concat', 'itof',
+                          'eq', 'lt', 'gt', 'not', 'and', 'or', 'select'))
+
+# Výpočty, jejichž výsledek závisí jen na operandech (včetně těch, které mohou skončit chybou)
+VALUE_OPCODES = (PURE_OPCODES | {'div', 'mod'}) - {'push', 'load'}
+
+JUMP_OPCODES = frozenset(('jmp', 'fjmp'))
+
+# Instrukce, které ukládají do proměnné (tee hodnotu na zásobníku ponechá, inc a append
+# proměnnou zároveň čtou)
+STORE_OPCODES = frozenset(('save', 'tee', 'inc', 'append'))
+READ_OPCODES = frozenset(('load', 'inc', 'append'))
+
+# Typ výsledku instrukcí, které ho neuvádějí jako argument
+RESULT_TYPES = {'mod': 'I', 'concat': 'S', 'itof': 'F',
+                'eq': 'B', 'lt': 'B', 'gt': 'B', 'not': 'B', 'and': 'B', 'or': 'B'}
+
+# Hodnota, kterou deklarace proměnné daného typu inicializuje (push <typ> <hodnota>)
+DEFAULT_VALUES = {'I': '0', 'F': '0.0', 'B': 'false', 'S': '""'}
+
+def stack_effect(instruction):
+    # Dvojice (odebrané, přidané) pro konkrétní instrukci
+    popped, pushed = STACK_EFFECTS[instruction[0]]
+    if popped is None:
+        popped = int(instruction[1])
+    return popped, pushed
+
+def result_type(instruction, variable_types):
+    # Kód typu (I, F, B, S) hodnoty, kterou instrukce vytvoří, nebo None
+    opcode = instruction[0]
+    if opcode == 'load':
+        return variable_types.get(instruction[1])
+    if opcode in RESULT_TYPES:
+        return RESULT_TYPES[opcode]
+    return instruction[1] if len(instruction) > 1 else None
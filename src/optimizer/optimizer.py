@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Optimalizace vygenerovaného zásobníkového kódu
+# Průchody pracují nad ListEmitter (seznam instrukcí a jejich pozic ve zdrojovém kódu),
+# takže se tabulka řádků i sekce .variables zapíší stejně jako bez optimalizace.
+# Úroveň optimalizace (main.py -O N) určuje, které průchody se spustí:
+#   0  žádné
+#   1  částečné vyhodnocení začátku programu, který nezávisí na vstupu (partial_evaluator.py)
+#   2  navíc odstranění nedosažitelného kódu, zbytečných inicializací a mrtvých uložení
+#      (dataflow.py), algebraické zjednodušení (algebra.py), redukce síly násobení indukčních
+#      proměnných (induction_variables.py), přesun invariantních výpočtů před cykly
+#      (loop_invariants.py) a odstranění společných podvýrazů v základních blocích (value_numbering.py)
+#   3  navíc rozbalení cyklů for s počtem iterací známým při překladu (loop_unrolling.py),
+#      omezené velikostí kódu
+
+from src.optimizer.partial_evaluator import partially_evaluate
+from src.optimizer.dataflow import remove_unreachable_code, remove_redundant_initializations, remove_dead_stores
+from src.optimizer.induction_variables import reduce_induction_variables
+from src.optimizer.loop_invariants import hoist_loop_invariants
+from src.optimizer.value_numbering import eliminate_common_subexpressions
+from src.optimizer.algebra import simplify_expressions
+from src.optimizer.loop_unrolling import unroll_loops
+
+MAX_LEVEL = 3
+
+# Průchody v pořadí spuštění: (jméno, minimální úroveň, funkce(emitter) -> počty)
+PASSES = [
+    ('unreachable_code', 2, remove_unreachable_code),
+    ('redundant_initializations', 2, remove_redundant_initializations),
+    ('dead_stores', 2, remove_dead_stores),
+    ('loop_unrolling', 3, unroll_loops),
+    ('algebraic_simplification', 2, simplify_expressions),
+    ('induction_variables', 2, reduce_induction_variables),
+    ('loop_invariants', 2, hoist_loop_invariants),
+    ('common_subexpressions', 2, eliminate_common_subexpressions),
+    ('partial_evaluation', 1, partially_evaluate),
+]
+
+def optimize(emitter, level):
+    # Spustí průchody dané úrovně; vrací slovník jméno průchodu -> počty změn
+    counts = {}
+    for name, minimum_level, optimization in PASSES:
+        if level >= minimum_level:
+            counts[name] = optimization(emitter)
+    return counts
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Částečné vyhodnocení začátku programu při překladu
+# Vygenerovaný zásobníkový kód se vykoná interpretem bez vstupu až k první instrukci, která
+# závisí na vstupu (read), k běhové chybě, na konec programu nebo do vyčerpání limitu kroků.
+# Vyhodnocená část se nahradí předehrou:
+#   emit "<výstup>"      celý dosavadní výstup jedním blokem (řetězec v JSON zápisu)
+#   push/save            hodnoty proměnných v místě přerušení
+#   push                 hodnoty, které zůstaly na zásobníku
+#   jmp N                skok na místo přerušení, pokud mu v kódu předchází zachovaná instrukce
+# Ze zbytku programu zůstanou jen instrukce dosažitelné z místa přerušení (např. cyklus,
+# ve kterém vyhodnocení skončilo, zůstane celý). Vyhodnocení se zastaví také před instrukcí,
+# po které by byla na zásobníku nebo v proměnné hodnota větší než MAX_CONSTANT_SIZE.
+
+import io
+import json
+from src.interpreter.interpreter import Interpreter, DETERMINISTIC_OPCODES
+from src.interpreter.rope import Rope
+from src.optimizer.opcodes import STORE_OPCODES
+
+DEFAULT_MAX_STEPS = 50000
+DEFAULT_MAX_OUTPUT = 64 * 1024 # znaků výstupu v předehře
+MAX_CONSTANT_SIZE = 4096 # znaků řetězce; int nejvýše 3 * MAX_CONSTANT_SIZE bitů (méně cifer)
+
+def too_large(value):
+    # Je hodnota příliš velká na konstantu v kódu? (str velkého int navíc Python odmítne)
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return value.bit_length() > 3 * MAX_CONSTANT_SIZE
+    if isinstance(value, (str, Rope)):
+        return len(value) > MAX_CONSTANT_SIZE
+    return False
+
+def constant_instruction(value):
+    # Instrukce push pro hodnotu, nebo None, pokud ji textový formát kódu nedokáže zapsat
+    # (nebo je příliš velká)
+    if too_large(value):
+        return None
+    if isinstance(value, bool):
+        return f"push B {'true' if value else 'false'}"
+    if isinstance(value, int):
+        return f"push I {value}"
+    if isinstance(value, float):
+        return f"push F {value!r}"
+    if isinstance(value, Rope):
+        value = str(value)
+    if isinstance(value, str) and '\n' not in value and '\r' not in value:
+        return f'push S "{value}"'
+    return None
+
+def evaluate_prefix(code, max_steps, max_output):
+    # Vykoná instrukce od začátku; vrátí (místo přerušení, počet kroků, interpret, výstup)
+    output = io.StringIO()
+    interpreter = Interpreter(io.StringIO(""), output)
+    interpreter.load_lines(code)
+    instructions = interpreter.instructions
+    stack = interpreter.stack
+    memory = interpreter.memory
+    pc = 0
+    steps = 0
+    while pc < len(instructions) and steps < max_steps:
+        instruction = instructions[pc]
+        if instruction[0] not in DETERMINISTIC_OPCODES:
+            break
+        saved_stack = stack[:]
+        output_size = output.tell()
+        # Instrukce mění nejvýše vrchol zásobníku a proměnnou, do které ukládá
+        name = instruction[1] if instruction[0] in STORE_OPCODES else None
+        saved_value = memory.get(name)
+        interpreter.pc = pc + 1
+        try:
+            interpreter.execute_instruction(instruction)
+        except Exception:
+            failed = True
+        else:
+            failed = (output.tell() > max_output or (stack and too_large(stack[-1]))
+                      or (name is not None and too_large(memory.get(name))))
+        if failed:
+            # Instrukce se vykoná až za běhu (a tam případně ohlásí chybu na svém řádku)
+            stack[:] = saved_stack
+            if name is not None and saved_value is None:
+                memory.pop(name, None)
+            elif name is not None:
+                memory[name] = saved_value
+            output.seek(output_size)
+            output.truncate()
+            break
+        pc = interpreter.pc
+        steps += 1
+    return pc, steps, interpreter, output.getvalue()
+
+def reachable_from(instructions, labels, start):
+    # Indexy instrukcí dosažitelných z start (následující instrukce a cíle skoků)
+    reachable = set()
+    pending = [start]
+    while pending:
+        index = pending.pop()
+        if index in reachable or index >= len(instructions):
+            continue
+        reachable.add(index)
+        opcode = instructions[index][0]
+        if opcode in ('jmp', 'fjmp'):
+            pending.append(labels[int(instructions[index][1])])
+        if opcode != 'jmp':
+            pending.append(index + 1)
+    return sorted(reachable)
+
+def partially_evaluate(emitter, max_steps=DEFAULT_MAX_STEPS, max_output=DEFAULT_MAX_OUTPUT):
+    # Nahradí vyhodnotitelný začátek programu v emitteru (ListEmitter) předehrou; vrací počty pro přehled
+    code, positions = emitter.code, emitter.positions
+    cut, steps, interpreter, output = evaluate_prefix(code, max_steps, max_output)
+    counts = {'evaluated_steps': 0, 'output_chars': 0, 'initialized_variables': 0, 'removed_instructions': 0}
+    if cut == 0:
+        return counts
+
+    prelude = []
+    if output:
+        prelude.append(f"emit {json.dumps(output)}")
+    kept = []
+    if cut < len(code):
+        for name, value in interpreter.memory.items():
+            prelude.append(constant_instruction(value))
+            prelude.append(f"save {name}")
+        prelude.extend(constant_instruction(value) for value in interpreter.stack)
+        if None in prelude: # Hodnota, kterou nelze zapsat jako konstantu, program zůstane beze změny
+            return counts
+        kept = reachable_from(interpreter.instructions, interpreter.labels, cut)
+        counts['initialized_variables'] = len(interpreter.memory)
+    counts['evaluated_steps'] = steps
+    counts['output_chars'] = len(output)
+
+    residual = [code[index] for index in kept]
+    residual_positions = [positions[index] for index in kept]
+    if kept and kept[0] != cut:
+        # Místo přerušení leží uvnitř cyklu, předehra na něj skočí přes nové návěští
+        label = max(interpreter.labels, default=-1) + 1
+        prelude.append(f"jmp {label}")
+        insert_at = kept.index(cut)
+        residual.insert(insert_at, f"label {label}")
+        residual_positions.insert(insert_at, positions[cut])
+    prelude_position = positions[cut] if cut < len(positions) else positions[-1]
+
+    counts['removed_instructions'] = len(code) - len(kept)
+    emitter.code = prelude + residual
+    emitter.positions = [prelude_position] * len(prelude) + residual_positions
+    return counts
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Odstranění společných podvýrazů v základních blocích (lokální číslování hodnot)
+# Každá hodnota na zásobníku dostane číslo: konstanty podle typu a zápisu, load podle čísla
+# hodnoty, kterou proměnná právě drží (save proměnné přečíslí), a výpočet podle operace
+# a čísel operandů (u sčítání, násobení, eq, and a or bez ohledu na pořadí). Výraz, jehož
+# hodnota už byla v bloku spočítaná, se znovu nepočítá:
+#   dup         výraz následuje hned za prvním výpočtem (hodnota je na vrcholu zásobníku)
+#   load $cseN  jinak; za první výpočet se vloží tee $cseN (uložení bez odebrání ze zásobníku)
+# Přes pomocnou proměnnou se nahrazují jen výrazy alespoň ze tří instrukcí, kratší by
+# s přidaným tee nic neušetřily. Nahrazují se jen výpočty bez vedlejších účinků (div a mod
+# ano: pokud první výpočet neskončil chybou, se stejnými operandy neskončí ani opakovaný).
+
+from src.optimizer.cfg import ControlFlowGraph, block_expressions, load_program, store_program
+from src.optimizer.opcodes import VALUE_OPCODES, STORE_OPCODES, stack_effect, result_type
+
+TEMPORARY_PREFIX = "$cse" # Znak $ nemůže být v identifikátoru jazyka
+
+# Operace, u kterých nezáleží na pořadí operandů
+COMMUTATIVE_OPCODES = frozenset(('add', 'mul', 'eq', 'and', 'or'))
+
+def block_values(instructions, block):
+    # Výrazy bloku jako (začátek, konec, číslo hodnoty) v pořadí, v jakém se dopočítají
+    # Čísla hodnot jsou n-tice: ('value', n) pro konstanty a výpočty, ('variable', jméno, index)
+    # pro hodnotu proměnné z předchozích bloků, ('instruction', index) pro ostatní (např. read)
+    numbers = {} # Klíč výpočtu -> číslo hodnoty
+    variables = {} # Proměnná -> číslo hodnoty, kterou drží
+    number_at = {} # Index poslední instrukce výrazu -> číslo jeho hodnoty
+    reusable = {} # Index poslední instrukce výrazu -> lze výraz nahradit
+    values = []
+    for index, operands, start in block_expressions(instructions, block):
+        instruction = instructions[index]
+        opcode = instruction[0]
+        known = all(operand is not None for operand in operands)
+        replaceable = start is not None and known and all(reusable[operand[1] - 1] for operand in operands)
+
+        if opcode == 'push':
+            number = numbers.setdefault(tuple(instruction), ('value', len(numbers)))
+        elif opcode == 'load':
+            number = variables.setdefault(instruction[1], ('variable', instruction[1], index))
+        elif opcode in VALUE_OPCODES and known:
+            operand_numbers = [number_at[operand[1] - 1] for operand in operands]
+            if opcode in COMMUTATIVE_OPCODES:
+                operand_numbers.sort(key=repr)
+            number = numbers.setdefault((tuple(instruction), tuple(operand_numbers)), ('value', len(numbers)))
+        elif opcode == 'dup' and known:
+            number = number_at[operands[0][1] - 1]
+        else:
+            replaceable = False
+            number = ('instruction', index)
+            if opcode in STORE_OPCODES:
+                if opcode in ('save', 'tee') and operands[0] is not None: # po inc a append je hodnota nová
+                    number = number_at[operands[0][1] - 1]
+                variables[instruction[1]] = number
+
+        number_at[index] = number
+        reusable[index] = replaceable
+        # dup vytvoří dvě hodnoty, samo se nahradit nedá (x; dup; add ano)
+        if replaceable and opcode != 'dup' and stack_effect(instruction)[1] == 1:
+            values.append((start, index + 1, number))
+    return values
+
+def select_reuses(values):
+    # Dvojice (výraz, jeho první výpočet) pro nahrazení; vnořené výrazy nahrazeného výrazu se vynechají
+    first = {}
+    repeated = []
+    for start, end, number in values:
+        if number not in first:
+            first[number] = (start, end)
+        elif first[number][0] != start:
+            source = first[number]
+            if source[1] == start or end - start >= 3:
+                repeated.append(((start, end), source))
+    selected = []
+    covered_until = -1
+    for expression, source in sorted(repeated, key=lambda item: (item[0][0], -item[0][1])):
+        if expression[0] >= covered_until:
+            selected.append((expression, source))
+            covered_until = expression[1]
+    return selected
+
+def eliminate_common_subexpressions(emitter):
+    instructions, positions = load_program(emitter)
+    original_count = len(instructions)
+    variable_types = dict(emitter.variables)
+    temporary_count = sum(1 for name in variable_types if name.startswith(TEMPORARY_PREFIX))
+    cfg = ControlFlowGraph(instructions)
+    counts = {'reused_values': 0, 'duplicated_values': 0, 'temporaries': 0}
+
+    edits = [] # (index, druh, konec, náhrada); druh 0 = vložení tee před index, 1 = nahrazení
+    for block in cfg.blocks:
+        temporaries = {} # Konec prvního výpočtu -> pomocná proměnná
+        for (start, end), (source_start, source_end) in select_reuses(block_values(instructions, block)):
+            if source_end == start:
+                edits.append((start, 1, end, ['dup']))
+                counts['duplicated_values'] += 1
+                continue
+            if source_end not in temporaries:
+                name = f"{TEMPORARY_PREFIX}{temporary_count}"
+                temporary_count += 1
+                temporaries[source_end] = name
+                type_code = result_type(instructions[source_end - 1], variable_types)
+                if type_code is not None:
+                    variable_types[name] = type_code
+                    emitter.declare_variable(name, type_code)
+                edits.append((source_end, 0, source_end, ['tee', name]))
+                counts['temporaries'] += 1
+            edits.append((start, 1, end, ['load', temporaries[source_end]]))
+            counts['reused_values'] += 1
+
+    # Úpravy od konce; na stejném indexu se nejdřív nahradí výraz a před něj se pak vloží tee
+    for start, _, end, replacement in sorted(edits, reverse=True):
+        position = positions[end - 1] if end > start else positions[start - 1]
+        instructions[start:end] = [replacement]
+        positions[start:end] = [position]
+
+    store_program(emitter, instructions, positions)
+    counts['removed_instructions'] = original_count - len(instructions)
+    return counts
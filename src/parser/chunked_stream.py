@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Vstupní proud lexeru, který čte zdrojový soubor po částech
+# FileStream (i InputStream(open(...).read())) načte celý soubor do řetězce a k tomu ještě
+# do seznamu kódů znaků, u souborů o stovkách MB je to pomalé a paměťově náročné.
+# ChunkedFileStream čte soubor bufferovaně po chunk_size znacích (dekódování UTF-8 je
+# inkrementální, vícebajtový znak na hranici bloku nevadí) a v paměti drží jen okno od
+# začátku právě rozpoznávaného tokenu. Lexer si začátek tokenu označí mark(), po jeho
+# dokončení release() okno posune.
+#
+# Text tokenů se proto musí kopírovat hned při jejich vytvoření (TOKEN_FACTORY), výchozí
+# CommonTokenFactory ho čte ze vstupního proudu až na požádání.
+
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Token import Token
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 # Znaků na jedno čtení ze souboru
+
+class CopyTextTokenFactory(CommonTokenFactory):
+    # Tokeny si text zkopírují při vytvoření; EOF dostane text "<EOF>" jako z FileStream
+    def __init__(self):
+        super().__init__(copyText=True)
+
+    def create(self, source, type, text, channel, start, stop, line, column):
+        if type == Token.EOF and text is None:
+            text = "<EOF>"
+        return super().create(source, type, text, channel, start, stop, line, column)
+
+TOKEN_FACTORY = CopyTextTokenFactory()
+
+def copy_token_text(lexer):
+    # Nastaví lexeru TOKEN_FACTORY (generovaný lexer nemá pro továrnu tokenů setter)
+    lexer._factory = TOKEN_FACTORY
+    return lexer
+
+class ChunkedFileStream:
+    # Rozhraní odpovídá antlr4.InputStream (index, size, LA, LT, consume, mark, release, seek, getText)
+    __slots__ = ('name', 'fileName', '_file', '_chunk_size', '_text', '_data', '_offset', '_end',
+                 '_index', '_eof', '_mark_depth')
+
+    def __init__(self, file_name, encoding='utf-8', errors='strict', chunk_size=DEFAULT_CHUNK_SIZE):
+        self.name = file_name
+        self.fileName = file_name
+        # newline='' zachová konce řádků beze změny, stejně jako FileStream
+        self._file = open(file_name, 'r', encoding=encoding, errors=errors, newline='')
+        self._chunk_size = chunk_size
+        self._text = "" # Okno jako řetězec (pro getText)
+        self._data = [] # Okno jako kódy znaků (pro LA)
+        self._offset = 0 # Index prvního znaku v okně
+        self._end = 0 # Index za posledním načteným znakem
+        self._index = 0
+        self._eof = False
+        self._mark_depth = 0 # Počet aktivních mark(); dokud nějaký trvá, okno se nezkracuje
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        # Celková délka je známá až po dočtení souboru, do té doby počet načtených znaků
+        return self._end
+
+    @property
+    def window_size(self):
+        # Počet znaků, které proud právě drží v paměti
+        return self._end - self._offset
+
+    def _fill(self, position):
+        # Načítá další bloky, dokud okno nepokryje position nebo nedojde soubor
+        while self._end <= position and not self._eof:
+            chunk = self._file.read(self._chunk_size)
+            if not chunk:
+                self._eof = True
+                self._file.close()
+                break
+            self._text += chunk
+            self._data.extend(map(ord, chunk))
+            self._end += len(chunk)
+        return position < self._end
+
+    def _trim(self):
+        # Zahodí začátek okna před aktuální pozicí (jeden znak ponechá kvůli LA(-1))
+        keep_from = self._index - 1
+        drop = keep_from - self._offset
+        del self._data[:drop]
+        self._text = self._text[drop:]
+        self._offset = keep_from
+
+    def close(self):
+        self._file.close()
+
+    def reset(self):
+        self.seek(0)
+        self._index = 0
+
+    def consume(self):
+        if self._index >= self._end and not self._fill(self._index):
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset):
+        if offset > 0:
+            position = self._index + offset - 1
+            if position >= self._end and not self._fill(position):
+                return Token.EOF
+            return self._data[position - self._offset]
+        if offset == 0:
+            return 0 # undefined
+        position = self._index + offset # LA(-1) je předchozí znak
+        if position < self._offset:
+            return Token.EOF
+        return self._data[position - self._offset]
+
+    def LT(self, offset):
+        return self.LA(offset)
+
+    def mark(self):
+        # Lexer označí začátek tokenu (a simulátor ještě jednou uvnitř), uvolňuje v opačném pořadí
+        self._mark_depth += 1
+        return self._mark_depth
+
+    def release(self, marker):
+        self._mark_depth = marker - 1
+        if not self._mark_depth and self._index - self._offset > self._chunk_size:
+            self._trim()
+
+    def seek(self, index):
+        if index <= self._index: # Lexer se vrací nejvýše na začátek tokenu
+            if index < self._offset:
+                raise ValueError(f"cannot seek to {index}, the stream window starts at {self._offset}")
+            self._index = index
+            return
+        if index > self._end:
+            self._fill(index - 1)
+        self._index = min(index, self._end)
+
+    def getText(self, start, stop):
+        if stop >= self._end:
+            self._fill(stop)
+            stop = min(stop, self._end - 1)
+        if start >= self._end:
+            return ""
+        if start < self._offset:
+            raise ValueError(f"text at {start} is no longer in the stream window (starts at {self._offset})")
+        return self._text[start - self._offset:stop - self._offset + 1]
+
+    def __str__(self):
+        return self._text
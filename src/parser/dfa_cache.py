@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Perzistentní cache predikčních DFA lexeru a parseru
+# ANTLR runtime staví DFA (decisionsToDFA) až během parsování, takže každý nový proces
+# začíná "studený" a první překlady jsou výrazně pomalejší. Tento modul uloží zahřáté
+# DFA (stavy, ATN konfigurace, graf predikčních kontextů, sémantické kontexty a startovní
+# stavy precedenčních DFA) do souboru vedle vygenerovaného parseru a při startu je načte.
+#
+# Cache je svázaná s otiskem serializovaného ATN lexeru i parseru a verzí runtime;
+# po přegenerování gramatiky nebo změně runtime se ignoruje a je potřeba ji sestavit znovu.
+#
+# Použití:
+#   python -m src.parser.dfa_cache build [<zdroj> ...] [--output FILE]   sestaví cache z trénovacího korpusu
+#   python -m src.parser.dfa_cache info [FILE]                          vypíše obsah cache
+# Proměnná prostředí PJP_DFA_CACHE=0 načítání vypne, jiná hodnota je cesta k cache.
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from antlr4.PredictionContext import (PredictionContext, SingletonPredictionContext,
+                                      ArrayPredictionContext, EmptyPredictionContext)
+from antlr4.atn.ATNConfig import ATNConfig, LexerATNConfig
+from antlr4.atn.ATNConfigSet import ATNConfigSet, OrderedATNConfigSet
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerActionExecutor import LexerActionExecutor
+from antlr4.atn.LexerAction import LexerIndexedCustomAction
+from antlr4.atn.SemanticContext import SemanticContext, Predicate, PrecedencePredicate, AND, OR
+from antlr4.dfa.DFA import DFA
+from antlr4.dfa.DFAState import DFAState, PredPrediction
+from src.parser.LanguageLexer import LanguageLexer, serializedATN as lexer_serialized_atn
+from src.parser.LanguageParser import LanguageParser, serializedATN as parser_serialized_atn
+
+FORMAT_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LanguageDFA.json')
+
+# Odkaz na chybový stav simulátoru (přechod, o kterém už víme, že selže)
+ERROR_TARGET = -1
+
+_load_attempted = False
+
+def runtime_version():
+    # Verze se čte z názvu adresáře dist-info vedle balíčku antlr4; importlib.metadata
+    # prochází celé sys.path a trvá desítky milisekund, což by spotřebovalo zisk z cache
+    import antlr4
+    site_packages = os.path.dirname(os.path.dirname(os.path.abspath(antlr4.__file__)))
+    for pattern in ('antlr4_python3_runtime-*.dist-info', 'antlr4_python3_runtime-*.egg-info'):
+        for path in glob.glob(os.path.join(site_packages, pattern)):
+            return os.path.basename(path)[len('antlr4_python3_runtime-'):].rsplit('.', 1)[0]
+    try:
+        from importlib.metadata import version
+        return version('antlr4-python3-runtime')
+    except Exception:
+        return 'unknown'
+
+def grammar_fingerprint():
+    # Otisk gramatiky (serializované ATN lexeru a parseru), verze runtime a formátu cache
+    digest = hashlib.sha256()
+    digest.update(f"format {FORMAT_VERSION}; antlr4 runtime {runtime_version()}\n".encode('utf-8'))
+    for serialized in (lexer_serialized_atn(), parser_serialized_atn()):
+        digest.update(','.join(str(value) for value in serialized).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+class _SnapshotWriter:
+    # Převádí DFA na JSON; sdílené objekty (kontexty, predikáty) se ukládají jednou a odkazují indexem
+    def __init__(self, atn, error_state):
+        self.atn = atn
+        self.error_state = error_state
+        self.contexts = []
+        self.context_ids = {}
+        self.semantics = []
+        self.semantic_ids = {}
+
+    def context(self, root):
+        # Graf predikčních kontextů může být hluboký, proto post-order bez rekurze
+        pending = [root]
+        while pending:
+            ctx = pending[-1]
+            if ctx is None or id(ctx) in self.context_ids:
+                pending.pop()
+                continue
+            if isinstance(ctx, EmptyPredictionContext):
+                parents = []
+            elif isinstance(ctx, SingletonPredictionContext):
+                parents = [ctx.parentCtx]
+            else:
+                parents = ctx.parents
+            missing = [parent for parent in parents if parent is not None and id(parent) not in self.context_ids]
+            if missing:
+                pending.extend(missing)
+                continue
+            pending.pop()
+            if isinstance(ctx, EmptyPredictionContext):
+                entry = ['$']
+            elif isinstance(ctx, SingletonPredictionContext):
+                entry = ['s', self._context_id(ctx.parentCtx), ctx.returnState]
+            elif isinstance(ctx, ArrayPredictionContext):
+                entry = ['a', [self._context_id(parent) for parent in ctx.parents], list(ctx.returnStates)]
+            else:
+                raise TypeError(f"unsupported prediction context {type(ctx).__name__}")
+            self.context_ids[id(ctx)] = len(self.contexts)
+            self.contexts.append(entry)
+        return self._context_id(root)
+
+    def _context_id(self, ctx):
+        return None if ctx is None else self.context_ids[id(ctx)]
+
+    def semantic(self, semantic):
+        key = id(semantic)
+        if key in self.semantic_ids:
+            return self.semantic_ids[key]
+        if semantic is SemanticContext.NONE:
+            entry = ['none']
+        elif isinstance(semantic, PrecedencePredicate):
+            entry = ['prec', semantic.precedence]
+        elif isinstance(semantic, Predicate):
+            entry = ['pred', semantic.ruleIndex, semantic.predIndex, semantic.isCtxDependent]
+        elif isinstance(semantic, (AND, OR)):
+            entry = ['and' if isinstance(semantic, AND) else 'or', [self.semantic(operand) for operand in semantic.opnds]]
+        else:
+            raise TypeError(f"unsupported semantic context {type(semantic).__name__}")
+        self.semantic_ids[key] = len(self.semantics)
+        self.semantics.append(entry)
+        return self.semantic_ids[key]
+
+    def executor(self, executor):
+        # Akce lexeru se odkazují indexem do atn.lexerActions
+        if executor is None:
+            return None
+        actions = []
+        for action in executor.lexerActions:
+            if isinstance(action, LexerIndexedCustomAction):
+                actions.append([action.offset, self._action_index(action.action)])
+            else:
+                actions.append(self._action_index(action))
+        return actions
+
+    def _action_index(self, action):
+        for index, candidate in enumerate(self.atn.lexerActions or []):
+            if candidate is action or candidate == action:
+                return index
+        raise ValueError(f"lexer action {action} is not part of the ATN")
+
+    def config_set(self, configs):
+        entries = []
+        for config in configs:
+            entry = [config.state.stateNumber, config.alt, self.context(config.context),
+                     self.semantic(config.semanticContext), config.reachesIntoOuterContext,
+                     config.precedenceFilterSuppressed]
+            if isinstance(config, LexerATNConfig):
+                entry += [self.executor(config.lexerActionExecutor), config.passedThroughNonGreedyDecision]
+            entries.append(entry)
+        conflicting = sorted(configs.conflictingAlts) if configs.conflictingAlts is not None else None
+        return [entries, configs.fullCtx, configs.uniqueAlt, conflicting, configs.hasSemanticContext,
+                configs.dipsIntoOuterContext, isinstance(configs, OrderedATNConfigSet)]
+
+    def dfa(self, dfa):
+        # Stavy se číslují pořadím v seznamu; kromě dfa.states se zahrnou i stavy dosažitelné hranami
+        states = []
+        indices = {}
+        def index_of(state):
+            if state is self.error_state:
+                return ERROR_TARGET
+            if id(state) not in indices:
+                indices[id(state)] = len(states)
+                states.append(state)
+            return indices[id(state)]
+
+        for state in dfa.sortedStates():
+            index_of(state)
+        precedence_edges = None
+        if dfa.precedenceDfa:
+            precedence_edges = [[precedence, index_of(state)]
+                                for precedence, state in enumerate(dfa.s0.edges or []) if state is not None]
+            s0 = None
+        else:
+            s0 = index_of(dfa.s0) if dfa.s0 is not None else None
+
+        entries = []
+        position = 0
+        while position < len(states): # seznam se může během průchodu prodlužovat
+            state = states[position]
+            position += 1
+            edges = [[symbol, index_of(target)] for symbol, target in enumerate(state.edges or []) if target is not None]
+            predicates = None
+            if state.predicates is not None:
+                predicates = [[self.semantic(item.pred), item.alt] for item in state.predicates]
+            entries.append([state.stateNumber, self.config_set(state.configs), state.isAcceptState, state.prediction,
+                            state.requiresFullContext, predicates, self.executor(state.lexerActionExecutor),
+                            len(state.edges) if state.edges is not None else None, edges])
+        return {'decision': dfa.decision, 'precedence': dfa.precedenceDfa, 's0': s0,
+                'precedence_edges': precedence_edges, 'states': entries}
+
+class _SnapshotReader:
+    # Obnoví objekty runtime ze snapshotu
+    def __init__(self, atn, error_state, contexts, semantics, context_cache=None):
+        self.atn = atn
+        self.error_state = error_state
+        self.semantics = [None] * len(semantics)
+        for index, entry in enumerate(semantics):
+            self.semantics[index] = self._semantic(entry)
+        self.contexts = []
+        for entry in contexts:
+            ctx = self._context(entry)
+            if context_cache is not None:
+                ctx = context_cache.add(ctx)
+            self.contexts.append(ctx)
+
+    def _context(self, entry):
+        kind = entry[0]
+        if kind == '$':
+            return PredictionContext.EMPTY
+        if kind == 's':
+            return SingletonPredictionContext.create(self.context(entry[1]), entry[2])
+        if kind == 'a':
+            return ArrayPredictionContext([self.context(parent) for parent in entry[1]], list(entry[2]))
+        raise ValueError(f"unknown prediction context kind {kind!r}")
+
+    def context(self, index):
+        return None if index is None else self.contexts[index]
+
+    def _semantic(self, entry):
+        kind = entry[0]
+        if kind == 'none':
+            return SemanticContext.NONE
+        if kind == 'prec':
+            return PrecedencePredicate(entry[1])
+        if kind == 'pred':
+            return Predicate(entry[1], entry[2], entry[3])
+        if kind in ('and', 'or'):
+            # Konstruktory AND/OR operandy zjednodušují, snapshot už je ale zjednodušený
+            semantic = object.__new__(AND if kind == 'and' else OR)
+            semantic.opnds = [self.semantics[operand] for operand in entry[1]]
+            return semantic
+        raise ValueError(f"unknown semantic context kind {kind!r}")
+
+    def executor(self, entry):
+        if entry is None:
+            return None
+        actions = []
+        for action in entry:
+            if isinstance(action, list):
+                actions.append(LexerIndexedCustomAction(action[0], self.atn.lexerActions[action[1]]))
+            else:
+                actions.append(self.atn.lexerActions[action])
+        return LexerActionExecutor(actions)
+
+    def config_set(self, entry):
+        entries, full_ctx, unique_alt, conflicting, has_semantic, dips, ordered = entry
+        configs = OrderedATNConfigSet() if ordered else ATNConfigSet(full_ctx)
+        configs.fullCtx = full_ctx
+        for item in entries:
+            state = self.atn.states[item[0]]
+            if len(item) > 6:
+                config = LexerATNConfig(state, item[1], self.context(item[2]), self.semantics[item[3]],
+                                        self.executor(item[6]))
+                config.passedThroughNonGreedyDecision = item[7]
+            else:
+                config = ATNConfig(state, item[1], self.context(item[2]), self.semantics[item[3]])
+            config.reachesIntoOuterContext = item[4]
+            config.precedenceFilterSuppressed = item[5]
+            configs.configs.append(config)
+        configs.uniqueAlt = unique_alt
+        configs.conflictingAlts = set(conflicting) if conflicting is not None else None
+        configs.hasSemanticContext = has_semantic
+        configs.dipsIntoOuterContext = dips
+        configs.setReadonly(True) # stavy v DFA mají vždy jen pro čtení
+        return configs
+
+    def restore(self, dfa, entry):
+        # Naplní prázdné DFA ze snapshotu
+        states = []
+        for item in entry['states']:
+            state = DFAState(item[0], self.config_set(item[1]))
+            state.isAcceptState = item[2]
+            state.prediction = item[3]
+            state.requiresFullContext = item[4]
+            if item[5] is not None:
+                state.predicates = [PredPrediction(self.semantics[pred], alt) for pred, alt in item[5]]
+            state.lexerActionExecutor = self.executor(item[6])
+            if item[7] is not None:
+                state.edges = [None] * item[7]
+            states.append(state)
+
+        def target(index):
+            return self.error_state if index == ERROR_TARGET else states[index]
+
+        for state, item in zip(states, entry['states']):
+            for symbol, index in item[8]:
+                state.edges[symbol] = target(index)
+            dfa.states[state] = state
+        if entry['precedence']:
+            for precedence, index in entry['precedence_edges']:
+                dfa.setPrecedenceStartState(precedence, target(index))
+        elif entry['s0'] is not None:
+            dfa.s0 = target(entry['s0'])
+
+def _recognizers():
+    # (jméno, třída, chybový stav simulátoru)
+    return [('lexer', LanguageLexer, LexerATNSimulator.ERROR),
+            ('parser', LanguageParser, ATNSimulator.ERROR)]
+
+def _is_cold(recognizer):
+    for dfa in recognizer.decisionsToDFA:
+        if dfa.states or (dfa.precedenceDfa and dfa.s0.edges) or (not dfa.precedenceDfa and dfa.s0 is not None):
+            return False
+    return True
+
+def _reset(recognizer):
+    recognizer.decisionsToDFA[:] = [DFA(state, decision) for decision, state in enumerate(recognizer.atn.decisionToState)]
+
+def snapshot():
+    # Vrátí aktuální DFA lexeru i parseru jako slovník připravený pro JSON
+    data = {'format': FORMAT_VERSION, 'fingerprint': grammar_fingerprint(), 'runtime': runtime_version()}
+    for name, recognizer, error_state in _recognizers():
+        writer = _SnapshotWriter(recognizer.atn, error_state)
+        dfas = [writer.dfa(dfa) for dfa in recognizer.decisionsToDFA]
+        data[name] = {'contexts': writer.contexts, 'semantics': writer.semantics, 'dfas': dfas}
+    return data
+
+def restore(data):
+    # Načte snapshot do DFA lexeru a parseru; vrací False, pokud neodpovídá gramatice nebo DFA nejsou prázdná
+    if data.get('format') != FORMAT_VERSION or data.get('fingerprint') != grammar_fingerprint():
+        return False
+    if not all(_is_cold(recognizer) for _, recognizer, _ in _recognizers()):
+        return False
+    try:
+        for name, recognizer, error_state in _recognizers():
+            section = data[name]
+            if len(section['dfas']) != len(recognizer.decisionsToDFA):
+                raise ValueError(f"{name} has {len(recognizer.decisionsToDFA)} decisions, cache has {len(section['dfas'])}")
+            # Kontexty parseru sdílí PredictionContextCache, lexer si vytváří vlastní pro každou instanci
+            context_cache = getattr(recognizer, 'sharedContextCache', None)
+            reader = _SnapshotReader(recognizer.atn, error_state, section['contexts'], section['semantics'], context_cache)
+            for dfa, entry in zip(recognizer.decisionsToDFA, section['dfas']):
+                reader.restore(dfa, entry)
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        for _, recognizer, _ in _recognizers():
+            _reset(recognizer)
+        raise ValueError(f"corrupted DFA cache: {e}") from e
+    return True
+
+def save_dfa_cache(path=DEFAULT_CACHE_PATH):
+    data = snapshot()
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(temporary_path, path)
+    return data
+
+def load_dfa_cache(path=DEFAULT_CACHE_PATH):
+    # Vrací True, pokud byla cache načtena; zastaralá nebo poškozená cache se jen ohlásí
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        print(f"Warning: Cannot read DFA cache {path}: {e}", file=sys.stderr)
+        return False
+    try:
+        loaded = restore(data)
+    except ValueError as e:
+        print(f"Warning: Ignoring DFA cache {path}: {e}", file=sys.stderr)
+        return False
+    if not loaded and data.get('fingerprint') != grammar_fingerprint():
+        print(f"Warning: DFA cache {path} does not match the grammar or ANTLR runtime, "
+              f"rebuild it with: python -m src.parser.dfa_cache build", file=sys.stderr)
+    return loaded
+
+def ensure_loaded():
+    # Načte cache nejvýše jednou za běh procesu, před prvním parsováním
+    global _load_attempted
+    if _load_attempted:
+        return
+    _load_attempted = True
+    setting = os.environ.get('PJP_DFA_CACHE', '')
+    if setting == '0':
+        return
+    load_dfa_cache(setting or DEFAULT_CACHE_PATH)
+
+def default_corpus():
+    # Ukázkové programy z repozitáře (bez vygenerovaného kódu)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    paths = sorted(glob.glob(os.path.join(root, 'sample_inputs', '*', '*.txt')))
+    return [path for path in paths if not os.path.basename(path).startswith('generated_')]
+
+def build_dfa_cache(paths, output_path=DEFAULT_CACHE_PATH):
+    # Přeloží trénovací korpus ve studeném procesu a uloží zahřáté DFA
+    from src.compiler.compiler import WARMUP_SOURCE, compile_source
+    global _load_attempted
+    _load_attempted = True # stávající cache se nesmí načíst, korpus se parsuje od nuly
+    for _, recognizer, _ in _recognizers():
+        _reset(recognizer)
+    compile_source(WARMUP_SOURCE, "<warmup>")
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            compile_source(f.read(), path)
+    return save_dfa_cache(output_path)
+
+def describe(data, file=sys.stdout):
+    print(f"Format {data.get('format')}, ANTLR runtime {data.get('runtime')}, fingerprint {data.get('fingerprint', '')[:16]}", file=file)
+    matches = data.get('fingerprint') == grammar_fingerprint()
+    print(f"Matches current grammar and runtime: {'yes' if matches else 'no'}", file=file)
+    for name in ('lexer', 'parser'):
+        section = data.get(name, {})
+        dfas = section.get('dfas', [])
+        states = sum(len(dfa['states']) for dfa in dfas)
+        configs = sum(len(state[1][0]) for dfa in dfas for state in dfa['states'])
+        print(f"{name}: {len(dfas)} decisions, {states} DFA states, {configs} ATN configs, "
+              f"{len(section.get('contexts', []))} prediction contexts", file=file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the persisted ANTLR prediction DFA cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="parse a training corpus and save the warmed DFA")
+    build.add_argument("sources", nargs="*", help="training programs (default: sample_inputs/*/*.txt)")
+    build.add_argument("--output", default=DEFAULT_CACHE_PATH, help=f"cache file (default: {DEFAULT_CACHE_PATH})")
+    info = subparsers.add_parser("info", help="describe a cache file")
+    info.add_argument("path", nargs="?", default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        paths = args.sources or default_corpus()
+        try:
+            data = build_dfa_cache(paths, args.output)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Saved DFA cache trained on {len(paths)} files to {args.output}")
+        describe(data)
+    else:
+        try:
+            with open(args.path, 'r', encoding='utf-8') as f:
+                describe(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read DFA cache {args.path}: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,26 +6,34 @@
 
 import sys
 import antlr4
-from antlr4 import CommonTokenStream, InputStream
+from antlr4 import CommonTokenStream
 from antlr4.error.ErrorListener import ErrorListener
 from src.parser.LanguageLexer import LanguageLexer
 from src.parser.LanguageParser import LanguageParser
+from src.parser.chunked_stream import ChunkedFileStream, copy_token_text
 
 class SyntaxErrorListener(ErrorListener):
     # Třída pro zpracování syntaktických chyb
     def __init__(self):
         super(SyntaxErrorListener, self).__init__()
         self.syntax_errors = []
+        self.error_positions = [] # (řádek, sloupec) ke každé chybě v syntax_errors
 
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
         # Funkce pro zpracování syntaktických chyb
         error_message = f"Syntax error at line {line}, column {column}: {msg}"
         self.syntax_errors.append(error_message)
+        self.error_positions.append((line, column))
         
     def has_errors(self):
         # Funkce pro kontrolu, zda byly nalezeny syntaktické chyby
         return len(self.syntax_errors) > 0
     
+    def errors_in_source_order(self):
+        # Chyby seřazené podle pozice ve zdroji (lexer může běžet celý před parserem)
+        order = sorted(range(len(self.syntax_errors)), key=lambda index: self.error_positions[index])
+        return [self.syntax_errors[index] for index in order]
+
     def report_errors(self):
         # Funkce pro vypsání všech nalezených syntaktických chyb
         for error in self.syntax_errors:
@@ -35,11 +43,11 @@ def parse_file(file_path):
     # Funkce pro syntaktickou analýzu zdrojového souboru
     # Vrací parse tree, pokud nebyly nalezeny žádné syntaktické chyby, jinak None
     try:
-        # Čtení vstupního souboru
-        input_stream = InputStream(open(file_path, 'r').read())
+        # Čtení vstupního souboru po blocích (celý soubor není v paměti najednou)
+        input_stream = ChunkedFileStream(file_path, encoding='utf-8')
         
-        # Vytvoření lexikálního analyzátoru (lexer)
-        lexer = LanguageLexer(input_stream)
+        # Vytvoření lexikálního analyzátoru (lexer), tokeny si kopírují svůj text
+        lexer = copy_token_text(LanguageLexer(input_stream))
         
         # Vytvoření tokenového proudu z lexeru
         token_stream = CommonTokenStream(lexer)
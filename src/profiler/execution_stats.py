@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Statistiky běhu interpretru
+# Objekt ExecutionStats se předává do Interpreter.run_instrumented(), který do něj
+# zapisuje počty vykonaných instrukcí, přístupy k proměnným a volitelně i časy.
+
+import json
+import sys
+import time
+
+# Rozdělení opcode do tříd (odpovídá přehledu instrukcí v README)
+OPCODE_CLASSES = {
+    'push': 'stack', 'pop': 'stack', 'dup': 'stack', 'load': 'stack', 'save': 'stack', 'tee': 'stack',
+    'add': 'arithmetic', 'sub': 'arithmetic', 'mul': 'arithmetic', 'div': 'arithmetic',
+    'mod': 'arithmetic', 'uminus': 'arithmetic', 'inc': 'arithmetic',
+    'and': 'logical', 'or': 'logical', 'not': 'logical',
+    'eq': 'comparison', 'lt': 'comparison', 'gt': 'comparison',
+    'jmp': 'control', 'fjmp': 'control', 'label': 'control', 'select': 'control',
+    'print': 'io', 'read': 'io', 'emit': 'io',
+    'itof': 'conversion',
+    'concat': 'string', 'append': 'string',
+}
+
+class ExecutionStats:
+    # Třída pro sběr statistik během vykonávání programu
+
+    def __init__(self, timing=False):
+        self.timing = timing # Měřit kumulativní čas pro jednotlivé opcode?
+        self.clock = time.perf_counter
+        self.opcode_counts = {} # opcode -> počet vykonání
+        self.instruction_counts = [] # index instrukce -> počet vykonání
+        self.variable_loads = {} # proměnná -> počet instrukcí load
+        self.variable_saves = {} # proměnná -> počet instrukcí save
+        self.opcode_time = {} # opcode -> kumulativní čas v sekundách (jen pokud timing=True)
+        self.dispatch_count = 0 # Celkový počet vykonaných instrukcí
+        self.max_stack_depth = 0 # Nejvyšší dosažená hloubka zásobníku
+        self.wall_time = 0.0
+        self._started = None
+
+    def start(self, instruction_count):
+        # Připraví čítače pro program s daným počtem instrukcí a vrátí seznam čítačů instrukcí
+        if len(self.instruction_counts) != instruction_count:
+            self.instruction_counts = [0] * instruction_count
+        self._started = self.clock()
+        return self.instruction_counts
+
+    def finish(self):
+        if self._started is not None:
+            self.wall_time += self.clock() - self._started
+            self._started = None
+
+    def class_counts(self):
+        # Počty vykonání seskupené podle tříd opcode
+        counts = {}
+        for opcode, count in self.opcode_counts.items():
+            opcode_class = OPCODE_CLASSES.get(opcode, 'other')
+            counts[opcode_class] = counts.get(opcode_class, 0) + count
+        return counts
+
+    def class_time(self):
+        # Kumulativní čas seskupený podle tříd opcode
+        times = {}
+        for opcode, elapsed in self.opcode_time.items():
+            opcode_class = OPCODE_CLASSES.get(opcode, 'other')
+            times[opcode_class] = times.get(opcode_class, 0.0) + elapsed
+        return times
+
+    def hot_instructions(self, limit=10):
+        # Vrátí nejčastěji vykonávané instrukce jako seznam (index, počet)
+        ranked = sorted(enumerate(self.instruction_counts), key=lambda item: item[1], reverse=True)
+        return [(index, count) for index, count in ranked[:limit] if count > 0]
+
+    def to_dict(self):
+        # Převod statistik na slovník vhodný pro JSON
+        result = {
+            'dispatch_count': self.dispatch_count,
+            'max_stack_depth': self.max_stack_depth,
+            'wall_time': self.wall_time,
+            'opcode_counts': dict(sorted(self.opcode_counts.items())),
+            'class_counts': dict(sorted(self.class_counts().items())),
+            'instruction_counts': self.instruction_counts,
+            'variable_loads': dict(sorted(self.variable_loads.items())),
+            'variable_saves': dict(sorted(self.variable_saves.items())),
+        }
+        if self.timing:
+            result['opcode_time'] = dict(sorted(self.opcode_time.items()))
+            result['class_time'] = dict(sorted(self.class_time().items()))
+        return result
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self, instructions=None, file=None):
+        # Vypíše čitelný přehled statistik
+        file = file if file is not None else sys.stderr
+        print("--- Execution statistics ---", file=file)
+        print(f"dispatched instructions: {self.dispatch_count}", file=file)
+        print(f"max stack depth:         {self.max_stack_depth}", file=file)
+        print(f"wall time:               {self.wall_time:.6f} s", file=file)
+
+        print("opcodes:", file=file)
+        for opcode, count in sorted(self.opcode_counts.items(), key=lambda item: item[1], reverse=True):
+            line = f"  {opcode:<8} {count:>12}"
+            if self.timing:
+                elapsed = self.opcode_time.get(opcode, 0.0)
+                line += f"  {elapsed:10.6f} s  {elapsed / count * 1e9:8.0f} ns/op"
+            print(line, file=file)
+
+        if self.timing:
+            print("time per opcode class:", file=file)
+            for opcode_class, elapsed in sorted(self.class_time().items(), key=lambda item: item[1], reverse=True):
+                print(f"  {opcode_class:<12} {elapsed:10.6f} s", file=file)
+
+        if self.variable_loads or self.variable_saves:
+            print("variables (load / save):", file=file)
+            for name in sorted(set(self.variable_loads) | set(self.variable_saves)):
+                print(f"  {name:<12} {self.variable_loads.get(name, 0):>10} / {self.variable_saves.get(name, 0)}", file=file)
+
+        print("hot instructions:", file=file)
+        for index, count in self.hot_instructions():
+            text = " ".join(instructions[index]) if instructions is not None else ""
+            print(f"  {index:>6}: {count:>10}  {text}", file=file)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Vzorkovací profiler pro Interpreter
+# Profiler v pravidelných intervalech čte program counter běžícího interpretru
+# a počítá, kolikrát byla zachycena která instrukce. Hlavní smyčka interpretru
+# se nijak nemění (žádné háčky na každou instrukci), takže režie je minimální.
+# Pomocí tabulky řádků z bytecode se vzorky mapují zpět na řádky zdrojového kódu.
+
+import signal
+import sys
+import threading
+
+class SamplingProfiler:
+    # Třída pro periodické vzorkování program counteru interpretru
+
+    def __init__(self, interpreter, interval=0.001, source_name="program"):
+        self.interpreter = interpreter
+        self.interval = interval # Interval vzorkování v sekundách
+        self.source_name = source_name # Název programu (kořen ve flame grafu)
+        self.samples = {} # Index instrukce -> počet vzorků
+        self.total_samples = 0
+        self._thread = None
+        self._stop_event = None
+        self._previous_handler = None
+        self._use_signal = False
+
+    def start(self):
+        # Spustí vzorkování
+        # Na Unixu používáme časovač ITIMER_PROF (měří čas CPU procesu), jinde vlákno se sleep
+        self._use_signal = hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+        if self._use_signal:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._handle_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # Zastaví vzorkování
+        if self._use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        elif self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def _handle_signal(self, signum, frame):
+        self._take_sample()
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.interval):
+            self._take_sample()
+
+    def _take_sample(self):
+        # Interpreter zvyšuje pc před vykonáním instrukce, právě vykonávaná instrukce je tedy pc - 1
+        pc = self.interpreter.pc - 1
+        if pc < 0 or pc >= len(self.interpreter.instructions):
+            return
+        self.samples[pc] = self.samples.get(pc, 0) + 1
+        self.total_samples += 1
+
+    def line_hits(self):
+        # Vrátí počty vzorků pro jednotlivé řádky zdrojového kódu (řádek -> počet)
+        # Instrukce bez záznamu v tabulce řádků se počítají pod řádek 0
+        hits = {}
+        for pc, count in self.samples.items():
+            position = self.interpreter.source_position(pc)
+            line = position[0] if position is not None else 0
+            hits[line] = hits.get(line, 0) + count
+        return dict(sorted(hits.items()))
+
+    def collapsed_stacks(self):
+        # Vrátí vzorky ve formátu "collapsed stacks" (program;řádek;opcode -> počet),
+        # který umí zpracovat flamegraph.pl, speedscope a podobné nástroje
+        stacks = {}
+        for pc, count in self.samples.items():
+            position = self.interpreter.source_position(pc)
+            line = position[0] if position is not None else 0
+            opcode = self.interpreter.instructions[pc][0]
+            key = f"{self.source_name};line {line};{opcode}"
+            stacks[key] = stacks.get(key, 0) + count
+        return stacks
+
+    def write_collapsed(self, path):
+        # Zapíše vzorky do souboru ve formátu collapsed stacks
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.collapsed_stacks().items()):
+                f.write(f"{stack} {count}\n")
+
+    def report(self, file=None, limit=20):
+        # Vypíše nejčastěji zachycené řádky zdrojového kódu
+        file = file if file is not None else sys.stderr
+        print(f"--- Sampling profile ({self.total_samples} samples, interval {self.interval * 1000:g} ms) ---", file=file)
+        if self.total_samples == 0:
+            print("No samples collected (program finished too quickly).", file=file)
+            return
+
+        hits = sorted(self.line_hits().items(), key=lambda item: item[1], reverse=True)
+        for line, count in hits[:limit]:
+            percent = 100.0 * count / self.total_samples
+            print(f"line {line:>6}: {count:>8} samples ({percent:5.1f} %)", file=file)
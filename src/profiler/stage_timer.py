@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Měření času a paměti jednotlivých fází překladu
+# StageTimer zaznamenává pro každou fázi (načtení souboru, lexer, parser, ...) čas běhu
+# a špičku alokované paměti pomocí tracemalloc. Výsledky lze vypsat nebo uložit jako JSON.
+
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+class StageTimer:
+    # Třída pro měření fází pipeline
+
+    def __init__(self, enabled=True, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = {} # jméno fáze -> {'time': s, 'peak_memory': B, 'allocated': B}
+        self.counts = {} # Počty (tokeny, uzly stromu, instrukce, ...)
+        self._started_tracing = False
+
+    # tracemalloc a json se importují, až když jsou potřeba: vypnutý StageTimer používá
+    # i "main.py run" a import tracemalloc (linecache, tokenize, pickle) by zpomalil start
+
+    def start(self):
+        # Zapne tracemalloc (pokud už neběží)
+        if self.enabled and self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def stage(self, name):
+        # Context manager pro měření jedné fáze; pokud je měření vypnuté, nic nedělá
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        import tracemalloc
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            result = self.stages.setdefault(name, {'time': 0.0, 'peak_memory': None, 'allocated': None})
+            result['time'] += elapsed
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                result['peak_memory'] = max(result['peak_memory'] or 0, peak - memory_before)
+                result['allocated'] = (result['allocated'] or 0) + (current - memory_before)
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+
+    def total_time(self, names=None):
+        return sum(result['time'] for stage, result in self.stages.items() if names is None or stage in names)
+
+    def to_dict(self, compile_stages=None):
+        # Převod na slovník pro JSON, včetně propustnosti překladače v KB zdrojového kódu za sekundu
+        result = {'stages': self.stages, 'counts': self.counts}
+        source_bytes = self.counts.get('source_bytes')
+        compile_time = self.total_time(compile_stages)
+        if source_bytes and compile_time > 0:
+            result['compile_time'] = compile_time
+            result['throughput_kb_per_s'] = source_bytes / 1024 / compile_time
+        return result
+
+    def write_json(self, path, compile_stages=None):
+        import json
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(compile_stages), f, indent=2)
+
+    def report(self, file=None, compile_stages=None):
+        file = file if file is not None else sys.stderr
+        print("--- Stage timings ---", file=file)
+        for name, result in self.stages.items():
+            line = f"{name:<18} {result['time'] * 1000:10.3f} ms"
+            if result['peak_memory'] is not None:
+                line += f"  peak {result['peak_memory'] / 1024:10.1f} KiB  retained {result['allocated'] / 1024:10.1f} KiB"
+            print(line, file=file)
+        for name, value in self.counts.items():
+            print(f"{name:<18} {value}", file=file)
+        summary = self.to_dict(compile_stages)
+        if 'throughput_kb_per_s' in summary:
+            print(f"compile throughput: {summary['throughput_kb_per_s']:.2f} KB/s", file=file)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Disassembler registrového kódu
+# Vypíše instrukce s čitelnými operandy: registry proměnných jejich jménem, dočasné registry
+# jako t<N>, konstanty jejich hodnotou, cíle skoků jako @<index> a u každé instrukce, kde se
+# mění pozice ve zdrojovém kódu, řádek a sloupec.
+#
+# Použití:
+#   python -m src.register_vm.disassembler <soubor s registrovým kódem>
+#   python -m src.register_vm.disassembler --source <zdrojový soubor>
+
+import sys
+import argparse
+from src.register_vm.encoding import parse_register_code, format_constant
+
+def operand_text(program, operand):
+    kind, index = operand
+    if kind == 'k':
+        type_code, value = program.constants[index]
+        return format_constant(type_code, value)
+    if index in program.variables:
+        return program.variables[index][0]
+    return f"t{index - len(program.variables)}"
+
+def disassemble(program):
+    # Vrátí řádky výpisu pro RegisterProgram
+    lines = []
+    temporaries = program.register_count - len(program.variables)
+    variables = ', '.join(f"{name}:{type_code}" for name, type_code in program.variables.values())
+    lines.append(f"; {len(program.variables)} variables ({variables}), {temporaries} temporaries, "
+                 f"{len(program.constants)} constants, {len(program.code)} instructions")
+    positions = dict((index, (line, column)) for index, line, column in program.line_table)
+    targets = set(operands[-1] for opcode, operands in program.code if opcode in ('jmp', 'jt', 'jf'))
+
+    for pc, (opcode, operands) in enumerate(program.code):
+        texts = []
+        for operand in operands:
+            texts.append(f"@{operand}" if isinstance(operand, int) else operand_text(program, operand))
+        if opcode in ('move', 'print') or len(operands) < 2 or opcode in ('jt', 'jf'):
+            text = f"{opcode:<7} {', '.join(texts)}"
+        else:
+            # Tříadresová instrukce: cíl = operandy
+            text = f"{opcode:<7} {texts[0]} = {', '.join(texts[1:])}"
+        marker = ">" if pc in targets else " "
+        position = positions.get(pc)
+        comment = f"  ; line {position[0]}, column {position[1]}" if position is not None else ""
+        lines.append(f"{marker}{pc:>5}  {text:<40}{comment}".rstrip())
+    if len(program.code) in targets:
+        lines.append(f">{len(program.code):>5}  (end)")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Disassemble register VM code")
+    parser.add_argument("input_file", help="register code, or a source file with --source")
+    parser.add_argument("--source", action="store_true", help="compile the source file to register code first")
+    args = parser.parse_args()
+
+    if args.source:
+        from src.compiler.compiler import compile_path
+        result = compile_path(args.input_file, backend='register')
+        if not result.success:
+            for error in result.errors:
+                print(error, file=sys.stderr)
+            return 1
+        lines = result.generated_code.splitlines()
+        program = parse_register_code(lines)
+    else:
+        try:
+            with open(args.input_file, 'r', encoding='utf-8') as f:
+                program = parse_register_code(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading register code {args.input_file}: {e}", file=sys.stderr)
+            return 1
+
+    for line in disassemble(program):
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Textový formát registrového kódu
+# Registrový kód je alternativou k zásobníkovému kódu (src/code_generator): instrukce jsou
+# tříadresové (add_i r2, r0, k1) a pracují nad polem registrů indexovaným číslem proměnné.
+# Operand r<N> je registr (nejdřív deklarované proměnné, za nimi dočasné registry),
+# k<N> je konstanta z tabulky konstant. Skoky míří přímo na index instrukce, návěští nejsou.
+#
+# Soubor se skládá ze sekcí:
+#   .registers <počet>      počet registrů a pod ním '<index> <typ> <jméno>' pro každou proměnnou
+#   .constants              '<index> <typ> <literál>' (řetězec v uvozovkách jako u push S)
+#   .code                   instrukce '<opcode> <operand> ...'
+#   .linetable              '<index instrukce> <řádek> <sloupec>' jako u zásobníkového kódu
+# Soubor vždy začíná sekcí .registers, podle ní se registrový kód pozná (is_register_code).
+
+REGISTERS_SECTION = ".registers"
+CONSTANTS_SECTION = ".constants"
+CODE_SECTION = ".code"
+LINE_TABLE_SECTION = ".linetable"
+
+# Opcode -> druhy operandů: d = cílový registr, s = registr nebo konstanta, j = index instrukce,
+# * = libovolný počet operandů s (print)
+OPCODES = {
+    'move': 'ds',
+    'add_i': 'dss', 'sub_i': 'dss', 'mul_i': 'dss', 'div_i': 'dss', 'mod_i': 'dss',
+    'add_f': 'dss', 'sub_f': 'dss', 'mul_f': 'dss', 'div_f': 'dss',
+    'concat': 'dss',
+    'eq_i': 'dss', 'eq_f': 'dss', 'eq_s': 'dss', 'ne_i': 'dss', 'ne_f': 'dss', 'ne_s': 'dss',
+    'lt_i': 'dss', 'lt_f': 'dss', 'gt_i': 'dss', 'gt_f': 'dss',
+    'and': 'dss', 'or': 'dss',
+    'neg_i': 'ds', 'neg_f': 'ds', 'not': 'ds', 'itof': 'ds',
+    'jmp': 'j', 'jt': 'sj', 'jf': 'sj',
+    'print': '*',
+    'read_i': 'd', 'read_f': 'd', 'read_b': 'd', 'read_s': 'd',
+}
+
+TYPE_CODES = ('I', 'F', 'B', 'S')
+
+class RegisterProgram:
+    # Načtený registrový kód; operandy jsou dvojice ('r', index) nebo ('k', index), skoky int
+    def __init__(self):
+        self.register_count = 0
+        self.variables = {} # index registru -> (jméno, typový kód)
+        self.constants = [] # (typový kód, hodnota)
+        self.code = [] # (opcode, operandy)
+        self.line_table = [] # (index první instrukce, řádek, sloupec)
+
+def parse_constant(type_code, text):
+    # Převede literál konstanty na hodnotu (stejně jako instrukce push zásobníkového stroje)
+    if type_code == 'I':
+        return int(text)
+    if type_code == 'F':
+        return float(text)
+    if type_code == 'B':
+        if text.lower() not in ('true', 'false'):
+            raise ValueError(f"Invalid boolean constant: {text}")
+        return text.lower() == 'true'
+    if type_code == 'S':
+        if len(text) >= 2 and text.startswith('"') and text.endswith('"'):
+            return text[1:-1]
+        return text
+    raise ValueError(f"Unknown type code: {type_code}")
+
+def format_constant(type_code, value):
+    # Opak parse_constant
+    if type_code == 'B':
+        return 'true' if value else 'false'
+    if type_code == 'S':
+        return f'"{value}"'
+    return str(value)
+
+def format_operand(operand):
+    return f"{operand[0]}{operand[1]}"
+
+def format_instruction(opcode, operands):
+    return ' '.join([opcode] + [str(operand) if isinstance(operand, int) else format_operand(operand)
+                                for operand in operands])
+
+def _parse_operand(text, kinds, program):
+    # Operand ve tvaru r<N> nebo k<N>; d připouští jen registr
+    prefix, number = text[:1], text[1:]
+    if prefix not in kinds or not number.isdigit():
+        raise ValueError(f"invalid operand {text}")
+    index = int(number)
+    limit = program.register_count if prefix == 'r' else len(program.constants)
+    if index >= limit:
+        raise ValueError(f"operand {text} out of range")
+    return (prefix, index)
+
+def _parse_instruction(line, program):
+    parts = line.split()
+    opcode = parts[0].lower()
+    signature = OPCODES.get(opcode)
+    if signature is None:
+        raise ValueError(f"unknown opcode '{opcode}'")
+    arguments = parts[1:]
+    if signature == '*':
+        return (opcode, tuple(_parse_operand(argument, 'rk', program) for argument in arguments))
+    if len(arguments) != len(signature):
+        raise ValueError(f"{opcode} expects {len(signature)} operands, got {len(arguments)}")
+    operands = []
+    for kind, argument in zip(signature, arguments):
+        if kind == 'j':
+            if not argument.isdigit():
+                raise ValueError(f"invalid jump target {argument}")
+            operands.append(int(argument))
+        else:
+            operands.append(_parse_operand(argument, 'r' if kind == 'd' else 'rk', program))
+    return (opcode, tuple(operands))
+
+def parse_register_code(lines):
+    # Načte řádky registrového kódu do RegisterProgram, při chybě formátu vyvolá ValueError
+    program = RegisterProgram()
+    section = None
+
+    for index, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if line.startswith('.'):
+                parts = line.split()
+                section = parts[0]
+                if section == REGISTERS_SECTION:
+                    if len(parts) != 2 or not parts[1].isdigit():
+                        raise ValueError("expected '.registers <count>'")
+                    program.register_count = int(parts[1])
+                elif section not in (CONSTANTS_SECTION, CODE_SECTION, LINE_TABLE_SECTION):
+                    raise ValueError(f"unknown section {section}")
+            elif section == REGISTERS_SECTION:
+                register, type_code, name = line.split()
+                if not register.isdigit() or int(register) >= program.register_count or type_code not in TYPE_CODES:
+                    raise ValueError("invalid register entry")
+                program.variables[int(register)] = (name, type_code)
+            elif section == CONSTANTS_SECTION:
+                constant, type_code, text = line.split(None, 2)
+                if int(constant) != len(program.constants):
+                    raise ValueError("constants must be numbered from 0 in order")
+                program.constants.append((type_code, parse_constant(type_code, text)))
+            elif section == CODE_SECTION:
+                program.code.append(_parse_instruction(line, program))
+            elif section == LINE_TABLE_SECTION:
+                entry = line.split()
+                if len(entry) != 3 or not all(part.isdigit() for part in entry):
+                    raise ValueError("invalid line table entry")
+                program.line_table.append(tuple(int(part) for part in entry))
+            else:
+                raise ValueError("expected a section header")
+        except ValueError as e:
+            raise ValueError(f"line {index + 1}: {e}: {line}") from None
+
+    for opcode, operands in program.code:
+        if opcode in ('jmp', 'jt', 'jf') and operands[-1] > len(program.code):
+            raise ValueError(f"jump target {operands[-1]} out of range")
+    program.line_table.sort()
+    return program
+
+def is_register_code(path):
+    # Rozliší registrový a zásobníkový kód podle první neprázdné řádky souboru
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                return line.split()[0] == REGISTERS_SECTION
+    return False
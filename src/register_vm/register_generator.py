@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Generátor registrového kódu z IR programu (alternativa k CodeGenerator)
+# Každá proměnná má vlastní registr, mezivýsledky výrazů dostávají dočasné registry, které se
+# přidělují jako zásobník (po zpracování operandů se uvolní), a literály jsou konstanty v tabulce.
+# Výraz může dostat cílový registr (target): přiřazení 'a = b + c' se tak přeloží na jedinou
+# instrukci 'add_i a, b, c' místo load b; load c; add I; save a; load a; pop.
+#
+# Typy a konverze odpovídají CodeGenerator, včetně toho, že ternární operátor hodnotu větve
+# nepřevádí (float proměnná může po 'f = true ? 5 : 2.5' obsahovat int a vypíše se jako 5).
+# itof se proto v aritmetice vkládá stejně jako tam, jen pro pravý int operand vedle float
+# levého; instrukce _f musí zvládnout i operand typu int. Porovnání dostávají int operand
+# vždy převedený (jako eq F/lt F v zásobníkovém stroji). itof int literálu se nahradí
+# float konstantou.
+
+from src.ir import nodes
+from src.ir.nodes import IRVisitor
+from src.type_checker.type_checker import Type
+from src.code_generator.emitter import ListEmitter
+from src.register_vm.encoding import (REGISTERS_SECTION, CONSTANTS_SECTION, CODE_SECTION, LINE_TABLE_SECTION,
+                                      format_instruction)
+
+TYPE_CODES = {Type.INT: 'I', Type.FLOAT: 'F', Type.BOOL: 'B', Type.STRING: 'S'}
+SUFFIXES = {Type.INT: '_i', Type.FLOAT: '_f', Type.STRING: '_s'}
+ZERO_VALUES = {Type.INT: '0', Type.FLOAT: '0.0', Type.BOOL: 'false', Type.STRING: '""'}
+LITERAL_TYPES = {'int': Type.INT, 'float': Type.FLOAT, 'bool': Type.BOOL, 'string': Type.STRING}
+
+ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div', '%': 'mod'}
+COMPARISONS = {'<': 'lt', '>': 'gt', '==': 'eq', '!=': 'ne'}
+
+class RegisterGenerator(IRVisitor):
+    # Operandy během generování: ('v', n) proměnná, ('t', n) dočasný registr, ('k', n) konstanta
+    # Čísla registrů se určí až v get_generated_code(): proměnné 0..V-1, dočasné registry za nimi
+    def __init__(self):
+        self.emitter = ListEmitter() # Instrukce jako [opcode, operandy...], pozice pro tabulku řádků
+        self.current_position = (0, 0)
+        self.variables = {} # jméno -> (operand, typ)
+        self.variable_types = [] # (jméno, typ) podle čísla registru proměnné
+        self.constants = {} # (typový kód, text) -> operand
+        self.constant_keys = [] # (typový kód, text) podle čísla konstanty
+        self.temp_top = 0 # První volný dočasný registr
+        self.temp_count = 0 # Nejvyšší počet současně použitých dočasných registrů
+        self.labels = [] # číslo návěští -> index instrukce
+        self._assigned = {} # id(uzel výrazu) -> jména proměnných, do kterých výraz přiřazuje
+
+    def visit(self, node):
+        # Stejně jako CodeGenerator si pamatuje pozici uzlu pro tabulku řádků
+        previous_position = self.current_position
+        self.current_position = (node.line, node.column)
+        try:
+            return node.accept(self)
+        finally:
+            self.current_position = previous_position
+
+    def expression(self, node, target=None):
+        # Vygeneruje výraz a vrátí (operand s výsledkem, typ)
+        # S target (registr proměnné) musí být výsledek v target
+        previous_position = self.current_position
+        self.current_position = (node.line, node.column)
+        try:
+            return getattr(self, node.visit_method)(node, target)
+        finally:
+            self.current_position = previous_position
+
+    def add_instruction(self, opcode, *operands):
+        self.emitter.emit([opcode, *operands], self.current_position)
+
+    @property
+    def instruction_count(self):
+        return self.emitter.instruction_count
+
+    # -------------------------------------------------------------------------------
+    # Registry, konstanty a návěští
+
+    def constant(self, type_value, text):
+        key = (TYPE_CODES[type_value], text)
+        operand = self.constants.get(key)
+        if operand is None:
+            operand = ('k', len(self.constants))
+            self.constants[key] = operand
+            self.constant_keys.append(key)
+        return operand
+
+    def temporary(self):
+        operand = ('t', self.temp_top)
+        self.temp_top += 1
+        self.temp_count = max(self.temp_count, self.temp_top)
+        return operand
+
+    def destination(self, target, mark):
+        # Cíl instrukce, která spotřebuje operandy: target, nebo dočasný registr po uvolnění
+        # registrů operandů (výsledek může dostat stejný registr jako levý operand)
+        self.temp_top = mark
+        return target if target is not None else self.temporary()
+
+    def move_to(self, target, operand):
+        # Přesune hotový výsledek do cílového registru (pokud nějaký je)
+        if target is None or target == operand:
+            return operand
+        self.add_instruction('move', target, operand)
+        return target
+
+    def get_new_label(self):
+        self.labels.append(None)
+        return len(self.labels) - 1
+
+    def place_label(self, label):
+        self.labels[label] = self.emitter.instruction_count
+
+    def assigned_names(self, node):
+        # Jména proměnných, do kterých výraz (nebo jeho podvýraz) přiřazuje
+        names = self._assigned.get(id(node))
+        if names is None:
+            names = frozenset((node.name,)) if isinstance(node, nodes.AssignmentExpr) else NO_NAMES
+            for child in _subexpressions(node):
+                child_names = self.assigned_names(child)
+                if child_names:
+                    names = names | child_names
+            self._assigned[id(node)] = names
+        return names
+
+    def protect(self, operand, later):
+        # Proměnná použitá jako operand se čte až instrukcí, která výsledek spotřebuje;
+        # pokud ji mezitím přepíše přiřazení v některém z dalších výrazů, zkopíruje se předem
+        if operand[0] != 'v':
+            return operand
+        name = self.variable_types[operand[1]][0]
+        if any(name in self.assigned_names(node) for node in later):
+            copy = self.temporary()
+            self.add_instruction('move', copy, operand)
+            return copy
+        return operand
+
+    # -------------------------------------------------------------------------------
+    # Příkazy
+
+    def visitProgram(self, ctx):
+        for statement in ctx.statements:
+            self.visit(statement)
+        return None
+
+    def visitEmptyStatement(self, ctx):
+        return None
+
+    def visitDeclarationStatement(self, ctx):
+        # Deklarace proměnnou vynuluje (i při opakovaném provedení v cyklu)
+        var_type = LITERAL_TYPES[ctx.type_name]
+        for var in ctx.identifiers:
+            operand = ('v', len(self.variable_types))
+            self.variables[var.name] = (operand, var_type)
+            self.variable_types.append((var.name, var_type))
+            self.add_instruction('move', operand, self.constant(var_type, ZERO_VALUES[var_type]))
+        return None
+
+    def visitExpressionStatement(self, ctx):
+        self.discard(ctx.expression)
+        return None
+
+    def discard(self, expression):
+        # Výraz se vyhodnotí kvůli přiřazením (a běhovým chybám), výsledek se nepoužije
+        mark = self.temp_top
+        self.expression(expression)
+        self.temp_top = mark
+
+    def visitReadStatement(self, ctx):
+        for var in ctx.identifiers:
+            operand, var_type = self.variables[var.name]
+            self.add_instruction(f"read_{TYPE_CODES[var_type].lower()}", operand)
+        return None
+
+    def visitWriteStatement(self, ctx):
+        mark = self.temp_top
+        expressions = ctx.expressions
+        operands = []
+        for index, expr in enumerate(expressions):
+            operand, _ = self.expression(expr)
+            operands.append(self.protect(operand, expressions[index + 1:]))
+        if operands:
+            self.add_instruction('print', *operands)
+        self.temp_top = mark
+        return None
+
+    def visitBlockStatement(self, ctx):
+        for statement in ctx.statements:
+            self.visit(statement)
+        return None
+
+    def condition(self, ctx):
+        # Vyhodnotí podmínku; dočasný registr se hned uvolní, skok ho přečte jako první
+        mark = self.temp_top
+        operand, _ = self.expression(ctx)
+        self.temp_top = mark
+        return operand
+
+    def visitIfStatement(self, ctx):
+        else_label = self.get_new_label()
+        self.add_instruction('jf', self.condition(ctx.condition), else_label)
+        self.visit(ctx.then_statement)
+        if ctx.else_statement is not None:
+            end_label = self.get_new_label()
+            self.add_instruction('jmp', end_label)
+            self.place_label(else_label)
+            self.visit(ctx.else_statement)
+            self.place_label(end_label)
+        else:
+            self.place_label(else_label)
+        return None
+
+    def visitWhileStatement(self, ctx):
+        # Podmínka je za tělem cyklu, na jednu iteraci tak připadá jen jeden podmíněný skok
+        body_label = self.get_new_label()
+        condition_label = self.get_new_label()
+        self.add_instruction('jmp', condition_label)
+        self.place_label(body_label)
+        self.visit(ctx.body)
+        self.place_label(condition_label)
+        self.add_instruction('jt', self.condition(ctx.condition), body_label)
+        return None
+
+    def visitForStatement(self, ctx):
+        # init; jmp podmínka; tělo; krok; podmínka: jt tělo
+        body_label = self.get_new_label()
+        condition_label = self.get_new_label()
+        if ctx.init:
+            self.discard(ctx.init)
+        if ctx.cond:
+            self.add_instruction('jmp', condition_label)
+        self.place_label(body_label)
+        self.visit(ctx.body)
+        if ctx.step:
+            self.discard(ctx.step)
+        self.place_label(condition_label)
+        if ctx.cond:
+            self.add_instruction('jt', self.condition(ctx.cond), body_label)
+        else:
+            self.add_instruction('jmp', body_label)
+        return None
+
+    # -------------------------------------------------------------------------------
+    # Výrazy
+
+    def visitVariableExpr(self, ctx, target):
+        operand, var_type = self.variables[ctx.name]
+        return self.move_to(target, operand), var_type
+
+    def visitLiteralExpr(self, ctx, target):
+        literal_type = LITERAL_TYPES[ctx.kind]
+        text = ctx.text.lower() if literal_type == Type.BOOL else ctx.text
+        return self.move_to(target, self.constant(literal_type, text)), literal_type
+
+    def visitParenExpr(self, ctx, target):
+        return self.expression(ctx.expression, target)
+
+    def visitUnaryMinusExpr(self, ctx, target):
+        mark = self.temp_top
+        operand, operand_type = self.expression(ctx.expression)
+        destination = self.destination(target, mark)
+        self.add_instruction('neg' + SUFFIXES[operand_type], destination, operand)
+        return destination, operand_type
+
+    def visitNotExpr(self, ctx, target):
+        mark = self.temp_top
+        operand, _ = self.expression(ctx.expression)
+        destination = self.destination(target, mark)
+        self.add_instruction('not', destination, operand)
+        return destination, Type.BOOL
+
+    def operands(self, ctx):
+        # Vygeneruje oba operandy binárního výrazu, levý chrání před přiřazením v pravém
+        left, left_type = self.expression(ctx.left)
+        left = self.protect(left, (ctx.right,))
+        right, right_type = self.expression(ctx.right)
+        return left, left_type, right, right_type
+
+    def emit_binary(self, opcode, target, mark, left, right):
+        destination = self.destination(target, mark)
+        self.add_instruction(opcode, destination, left, right)
+        return destination
+
+    def binary(self, opcode, ctx, target, result_type):
+        mark = self.temp_top
+        left, _, right, _ = self.operands(ctx)
+        return self.emit_binary(opcode, target, mark, left, right), result_type
+
+    def visitMultiplicativeExpr(self, ctx, target):
+        return self.arithmetic(ctx, target)
+
+    def visitAdditiveExpr(self, ctx, target):
+        if ctx.operator == '.':
+            return self.binary('concat', ctx, target, Type.STRING)
+        return self.arithmetic(ctx, target)
+
+    def arithmetic(self, ctx, target):
+        # int op int -> _i, jinak _f; levý int operand _f instrukce zvládne sama (jako add F apod.)
+        mark = self.temp_top
+        left, left_type, right, right_type = self.operands(ctx)
+        if left_type == Type.FLOAT and right_type == Type.INT:
+            right = self.promote(right)
+            right_type = Type.FLOAT
+        result_type = Type.INT if left_type == Type.INT and right_type == Type.INT else Type.FLOAT
+        opcode = ARITHMETIC[ctx.operator] + SUFFIXES[result_type]
+        return self.emit_binary(opcode, target, mark, left, right), result_type
+
+    def float_constant(self, text):
+        # Float konstanta s hodnotou int literálu, None pokud se do floatu nevejde (chyba až za běhu)
+        try:
+            return self.constant(Type.FLOAT, str(float(int(text))))
+        except OverflowError:
+            return None
+
+    def promote(self, operand):
+        # itof do nového dočasného registru, int konstanta se rovnou nahradí float konstantou
+        if operand[0] == 'k':
+            converted = self.float_constant(self.constant_keys[operand[1]][1])
+            if converted is not None:
+                return converted
+        converted = self.temporary()
+        self.add_instruction('itof', converted, operand)
+        return converted
+
+    def comparison(self, ctx, target):
+        # Smíšené int/float operandy se porovnávají jako float
+        mark = self.temp_top
+        left, left_type, right, right_type = self.operands(ctx)
+        if left_type == Type.INT and right_type == Type.FLOAT:
+            left = self.promote(left)
+            left_type = Type.FLOAT
+        elif left_type == Type.FLOAT and right_type == Type.INT:
+            right = self.promote(right)
+        opcode = COMPARISONS[ctx.operator] + SUFFIXES[left_type]
+        return self.emit_binary(opcode, target, mark, left, right), Type.BOOL
+
+    def visitRelationalExpr(self, ctx, target):
+        return self.comparison(ctx, target)
+
+    def visitEqualityExpr(self, ctx, target):
+        return self.comparison(ctx, target)
+
+    def visitAndExpr(self, ctx, target):
+        return self.binary('and', ctx, target, Type.BOOL)
+
+    def visitOrExpr(self, ctx, target):
+        return self.binary('or', ctx, target, Type.BOOL)
+
+    def visitTernaryExpr(self, ctx, target):
+        # Obě větve zapisují do stejného registru; hodnota větve se nepřevádí (viz hlavička)
+        false_label = self.get_new_label()
+        end_label = self.get_new_label()
+        self.add_instruction('jf', self.condition(ctx.cond), false_label)
+        destination = self.destination(target, self.temp_top)
+        _, true_type = self.expression(ctx.th, destination)
+        self.add_instruction('jmp', end_label)
+        self.place_label(false_label)
+        _, false_type = self.expression(ctx.el, destination)
+        self.place_label(end_label)
+        return destination, (true_type if true_type == false_type else Type.FLOAT)
+
+    def visitAssignmentExpr(self, ctx, target):
+        # Výraz zapisuje rovnou do registru proměnné; int do float proměnné se převede na místě
+        operand, var_type = self.variables[ctx.name]
+        expression = ctx.expression
+        if var_type == Type.FLOAT and isinstance(expression, nodes.LiteralExpr) and expression.kind == 'int':
+            converted = self.float_constant(expression.text)
+            if converted is not None:
+                return self.move_to(target, self.move_to(operand, converted)), var_type
+        _, expr_type = self.expression(expression, operand)
+        if var_type == Type.FLOAT and expr_type == Type.INT:
+            self.add_instruction('itof', operand, operand)
+        # Hodnotou přiřazení je proměnná (jako save a load v zásobníkovém kódu)
+        return self.move_to(target, operand), var_type
+
+    # -------------------------------------------------------------------------------
+    # Výstup
+
+    def get_generated_code(self, include_line_table=True):
+        # Sestaví text registrového kódu (formát viz src/register_vm/encoding.py)
+        variable_count = len(self.variable_types)
+        lines = [f"{REGISTERS_SECTION} {variable_count + self.temp_count}"]
+        for index, (name, var_type) in enumerate(self.variable_types):
+            lines.append(f"{index} {TYPE_CODES[var_type]} {name}")
+        lines.append(CONSTANTS_SECTION)
+        for (type_code, text), (_, index) in self.constants.items():
+            lines.append(f"{index} {type_code} {text}")
+        lines.append(CODE_SECTION)
+        for opcode, *operands in self.emitter.code:
+            resolved = []
+            for operand in operands:
+                if isinstance(operand, int): # Číslo návěští -> index instrukce
+                    resolved.append(self.labels[operand])
+                elif operand[0] == 'v':
+                    resolved.append(('r', operand[1]))
+                elif operand[0] == 't':
+                    resolved.append(('r', variable_count + operand[1]))
+                else:
+                    resolved.append(operand)
+            lines.append(format_instruction(opcode, resolved))
+        if include_line_table:
+            lines.append(LINE_TABLE_SECTION)
+            for index, line, column in self.emitter.get_line_table():
+                lines.append(f"{index} {line} {column}")
+        return '\n'.join(lines)
+
+NO_NAMES = frozenset()
+
+def _subexpressions(node):
+    # Přímé podvýrazy uzlu výrazu
+    if isinstance(node, nodes.BinaryExpr):
+        return (node.left, node.right)
+    if isinstance(node, nodes.TernaryExpr):
+        return (node.cond, node.th, node.el)
+    if isinstance(node, (nodes.ParenExpr, nodes.NotExpr, nodes.UnaryMinusExpr, nodes.AssignmentExpr)):
+        return (node.expression,)
+    return ()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Registrový virtuální stroj pro kód z RegisterGenerator (formát viz src/register_vm/encoding.py)
+# Registry i konstanty leží v jednom seznamu (konstanty za registry), operand instrukce je tak
+# vždy jen index do něj. Instrukce se při načtení převedou na n-tice s funkcí operace
+# (operator.add apod.), smyčka v run() rozlišuje jen několik druhů instrukcí a nic dalšího
+# za běhu nekontroluje: typy zaručuje TypeChecker, dělení nulou hlásí přímo Python.
+
+import sys
+import operator
+from bisect import bisect_right
+from src.register_vm.encoding import parse_register_code, format_instruction
+
+# Druhy instrukcí po načtení
+BINARY = 0 # (BINARY, funkce, cíl, a, b)
+MOVE = 1 # (MOVE, cíl, zdroj)
+JUMP_IF_TRUE = 2 # (JUMP_IF_TRUE, podmínka, cíl skoku)
+JUMP_IF_FALSE = 3 # (JUMP_IF_FALSE, podmínka, cíl skoku)
+UNARY = 4 # (UNARY, funkce, cíl, a)
+JUMP = 5 # (JUMP, cíl skoku)
+PRINT = 6 # (PRINT, operandy)
+READ = 7 # (READ, cíl, převod, typový kód)
+
+BINARY_OPERATIONS = {
+    'add_i': operator.add, 'sub_i': operator.sub, 'mul_i': operator.mul,
+    'div_i': operator.floordiv, 'mod_i': operator.mod,
+    'add_f': operator.add, 'sub_f': operator.sub, 'mul_f': operator.mul, 'div_f': operator.truediv,
+    'concat': operator.add,
+    'eq_i': operator.eq, 'eq_f': operator.eq, 'eq_s': operator.eq,
+    'ne_i': operator.ne, 'ne_f': operator.ne, 'ne_s': operator.ne,
+    'lt_i': operator.lt, 'lt_f': operator.lt, 'gt_i': operator.gt, 'gt_f': operator.gt,
+    'and': operator.and_, 'or': operator.or_,
+}
+
+UNARY_OPERATIONS = {'neg_i': operator.neg, 'neg_f': operator.neg, 'not': operator.not_, 'itof': float}
+
+def read_bool(line):
+    if line.lower() == 'true':
+        return True
+    if line.lower() == 'false':
+        return False
+    raise ValueError(f"Invalid boolean input: {line}")
+
+READ_CONVERSIONS = {'read_i': (int, 'I'), 'read_f': (float, 'F'), 'read_b': (read_bool, 'B'), 'read_s': (str, 'S')}
+
+def format_value(value):
+    # Hodnota pro print, bool malými písmeny jako v zásobníkovém stroji
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return str(value)
+
+class RegisterMachine:
+    # Rozhraní odpovídá Interpreter (load_instructions, load_code, run, source_position)
+
+    def __init__(self, input_stream=None, output_stream=None):
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.program = None # RegisterProgram (pro chybová hlášení a disassembler)
+        self.instructions = []
+        self.registers = []
+        self.line_table = []
+        self.pc = 0
+
+    def load_instructions(self, filepath):
+        # Načítá registrový kód ze souboru
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                self.load_lines(f)
+        except FileNotFoundError:
+            print(f"Error: Instruction file not found: {filepath}", file=sys.stderr)
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error reading instruction file {filepath}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    def load_code(self, code):
+        # Načítá registrový kód z řetězce
+        self.load_lines(code.splitlines())
+
+    def load_lines(self, lines):
+        program = parse_register_code(lines)
+        self.program = program
+        self.line_table = program.line_table
+        constant_base = program.register_count
+        # Registry mají do první instrukce, která je zapíše, hodnotu None
+        self.registers = [None] * constant_base + [value for _, value in program.constants]
+
+        def index(operand):
+            return operand[1] if operand[0] == 'r' else constant_base + operand[1]
+
+        instructions = []
+        for opcode, operands in program.code:
+            if opcode in BINARY_OPERATIONS:
+                instruction = (BINARY, BINARY_OPERATIONS[opcode], index(operands[0]), index(operands[1]), index(operands[2]))
+            elif opcode == 'move':
+                instruction = (MOVE, index(operands[0]), index(operands[1]))
+            elif opcode == 'jt':
+                instruction = (JUMP_IF_TRUE, index(operands[0]), operands[1])
+            elif opcode == 'jf':
+                instruction = (JUMP_IF_FALSE, index(operands[0]), operands[1])
+            elif opcode in UNARY_OPERATIONS:
+                instruction = (UNARY, UNARY_OPERATIONS[opcode], index(operands[0]), index(operands[1]))
+            elif opcode == 'jmp':
+                instruction = (JUMP, operands[0])
+            elif opcode == 'print':
+                instruction = (PRINT, tuple(index(operand) for operand in operands))
+            else:
+                conversion, type_code = READ_CONVERSIONS[opcode]
+                instruction = (READ, index(operands[0]), conversion, type_code)
+            instructions.append(instruction)
+        self.instructions = instructions
+
+    def source_position(self, pc):
+        # Pozice (řádek, sloupec) ve zdrojovém kódu pro instrukci na indexu pc, nebo None
+        position = bisect_right(self.line_table, (pc, float('inf'), float('inf'))) - 1
+        if position < 0:
+            return None
+        _, line, column = self.line_table[position]
+        return (line, column)
+
+    def describe_location(self, pc):
+        position = self.source_position(pc)
+        if position is None:
+            return f"instruction {pc}"
+        return f"instruction {pc} (line {position[0]}, column {position[1]})"
+
+    def is_finished(self):
+        return not (0 <= self.pc < len(self.instructions))
+
+    def run(self):
+        # Spustí program od začátku; pc se do self.pc ukládá jen při chybě a na konci
+        registers = self.registers
+        instructions = self.instructions
+        end = len(instructions)
+        output_stream = self.output_stream
+        pc = 0
+        try:
+            while pc < end:
+                instruction = instructions[pc]
+                pc += 1
+                kind = instruction[0]
+                if kind == BINARY:
+                    _, operation, destination, a, b = instruction
+                    registers[destination] = operation(registers[a], registers[b])
+                elif kind == MOVE:
+                    registers[instruction[1]] = registers[instruction[2]]
+                elif kind == JUMP_IF_TRUE:
+                    if registers[instruction[1]]:
+                        pc = instruction[2]
+                elif kind == JUMP_IF_FALSE:
+                    if not registers[instruction[1]]:
+                        pc = instruction[2]
+                elif kind == UNARY:
+                    _, operation, destination, a = instruction
+                    registers[destination] = operation(registers[a])
+                elif kind == JUMP:
+                    pc = instruction[1]
+                elif kind == PRINT:
+                    print("".join([format_value(registers[operand]) for operand in instruction[1]]), file=output_stream)
+                else:
+                    _, destination, conversion, type_code = instruction
+                    registers[destination] = self.read_value(conversion, type_code)
+        except Exception as e:
+            self.pc = pc - 1
+            self.runtime_error(e, pc - 1)
+        self.pc = pc
+
+    def read_line(self):
+        # Stejně jako Interpreter.read_line (bez konce řádku, EOFError na konci vstupu)
+        if self.input_stream is None:
+            return input()
+        line = self.input_stream.readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return line.rstrip('\n').rstrip('\r')
+
+    def read_value(self, conversion, type_code):
+        try:
+            return conversion(self.read_line())
+        except ValueError as e:
+            raise ValueError(f"Invalid input for READ {type_code}: {e}")
+        except EOFError:
+            raise EOFError("End of input reached during READ")
+
+    def runtime_error(self, error, pc):
+        # Vypíše běhovou chybu s místem v programu (jako Interpreter) a ukončí stroj
+        opcode, operands = self.program.code[pc]
+        instruction = format_instruction(opcode, operands)
+        if isinstance(error, ZeroDivisionError):
+            message = "Modulo by zero" if opcode == 'mod_i' else "Division by zero"
+        else:
+            message = str(error)
+        print(f"Runtime Error at {self.describe_location(pc)} ({instruction}): {message}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.register_vm.register_machine <register_code_file>")
+        sys.exit(1)
+
+    machine = RegisterMachine()
+    machine.load_instructions(sys.argv[1])
+    machine.run()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Kooperativní plánovač mnoha programů v jednom procesu
+# Každý program je vlastní instance Interpreter (zásobník, proměnné, pc), instrukce, návěští
+# a tabulka řádků se sdílí mezi všemi instancemi se stejným kódem (načtou se jednou).
+# Připravené programy se střídají dokola (round-robin), každý vykoná nejvýše quantum instrukcí
+# (Interpreter.run_slice) a zařadí se na konec fronty.
+#   čekání na vstup  read bez dostupného řádku vyvolá InputPending; program se odstaví, dokud
+#                    mu feed nedodá řádek nebo close_input neukončí vstup (pak read skončí
+#                    běhovou chybou End of input jako u prázdného stdin)
+#   rozpočet         program, který vykoná max_instructions instrukcí a neskončil, se ukončí
+#                    se stavem instruction_limit
+#   běhová chyba     hlášení Interpreter se zachytí do stderr programu (stav runtime_error)
+# Metriky (metrics): propustnost (instrukce a dokončené programy za sekundu), férovost
+# (Jainův index rychlostí programů v době, kdy byly připravené, a prodleva mezi zařazením
+# do fronty a dalším kvantem) a počty programů podle stavu.
+
+import hashlib
+import io
+import statistics
+import sys
+import time
+from collections import deque
+from contextlib import redirect_stderr
+from src.interpreter.interpreter import Interpreter, InputPending
+
+DEFAULT_QUANTUM = 1000
+
+class ProgramInput:
+    # Vstup programu, do kterého lze průběžně dodávat text; readline bez celého řádku
+    # vyvolá InputPending, dokud vstup není uzavřený
+    def __init__(self, text="", closed=False):
+        self.buffer = text
+        self.closed = closed
+
+    def feed(self, text):
+        self.buffer += text
+
+    def has_line(self):
+        return '\n' in self.buffer or (self.closed and self.buffer != "")
+
+    def readline(self):
+        end = self.buffer.find('\n')
+        if end < 0:
+            if not self.closed:
+                raise InputPending()
+            end = len(self.buffer) - 1 # Poslední řádek bez konce řádku; '' = konec vstupu
+        line, self.buffer = self.buffer[:end + 1], self.buffer[end + 1:]
+        return line
+
+class Program:
+    # Stav jednoho programu v plánovači
+    def __init__(self, program_id, interpreter, program_input, max_instructions, now):
+        self.id = program_id
+        self.interpreter = interpreter
+        self.input = program_input
+        self.output = interpreter.output_stream
+        self.errors = io.StringIO()
+        self.max_instructions = max_instructions
+        self.status = 'ready' # ready, waiting_input, finished, runtime_error, instruction_limit
+        self.exit_code = None
+        self.instructions = 0 # Vykonané instrukce
+        self.slices = 0 # Přidělená kvanta
+        self.submitted = now
+        self.finished = None
+        self.ready_since = now # Kdy byl program naposledy zařazen do fronty
+        self.ready_time = 0.0 # Celkový čas ve frontě a v běhu (bez čekání na vstup)
+
+    @property
+    def done(self):
+        return self.status not in ('ready', 'waiting_input')
+
+    def result(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'stdout': self.output.getvalue(),
+            'stderr': self.errors.getvalue(),
+            'exit_code': self.exit_code,
+            'instructions': self.instructions,
+            'slices': self.slices,
+        }
+
+class Scheduler:
+    def __init__(self, quantum=DEFAULT_QUANTUM, max_instructions=None, typed_storage=False, clock=time.perf_counter):
+        self.quantum = quantum
+        self.max_instructions = max_instructions # Výchozí rozpočet instrukcí programu (None = bez limitu)
+        self.typed_storage = typed_storage
+        self.clock = clock
+        self.decoded = {} # hash bytecode -> načtený Interpreter, jehož instrukce se sdílí
+        self.programs = {}
+        self.ready = deque()
+        self.next_id = 0
+        self.started = clock()
+        self.busy_time = 0.0 # Čas strávený vykonáváním kvant
+        self.total_instructions = 0
+        self.total_slices = 0
+        self.latencies = deque(maxlen=10000) # Prodlevy mezi zařazením do fronty a kvantem (s)
+
+    def decode(self, bytecode):
+        key = hashlib.sha256(bytecode.encode('utf-8')).hexdigest()
+        program = self.decoded.get(key)
+        if program is None:
+            program = Interpreter(typed_storage=self.typed_storage)
+            program.load_code(bytecode)
+            self.decoded[key] = program
+        return program
+
+    def submit(self, bytecode, stdin="", close_input=True, max_instructions=None):
+        # Přidá program do fronty a vrátí jeho Program; s close_input=False lze vstup dodávat
+        # později přes feed
+        template = self.decode(bytecode)
+        program_input = ProgramInput(stdin or "", close_input)
+        interpreter = Interpreter(program_input, io.StringIO())
+        interpreter.instructions = template.instructions
+        interpreter.labels = template.labels
+        interpreter.line_table = template.line_table
+        if template.memory_layout is not None:
+            interpreter.use_memory_layout(template.memory_layout)
+        interpreter.pc = 0
+        budget = max_instructions if max_instructions is not None else self.max_instructions
+        program = Program(self.next_id, interpreter, program_input, budget, self.clock())
+        self.next_id += 1
+        self.programs[program.id] = program
+        self.ready.append(program)
+        return program
+
+    def feed(self, program_id, text, close=False):
+        # Dodá programu vstup (a případně ho uzavře); čekající program se vrátí do fronty
+        program = self.programs[program_id]
+        program.input.feed(text)
+        if close:
+            program.input.closed = True
+        if program.status == 'waiting_input' and (program.input.has_line() or program.input.closed):
+            program.status = 'ready'
+            program.ready_since = self.clock()
+            self.ready.append(program)
+
+    def close_input(self, program_id):
+        self.feed(program_id, "", close=True)
+
+    def step(self):
+        # Vykoná jedno kvantum dalšího připraveného programu; vrací False, pokud žádný není
+        if not self.ready:
+            return False
+        program = self.ready.popleft()
+        interpreter = program.interpreter
+        steps = self.quantum
+        if program.max_instructions is not None:
+            steps = min(steps, program.max_instructions - program.instructions)
+
+        started = self.clock()
+        self.latencies.append(started - program.ready_since)
+        executed = 0
+        with redirect_stderr(program.errors):
+            try:
+                if steps > 0:
+                    executed = interpreter.run_slice(steps)
+            except SystemExit as e:
+                # Interpreter při běhové chybě vypíše hlášení na stderr a volá sys.exit
+                program.status = 'runtime_error'
+                program.exit_code = e.code if isinstance(e.code, int) else 1
+                executed = None
+        now = self.clock()
+        self.busy_time += now - started
+        program.ready_time += now - program.ready_since
+        program.slices += 1
+        self.total_slices += 1
+        if executed is None:
+            # Počet instrukcí do chyby run_slice nevrátí; chybná instrukce je poslední vykonaná
+            executed = 0
+        program.instructions += executed
+        self.total_instructions += executed
+
+        if program.status == 'runtime_error':
+            program.finished = now
+        elif interpreter.is_finished():
+            program.status = 'finished'
+            program.exit_code = 0
+            program.finished = now
+        elif program.max_instructions is not None and program.instructions >= program.max_instructions:
+            program.status = 'instruction_limit'
+            program.exit_code = 1
+            program.finished = now
+        elif executed < steps and not program.input.has_line() and not program.input.closed:
+            program.status = 'waiting_input'
+        else:
+            program.ready_since = now
+            self.ready.append(program)
+        return True
+
+    def run(self, max_slices=None):
+        # Střídá připravené programy, dokud nějaký je (nebo do max_slices kvant); vrací počet kvant
+        slices = 0
+        while (max_slices is None or slices < max_slices) and self.step():
+            slices += 1
+        return slices
+
+    def waiting(self):
+        return [program for program in self.programs.values() if program.status == 'waiting_input']
+
+    def remove(self, program_id):
+        # Odebere skončený program (jeho výstup si volající už převzal) a vrátí jeho výsledek
+        program = self.programs[program_id]
+        if not program.done:
+            raise ValueError(f"Program {program_id} has not finished")
+        del self.programs[program_id]
+        return program.result()
+
+    def metrics(self):
+        elapsed = self.clock() - self.started
+        states = {}
+        for program in self.programs.values():
+            states[program.status] = states.get(program.status, 0) + 1
+        # Rychlost programu = instrukce za sekundu v době, kdy byl připravený; při férovém
+        # střídání mají programy, které soupeřily o procesor, podobné rychlosti
+        rates = [program.instructions / program.ready_time for program in self.programs.values()
+                 if program.ready_time > 0 and program.instructions > 0]
+        fairness = (sum(rates) ** 2 / (len(rates) * sum(rate * rate for rate in rates))) if rates else None
+        latencies = sorted(self.latencies)
+        finished = sum(1 for program in self.programs.values() if program.done)
+        return {
+            'programs': len(self.programs),
+            'states': states,
+            'instructions': self.total_instructions,
+            'slices': self.total_slices,
+            'elapsed': elapsed,
+            'busy_time': self.busy_time,
+            'instructions_per_second': self.total_instructions / self.busy_time if self.busy_time else None,
+            'finished_per_second': finished / elapsed if elapsed else None,
+            'fairness_index': fairness,
+            'median_latency': statistics.median(latencies) if latencies else None,
+            'max_latency': latencies[-1] if latencies else None,
+        }
+
+    def print_metrics(self, file=sys.stdout):
+        metrics = self.metrics()
+        print(f"programs:                {metrics['programs']} "
+              + " ".join(f"{state}={count}" for state, count in sorted(metrics['states'].items())), file=file)
+        print(f"instructions:            {metrics['instructions']} in {metrics['slices']} slices", file=file)
+        if metrics['instructions_per_second'] is not None:
+            print(f"throughput:              {metrics['instructions_per_second']:.0f} instructions/s, "
+                  f"{metrics['finished_per_second']:.1f} programs/s", file=file)
+        if metrics['fairness_index'] is not None:
+            print(f"fairness (Jain index):   {metrics['fairness_index']:.3f}", file=file)
+        if metrics['median_latency'] is not None:
+            print(f"slice latency:           median {metrics['median_latency'] * 1000:.2f} ms, "
+                  f"max {metrics['max_latency'] * 1000:.2f} ms", file=file)
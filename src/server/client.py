@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Tenký klient pro server (náhrada za "python main.py" ve skriptech)
+# Klient neimportuje nic z pipeline překladače, jen pošle požadavek přes Unix socket.
+#
+# Použití:
+#   python -m src.server.client exec <zdroj> [--stdin FILE]        přeloží a spustí program
+#   python -m src.server.client compile <zdroj> [<výstup>]         uloží vygenerovaný kód
+#   python -m src.server.client run <bytecode> [--stdin FILE]      spustí vygenerovaný kód
+#   python -m src.server.client stats                              statistiky workerů (server s --workers)
+# Vstup programu se čte z --stdin, nebo ze standardního vstupu, pokud není terminál.
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+from src.server.protocol import receive_message, send_message
+
+DEFAULT_SOCKET_PATH = os.environ.get('PJP_SOCKET', '/tmp/pjp.sock')
+
+def request(message, socket_path=DEFAULT_SOCKET_PATH):
+    # Pošle jeden požadavek serveru a vrátí odpověď
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_message(sock, message)
+        response = receive_message(sock)
+    if response is None:
+        raise ConnectionError("Server closed the connection without a response")
+    return response
+
+def _default_output_path(input_path):
+    input_dir = os.path.dirname(input_path)
+    input_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(input_dir, f"generated_{input_name}.txt")
+
+def main():
+    parser = argparse.ArgumentParser(description="Client for the compile/run server")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help=f"socket path (default: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("action", choices=["compile", "run", "exec", "stats"])
+    parser.add_argument("input_file", nargs="?")
+    parser.add_argument("output_file", nargs="?", help="where to write generated code (compile only)")
+    parser.add_argument("--stdin", metavar="FILE", help="program input (default: standard input if it is not a terminal)")
+    parser.add_argument("--max-instructions", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.action == 'stats':
+        try:
+            response = request({'action': 'stats'}, args.socket)
+        except (FileNotFoundError, ConnectionError) as e:
+            print(f"Error: cannot reach server at {args.socket}: {e}", file=sys.stderr)
+            return 2
+        if not response.get('ok'):
+            print("Error: server does not run pre-forked workers", file=sys.stderr)
+            return 1
+        print(json.dumps(response['stats'], indent=2))
+        return 0
+    if args.input_file is None:
+        parser.error(f"{args.action} requires an input file")
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    message = {'action': args.action}
+    if args.action == 'run':
+        message['bytecode'] = text
+    else:
+        message['source'] = text
+        message['source_name'] = args.input_file
+    if args.action != 'compile':
+        if args.stdin:
+            with open(args.stdin, 'r', encoding='utf-8') as f:
+                message['stdin'] = f.read()
+        elif not sys.stdin.isatty():
+            message['stdin'] = sys.stdin.read()
+    if args.max_instructions is not None:
+        message['max_instructions'] = args.max_instructions
+    if args.time_limit is not None:
+        message['time_limit'] = args.time_limit
+
+    try:
+        response = request(message, args.socket)
+    except (FileNotFoundError, ConnectionError) as e:
+        print(f"Error: cannot reach server at {args.socket}: {e}", file=sys.stderr)
+        return 2
+
+    for diagnostic in response.get('diagnostics') or []:
+        print(diagnostic, file=sys.stderr)
+
+    if args.action == 'compile' and response.get('ok'):
+        output_path = args.output_file or _default_output_path(args.input_file)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(response['bytecode'])
+        print(f"Successfully compiled {args.input_file} to {output_path}")
+
+    sys.stdout.write(response.get('stdout') or '')
+    sys.stderr.write(response.get('stderr') or '')
+    if response.get('status') in ('instruction_limit', 'time_limit'):
+        print(f"Execution stopped: {response['status'].replace('_', ' ')} reached "
+              f"after {response.get('instructions')} instructions", file=sys.stderr)
+
+    exit_code = response.get('exit_code')
+    return exit_code if isinstance(exit_code, int) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
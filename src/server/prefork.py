@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Předem vytvořené (pre-forked) workery pro server
+# Rodičovský proces naimportuje celou pipeline, zahřeje parser na zahřívacím korpusu
+# (naplní DFA cache) a přeloží a načte "horké" programy. Teprve potom vytvoří workery
+# přes fork, takže každý worker dostane zahřátý stav zadarmo (copy-on-write) a požadavky
+# neplatí za importy ani zahřívání.
+#
+# Supervisor rozděluje požadavky mezi workery přes roury, workery recykluje po K
+# požadavcích nebo při nárůstu paměti a sbírá statistiky propustnosti a latencí.
+
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from src.compiler.compiler import warm_up
+from src.server.service import HotPrograms, handle_request
+
+# Workery musí vzniknout přes fork, jinak by se zahřátý stav rodiče nesdílel
+_FORK = multiprocessing.get_context('fork')
+
+# Počet posledních latencí, ze kterých se počítají percentily
+LATENCY_WINDOW = 10000
+
+def current_rss():
+    # Aktuální rezidentní paměť procesu v bajtech
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Mimo Linux je k dispozici jen maximum za dobu běhu
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def percentile(sorted_values, fraction):
+    # Percentil metodou nejbližšího pořadí nad seřazeným seznamem
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def _worker_main(connection, max_instructions, time_limit, hot_programs):
+    # Smyčka workeru: přijme požadavek, zpracuje ho a pošle odpověď spolu s aktuální pamětí
+    # Ctrl+C a SIGTERM obsluhuje supervisor, worker končí po obdržení None nebo zavření roury
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    connection.send(current_rss())
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        try:
+            response = handle_request(request, max_instructions, time_limit, hot_programs)
+        except Exception as e:
+            # Chyba jednoho požadavku worker neukončí, klient dostane internal_error
+            response = {'ok': False, 'status': 'internal_error', 'diagnostics': [str(e)], 'bytecode': None,
+                        'stdout': '', 'stderr': '', 'exit_code': None, 'instructions': None}
+        try:
+            connection.send((response, current_rss()))
+        except (BrokenPipeError, EOFError):
+            # Supervisor zavřel rouru; jen tehdy worker končí (supervisor ho vidí jako spadlý)
+            break
+    connection.close()
+
+class Worker:
+    # Jeden worker z pohledu supervisoru
+    def __init__(self, number, process, connection, base_rss):
+        self.number = number # Pořadové číslo (nový worker po recyklaci dostane nové)
+        self.process = process
+        self.connection = connection
+        self.base_rss = base_rss # Paměť hned po vytvoření
+        self.rss = base_rss
+        self.requests = 0
+        self.busy_time = 0.0
+        self.started = time.perf_counter()
+        self.stopped = None
+        self.retired_reason = None
+
+    def stats(self):
+        lifetime = (self.stopped or time.perf_counter()) - self.started
+        return {
+            'worker': self.number,
+            'pid': self.process.pid,
+            'requests': self.requests,
+            'busy_time': self.busy_time,
+            'lifetime': lifetime,
+            'throughput': self.requests / lifetime if lifetime > 0 else 0.0,
+            'utilization': self.busy_time / lifetime if lifetime > 0 else 0.0,
+            'rss': self.rss,
+            'rss_growth': self.rss - self.base_rss,
+            'retired': self.retired_reason,
+        }
+
+class PreforkSupervisor:
+    # Spravuje N workerů vytvořených z rodiče se zahřátou pipeline
+    # submit() je bezpečné volat z více vláken; každý požadavek dostane první volný worker
+    def __init__(self, workers=4, recycle_after=1000, max_rss_growth=64 * 1024 * 1024,
+                 max_instructions=None, time_limit=None, hot_programs=None):
+        self.worker_count = workers
+        self.recycle_after = recycle_after # None = bez recyklace podle počtu požadavků
+        self.max_rss_growth = max_rss_growth # None = bez recyklace podle paměti
+        self.max_instructions = max_instructions
+        self.time_limit = time_limit
+        self.hot_programs = hot_programs if hot_programs is not None else HotPrograms()
+        self.idle = queue.Queue()
+        self.workers = {} # číslo -> Worker (běžící)
+        self.retired = deque(maxlen=100) # Statistiky ukončených workerů
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.total_requests = 0
+        self.recycled = 0
+        self.crashed = 0
+        self.started = None
+        self._next_number = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, warmup_sources=None, hot_sources=(), hot_bytecode=()):
+        # Zahřeje parser a připraví horké programy ještě před vytvořením workerů
+        warm_up(warmup_sources)
+        for name, source in hot_sources:
+            if not self.hot_programs.add_source(source, name):
+                print(f"Warning: Hot program {name} failed to compile, skipping it", file=sys.stderr)
+        for bytecode in hot_bytecode:
+            self.hot_programs.add_bytecode(bytecode)
+
+    def start(self):
+        self.started = time.perf_counter()
+        for _ in range(self.worker_count):
+            self.idle.put(self._spawn())
+
+    def _spawn(self):
+        with self._lock:
+            number = self._next_number
+            self._next_number += 1
+        parent_end, child_end = _FORK.Pipe()
+        process = _FORK.Process(target=_worker_main, name=f"pjp-worker-{number}",
+                                args=(child_end, self.max_instructions, self.time_limit, self.hot_programs),
+                                daemon=True)
+        process.start()
+        child_end.close()
+        base_rss = parent_end.recv()
+        worker = Worker(number, process, parent_end, base_rss)
+        with self._lock:
+            self.workers[number] = worker
+        return worker
+
+    def _retire(self, worker, reason):
+        # Ukončí workera a uloží jeho statistiky
+        try:
+            worker.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.connection.close()
+        worker.stopped = time.perf_counter()
+        worker.retired_reason = reason
+        with self._lock:
+            self.workers.pop(worker.number, None)
+            self.retired.append(worker.stats())
+
+    def _recycle_reason(self, worker):
+        if self.recycle_after is not None and worker.requests >= self.recycle_after:
+            return 'requests'
+        if self.max_rss_growth is not None and worker.rss - worker.base_rss > self.max_rss_growth:
+            return 'memory'
+        return None
+
+    def submit(self, request):
+        # Zpracuje požadavek v prvním volném workeru a vrátí odpověď
+        worker = self.idle.get()
+        started = time.perf_counter()
+        try:
+            worker.connection.send(request)
+            response, worker.rss = worker.connection.recv()
+        except (EOFError, BrokenPipeError, OSError):
+            # Worker spadl (např. ho ukončil OOM killer); nahradíme ho novým
+            self._retire(worker, 'crashed')
+            with self._lock:
+                self.crashed += 1
+            self.idle.put(self._spawn())
+            return {'ok': False, 'status': 'worker_error', 'diagnostics': ["Worker process exited unexpectedly"],
+                    'bytecode': None, 'stdout': '', 'stderr': '', 'exit_code': 1, 'instructions': None}
+        elapsed = time.perf_counter() - started
+        worker.requests += 1
+        worker.busy_time += elapsed
+        with self._lock:
+            self.total_requests += 1
+            self.latencies.append(elapsed)
+
+        reason = self._recycle_reason(worker)
+        if reason is not None:
+            self._retire(worker, reason)
+            with self._lock:
+                self.recycled += 1
+            worker = self._spawn()
+        self.idle.put(worker)
+        return response
+
+    def stats(self):
+        # Propustnost jednotlivých workerů a percentily latence požadavků
+        with self._lock:
+            latencies = sorted(self.latencies)
+            running = [worker.stats() for worker in self.workers.values()]
+            retired = list(self.retired)
+            uptime = time.perf_counter() - self.started if self.started is not None else 0.0
+            return {
+                'workers': running,
+                'retired_workers': retired,
+                'requests': self.total_requests,
+                'recycled': self.recycled,
+                'crashed': self.crashed,
+                'uptime': uptime,
+                'throughput': self.total_requests / uptime if uptime > 0 else 0.0,
+                'latency': {
+                    'samples': len(latencies),
+                    'p50': percentile(latencies, 0.50),
+                    'p90': percentile(latencies, 0.90),
+                    'p99': percentile(latencies, 0.99),
+                    'max': latencies[-1] if latencies else None,
+                },
+            }
+
+    def report(self, file=sys.stderr):
+        stats = self.stats()
+        latency = stats['latency']
+        print(f"Requests: {stats['requests']} in {stats['uptime']:.1f} s "
+              f"({stats['throughput']:.1f} req/s), recycled workers: {stats['recycled']}, "
+              f"crashed: {stats['crashed']}", file=file)
+        if latency['samples']:
+            print(f"Latency (last {latency['samples']}): p50 {latency['p50'] * 1000:.2f} ms, "
+                  f"p90 {latency['p90'] * 1000:.2f} ms, p99 {latency['p99'] * 1000:.2f} ms, "
+                  f"max {latency['max'] * 1000:.2f} ms", file=file)
+        print(f"{'Worker':>6} {'PID':>8} {'Requests':>9} {'Req/s':>9} {'Busy':>6} {'RSS growth':>11} Status", file=file)
+        for worker in stats['workers'] + stats['retired_workers']:
+            print(f"{worker['worker']:>6} {worker['pid']:>8} {worker['requests']:>9} "
+                  f"{worker['throughput']:>9.1f} {worker['utilization'] * 100:>5.1f}% "
+                  f"{worker['rss_growth'] / 1024:>8.0f} KB {worker['retired'] or 'running'}", file=file)
+
+    def shutdown(self):
+        # Ukončí všechny běžící workery (počká, až dokončí rozpracované požadavky)
+        for _ in range(len(self.workers)):
+            worker = self.idle.get()
+            self._retire(worker, 'shutdown')
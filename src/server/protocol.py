@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Přenosový protokol serveru
+# Každá zpráva je JSON v UTF-8, před kterým jsou 4 bajty délky (big-endian).
+
+import json
+import struct
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+def send_message(sock, message):
+    # Odešle slovník jako jednu zprávu
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+def _receive_exactly(sock, size):
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+def receive_message(sock):
+    # Přijme jednu zprávu; vrací None, pokud protistrana spojení uzavřela
+    header = _receive_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message too large: {size} bytes")
+    payload = _receive_exactly(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
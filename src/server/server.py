@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Dlouhoběžící server pro překlad a běh programů přes Unix domain socket
+# Server jednou naimportuje celou pipeline (antlr4, parser se serializovaným ATN,
+# type checker, generátor kódu) a zahřeje parser. Každý další požadavek pak platí jen
+# za samotný překlad/běh, ne za start interpretru Pythonu a importy.
+#
+# Použití:
+#   python -m src.server.server [--socket /tmp/pjp.sock] [--max-instructions N] [--time-limit S]
+#   python -m src.server.server --workers N [--recycle-after K] [--max-rss-growth MB]
+#                               [--warmup FILE ...] [--hot FILE ...] [--hot-bytecode FILE ...]
+# S --workers server obsluhuje spojení paralelně a požadavky zpracovávají předem
+# vytvořené workery (viz src/server/prefork.py). Akce 'stats' vrací jejich statistiky.
+
+import argparse
+import os
+import signal
+import socketserver
+import sys
+
+from src.compiler.compiler import warm_up
+from src.server.protocol import receive_message, send_message
+from src.server.prefork import PreforkSupervisor
+from src.server.service import handle_request
+
+DEFAULT_SOCKET_PATH = os.environ.get('PJP_SOCKET', '/tmp/pjp.sock')
+
+class RequestHandler(socketserver.BaseRequestHandler):
+    # Obsluha jednoho spojení; klient může poslat více požadavků za sebou
+    def handle(self):
+        while True:
+            try:
+                request = receive_message(self.request)
+            except (ValueError, ConnectionError) as e:
+                print(f"Warning: Invalid message from client: {e}", file=sys.stderr)
+                return
+            if request is None:
+                return
+            if not isinstance(request, dict):
+                response = {'ok': False, 'status': 'bad_request', 'diagnostics': ["Request must be a JSON object"]}
+            else:
+                response = self.server.dispatch(request)
+            try:
+                send_message(self.request, response)
+            except (BrokenPipeError, ConnectionError):
+                return
+
+class CompileServer(socketserver.UnixStreamServer):
+    # Server zpracovává požadavky postupně v jednom zahřátém procesu
+    def __init__(self, socket_path, max_instructions=None, time_limit=None):
+        self.socket_path = socket_path
+        self.max_instructions = max_instructions
+        self.time_limit = time_limit
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, RequestHandler)
+
+    def dispatch(self, request):
+        return handle_request(request, self.max_instructions, self.time_limit)
+
+class PreforkServer(socketserver.ThreadingMixIn, CompileServer):
+    # Každé spojení obsluhuje vlastní vlákno, požadavky se předávají workerům supervisoru
+    daemon_threads = True
+
+    def __init__(self, socket_path, supervisor):
+        self.supervisor = supervisor
+        super().__init__(socket_path, supervisor.max_instructions, supervisor.time_limit)
+
+    def dispatch(self, request):
+        if request.get('action') == 'stats':
+            return {'ok': True, 'status': 'stats', 'stats': self.supervisor.stats()}
+        return self.supervisor.submit(request)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile/run server listening on a Unix domain socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help=f"socket path (default: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--max-instructions", type=int, default=None,
+                        help="upper limit of executed instructions per request")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="upper limit of execution time per request in seconds")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="number of pre-forked worker processes (default: handle requests in the server process)")
+    parser.add_argument("--recycle-after", type=int, default=1000, metavar="K",
+                        help="replace a worker after K requests (default: 1000, 0 = never)")
+    parser.add_argument("--max-rss-growth", type=float, default=64, metavar="MB",
+                        help="replace a worker whose memory grew by more than MB (default: 64, 0 = never)")
+    parser.add_argument("--warmup", nargs="+", default=[], metavar="FILE",
+                        help="source files used to warm up the parser before forking workers")
+    parser.add_argument("--hot", nargs="+", default=[], metavar="FILE",
+                        help="source programs to compile and load before forking workers")
+    parser.add_argument("--hot-bytecode", nargs="+", default=[], metavar="FILE",
+                        help="generated code to load before forking workers")
+    args = parser.parse_args()
+
+    supervisor = None
+    if args.workers > 0:
+        supervisor = PreforkSupervisor(args.workers,
+                                       recycle_after=args.recycle_after or None,
+                                       max_rss_growth=int(args.max_rss_growth * 1024 * 1024) or None,
+                                       max_instructions=args.max_instructions, time_limit=args.time_limit)
+        try:
+            warmup_sources = [_read(path) for path in args.warmup] or None
+            hot_sources = [(path, _read(path)) for path in args.hot]
+            hot_bytecode = [_read(path) for path in args.hot_bytecode]
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        supervisor.prepare(warmup_sources, hot_sources, hot_bytecode)
+        supervisor.start()
+        server = PreforkServer(args.socket, supervisor)
+    else:
+        warm_up()
+        server = CompileServer(args.socket, args.max_instructions, args.time_limit)
+
+    # SIGTERM ukončí server stejně jako Ctrl+C
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, terminate)
+
+    print(f"Listening on {args.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if supervisor is not None:
+            supervisor.shutdown()
+            supervisor.report()
+    return 0
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+if __name__ == "__main__":
+    sys.exit(main())
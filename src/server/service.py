@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Zpracování požadavků na překlad a běh programů
+# Funkce handle_request je nezávislá na přenosu (socket, roura), používá ji server
+# i workery. Požadavek i odpověď jsou slovníky (přenášené jako JSON).
+#
+# Požadavek:
+#   action            'compile' | 'run' | 'exec'
+#   source            zdrojový kód (compile, exec)
+#   source_name       jméno zdroje pro chybová hlášení (volitelné)
+#   bytecode          vygenerovaný kód (run)
+#   stdin             vstup programu pro instrukce read (volitelné)
+#   max_instructions  limit počtu vykonaných instrukcí (volitelné)
+#   time_limit        limit času běhu v sekundách (volitelné)
+#
+# Odpověď:
+#   ok, status ('compiled', 'finished', 'instruction_limit', 'time_limit', 'runtime_error',
+#   'compile_error', 'bad_request', v prefork workeru i 'internal_error'), diagnostics, bytecode,
+#   stdout, stderr, exit_code, instructions, elapsed
+
+import hashlib
+import io
+import time
+from contextlib import redirect_stderr
+from src.interpreter.interpreter import Interpreter
+
+def _limit(requested, maximum):
+    # Vrátí menší z limitů (None = bez limitu)
+    if requested is None:
+        return maximum
+    if maximum is None:
+        return requested
+    return min(requested, maximum)
+
+def _invalid_fields(request):
+    # Chybové hlášení pro pole požadavku s nesprávným typem, nebo None
+    max_instructions = request.get('max_instructions')
+    if max_instructions is not None and (isinstance(max_instructions, bool) or not isinstance(max_instructions, int)
+                                         or max_instructions < 0):
+        return f"'max_instructions' must be a non-negative integer, got {max_instructions!r}"
+    time_limit = request.get('time_limit')
+    if time_limit is not None and (isinstance(time_limit, bool) or not isinstance(time_limit, (int, float))
+                                   or not time_limit >= 0):
+        return f"'time_limit' must be a non-negative number, got {time_limit!r}"
+    for field in ('stdin', 'bytecode'):
+        if request.get(field) is not None and not isinstance(request[field], str):
+            return f"'{field}' must be a string"
+    return None
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class HotPrograms:
+    # Předem přeložené a načtené ("dekódované") programy
+    # Proces je připraví jednou; workery vytvořené přes fork je sdílejí (copy-on-write)
+    def __init__(self):
+        self.bytecode_by_source = {} # hash zdroje -> vygenerovaný kód
+        self.decoded = {} # hash bytecode -> načtený Interpreter (instrukce, labely, tabulka řádků)
+
+    def add_bytecode(self, bytecode):
+        program = Interpreter()
+        program.load_code(bytecode)
+        self.decoded[text_hash(bytecode)] = program
+        return program
+
+    def add_source(self, source, source_name="<hot>"):
+        # Přeloží a načte program ze zdrojového kódu; vrací False, pokud překlad selže
+        success, bytecode, _ = compile_request(source, source_name)
+        if success:
+            self.bytecode_by_source[text_hash(source)] = bytecode
+            self.add_bytecode(bytecode)
+        return success
+
+def compile_request(source, source_name, hot_programs=None):
+    if hot_programs is not None:
+        bytecode = hot_programs.bytecode_by_source.get(text_hash(source))
+        if bytecode is not None:
+            return True, bytecode, []
+    from src.compiler.compiler import compile_source
+    result = compile_source(source, source_name)
+    return result.success, result.generated_code, result.errors
+
+def run_bytecode(bytecode, stdin, max_instructions=None, time_limit=None, hot_programs=None):
+    # Spustí vygenerovaný kód se zachyceným výstupem a limity
+    # Pokud je program mezi hot_programs, jeho instrukce se jen sdílí a nenačítají znovu
+    output = io.StringIO()
+    errors = io.StringIO()
+    interpreter = Interpreter(io.StringIO(stdin or ""), output)
+    program = hot_programs.decoded.get(text_hash(bytecode)) if hot_programs is not None else None
+    with redirect_stderr(errors):
+        if program is not None:
+            interpreter.instructions = program.instructions
+            interpreter.labels = program.labels
+            interpreter.line_table = program.line_table
+        else:
+            interpreter.load_code(bytecode)
+        try:
+            status, executed = interpreter.run_limited(max_instructions, time_limit)
+            exit_code = 0
+        except SystemExit as e:
+            # Interpreter při běhové chybě vypíše hlášení na stderr a volá sys.exit
+            status, executed = 'runtime_error', None
+            exit_code = e.code if isinstance(e.code, int) else 1
+    if status in ('instruction_limit', 'time_limit'):
+        exit_code = 1
+    return {
+        'status': status,
+        'stdout': output.getvalue(),
+        'stderr': errors.getvalue(),
+        'exit_code': exit_code,
+        'instructions': executed,
+    }
+
+def handle_request(request, max_instructions=None, time_limit=None, hot_programs=None):
+    # Zpracuje jeden požadavek; max_instructions a time_limit jsou horní meze nastavené serverem
+    started = time.perf_counter()
+    response = {'ok': False, 'status': None, 'diagnostics': [], 'bytecode': None,
+                'stdout': '', 'stderr': '', 'exit_code': None, 'instructions': None}
+    action = request.get('action')
+
+    if action not in ('compile', 'run', 'exec'):
+        response['status'] = 'bad_request'
+        response['diagnostics'] = [f"Unknown action: {action!r}"]
+        return response
+    invalid = _invalid_fields(request)
+    if invalid is not None:
+        response['status'] = 'bad_request'
+        response['diagnostics'] = [invalid]
+        return response
+
+    bytecode = request.get('bytecode')
+    if action in ('compile', 'exec'):
+        if not isinstance(request.get('source'), str):
+            response['status'] = 'bad_request'
+            response['diagnostics'] = ["Missing 'source' in request"]
+            return response
+        success, bytecode, diagnostics = compile_request(request['source'], request.get('source_name', '<request>'),
+                                                         hot_programs)
+        response['diagnostics'] = diagnostics
+        response['bytecode'] = bytecode
+        if not success:
+            response['status'] = 'compile_error'
+            response['exit_code'] = 1
+            response['elapsed'] = time.perf_counter() - started
+            return response
+        if action == 'compile':
+            response['ok'] = True
+            response['status'] = 'compiled'
+            response['exit_code'] = 0
+            response['elapsed'] = time.perf_counter() - started
+            return response
+    elif not isinstance(bytecode, str):
+        response['status'] = 'bad_request'
+        response['diagnostics'] = ["Missing 'bytecode' in request"]
+        return response
+
+    result = run_bytecode(bytecode, request.get('stdin') or '',
+                          _limit(request.get('max_instructions'), max_instructions),
+                          _limit(request.get('time_limit'), time_limit), hot_programs)
+    response.update(result)
+    response['ok'] = result['status'] == 'finished'
+    response['elapsed'] = time.perf_counter() - started
+    return response
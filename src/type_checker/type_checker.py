@@ -2,11 +2,9 @@
 # -*- coding: utf-8 -*-
 
 # Type checker modul
-# Tento modul provádí kontrolu typů na syntaktickém stromě a hlásí chyby typu.
+# Tento modul provádí kontrolu typů nad IR programu (src/ir/nodes.py) a hlásí chyby typu.
 
-from antlr4 import *
-from src.parser.LanguageParser import LanguageParser
-from src.parser.LanguageVisitor import LanguageVisitor
+from src.ir.nodes import IRVisitor, is_boolean_literal
 
 # Třída Type definuje typy, které jsou podporovány v našem jazyce.
 class Type:
@@ -43,9 +41,9 @@ class TypeCheckError:
         # Sestavení chybové zprávy
         return f"Type error at line {self.line}, column {self.column}: {self.message}"
 
-class TypeChecker(LanguageVisitor):
-    # Implementace Visitoru pro kontrolu typů v syntaktickém stromě. (parser tree)
-    # Tato třída dědí z LanguageVisitor, což je generovaný visitor pro náš jazyk.
+class TypeChecker(IRVisitor):
+    # Implementace Visitoru pro kontrolu typů nad IR programu.
+    # IR vzniká z parse tree (src/ir/lowering.py), uzly nesou pozici svého prvního tokenu.
     def __init__(self):
         # Initializace type checkeru
 
@@ -55,8 +53,8 @@ class TypeChecker(LanguageVisitor):
         # Tady budeme ukládat chyby, které byly nalezeny během kontroly typů
         self.errors = []
     
-    def is_boolean_literal(self, expr_text):
-        return expr_text == "true" or expr_text == "false"
+    def is_boolean_literal(self, node):
+        return is_boolean_literal(node)
 
     def has_errors(self):
         # Funkce pro kontrolu, zda byly nalezeny nějaké chyby. Pokud ano, vrátí True.
@@ -66,24 +64,15 @@ class TypeChecker(LanguageVisitor):
         for error in self.errors:
             print(error)
     
-    def add_error(self, ctx, message):
-        if hasattr(ctx, 'start'):
-            line = ctx.start.line
-            column = ctx.start.column
-        elif hasattr(ctx, 'symbol'):
-            line = ctx.symbol.line
-            column = ctx.symbol.column
-        else:
-            line = 0
-            column = 0
-        
-        error = TypeCheckError(line, column, message)
+    def add_error(self, node, message):
+        # Chyba se hlásí na pozici uzlu (u deklarací a read na pozici jména proměnné)
+        error = TypeCheckError(node.line, node.column, message)
         self.errors.append(error)
         
         return Type.ERROR
     
     def visitProgram(self, ctx):
-        for statement in ctx.statement():
+        for statement in ctx.statements:
             self.visit(statement)
         return None
     
@@ -93,15 +82,15 @@ class TypeChecker(LanguageVisitor):
     def visitDeclarationStatement(self, ctx):
         # Funkce pro visit statementu pro deklaraci proměnné.
 
-        # Získáme typ proměnné z kontextu
-        type_name = ctx.type_().getText()
+        # Získáme typ proměnné z uzlu
+        type_name = ctx.type_name
         
-        # Získáme seznam proměnných z kontextu
-        variables = ctx.variableList().ID()
+        # Získáme seznam proměnných z uzlu
+        variables = ctx.identifiers
         
         # Přidáme každou proměnnou do objektu (slovníku) proměnných
         for var in variables:
-            var_name = var.getText()
+            var_name = var.name
             
             # Pokud je proměnná již deklarována, přidáme chybu do seznamu chyb
             if var_name in self.variables:
@@ -111,7 +100,7 @@ class TypeChecker(LanguageVisitor):
         
         return None
     
-    def visitTernaryExpr(self, ctx: LanguageParser.TernaryExprContext):
+    def visitTernaryExpr(self, ctx):
         # Funkce pro visit ternárního výrazu (cond ? th : el).
 
         # Navštívíme podmínku, true výraz a false výraz
@@ -140,18 +129,18 @@ class TypeChecker(LanguageVisitor):
     
     def visitExpressionStatement(self, ctx):
         # Funkce pro visit statementu pro výraz.
-        self.visit(ctx.expression())
+        self.visit(ctx.expression)
         return None
     
     def visitReadStatement(self, ctx):
         # Funkce pro visit statementu pro čtení proměnné. (read)
 
-        # Získáme seznam proměnných z kontextu
-        variables = ctx.variableList().ID()
+        # Získáme seznam proměnných z uzlu
+        variables = ctx.identifiers
         
         # Kontrolujeme, zda je každá proměnná deklarována
         for var in variables:
-            var_name = var.getText()
+            var_name = var.name
             
             # Pokud proměnná není deklarována, přidáme chybu do seznamu chyb
             if var_name not in self.variables:
@@ -163,7 +152,7 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit statementu pro zápis proměnné. (write)
 
         # Navštívíme všechny výrazy ve write statementu
-        expressions = ctx.expressionList().expression()
+        expressions = ctx.expressions
         for expr in expressions:
             self.visit(expr)
         
@@ -173,7 +162,7 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit bloku
 
         # Zavoláme visit na všechny statementy v bloku, blok jsou složené závorky
-        for statement in ctx.statement():
+        for statement in ctx.statements:
             self.visit(statement)
         
         return None
@@ -182,36 +171,36 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit if statementu.
 
         # Navštívíme podmínku if statementu
-        condition_type = self.visit(ctx.expression())
+        condition_type = self.visit(ctx.condition)
         
         # Kontrolujeme, zda je podmínka boolean, pokud ne, přidáme chybu do seznamu chyb
         if condition_type != Type.BOOL and condition_type != Type.ERROR:
-            self.add_error(ctx.expression(), f"Condition must be of type bool, but got {Type.to_string(condition_type)}")
+            self.add_error(ctx.condition, f"Condition must be of type bool, but got {Type.to_string(condition_type)}")
         
         # Navštívíme 'then' statement
-        self.visit(ctx.statement(0))
+        self.visit(ctx.then_statement)
         
         # Pokud je else statement, navštívíme ho
-        if len(ctx.statement()) > 1:
-            self.visit(ctx.statement(1))
+        if ctx.else_statement is not None:
+            self.visit(ctx.else_statement)
         
         return None
     def visitWhileStatement(self, ctx):
         # Funkce pro visit while statementu.
 
         # Navštívíme podmínku while statementu
-        condition_type = self.visit(ctx.expression())
+        condition_type = self.visit(ctx.condition)
         
         # Kontrolujeme, zda je podmínka boolean, pokud ne, přidáme chybu do seznamu chyb
         if condition_type != Type.BOOL and condition_type != Type.ERROR:
-            self.add_error(ctx.expression(), f"Condition must be of type bool, but got {Type.to_string(condition_type)}")
+            self.add_error(ctx.condition, f"Condition must be of type bool, but got {Type.to_string(condition_type)}")
         
         # Navštívíme tělo while statementu
-        self.visit(ctx.statement())
+        self.visit(ctx.body)
         
         return None
     
-    def visitForStatement(self, ctx:LanguageParser.ForStatementContext):
+    def visitForStatement(self, ctx):
         # Funkce pro visit for statementu.
 
         # Navštívíme inicializační výraz (pokud existuje)
@@ -233,7 +222,7 @@ class TypeChecker(LanguageVisitor):
             self.visit(ctx.step)
 
         # Navštívíme tělo cyklu
-        self.visit(ctx.statement())
+        self.visit(ctx.body)
 
         return None
     
@@ -243,8 +232,8 @@ class TypeChecker(LanguageVisitor):
     def visitVariableExpr(self, ctx):
         # Funkce pro visit proměnné v kontextu výrazu
 
-        # Získáme název proměnné z kontextu
-        var_name = ctx.ID().getText()
+        # Získáme název proměnné z uzlu
+        var_name = ctx.name
         
         # Kontrolujeme, zda je proměnná deklarována, pokud ne, přidáme chybu do seznamu chyb
         if var_name not in self.variables:
@@ -257,20 +246,16 @@ class TypeChecker(LanguageVisitor):
         # Např. takovýto výraz: 10, "Hello", true
         # V našem jazyce máme několik typů literálů: int, float, bool, string
 
-        literal = ctx.literal()
+        kind = ctx.kind
         
         # Zkontrolujeme co to je za literal a vrátíme jeho typ
-        if literal.IntegerLiteral() is not None:
+        if kind == 'int':
             return Type.INT
-        elif literal.FloatLiteral() is not None:
+        elif kind == 'float':
             return Type.FLOAT
-        elif literal.BooleanLiteral() is not None:
-            # Handle boolean literals explicitly, including "true" and "false"
-            bool_text = literal.BooleanLiteral().getText()
-            if bool_text == "true" or bool_text == "false":
-                return Type.BOOL
+        elif kind == 'bool':
             return Type.BOOL
-        elif literal.StringLiteral() is not None:
+        elif kind == 'string':
             return Type.STRING
         
         # Sem by se nemělo dostat, pokud ano, přidáme chybu do seznamu chyb
@@ -278,13 +263,13 @@ class TypeChecker(LanguageVisitor):
     
     def visitParenExpr(self, ctx):
         # Funkce pro visit výrazu v závorkách (např. (x + y)).
-        return self.visit(ctx.expression())
+        return self.visit(ctx.expression)
     
     def visitUnaryMinusExpr(self, ctx):
         # Funkce pro visit unární minus výrazu (např. -x).
 
         # Získáme typ operandu (výrazu) z kontextu
-        operand_type = self.visit(ctx.expression())
+        operand_type = self.visit(ctx.expression)
         
         # Zjistíme, jestli je operand číslo (int nebo float)
         if operand_type == Type.INT:
@@ -300,7 +285,7 @@ class TypeChecker(LanguageVisitor):
     def visitNotExpr(self, ctx):
         # Funkce pro visit logického NOT výrazu (např. !x).
 
-        operand_type = self.visit(ctx.expression())
+        operand_type = self.visit(ctx.expression)
         
         # Zjistíme, jestli je operand boolean
         if operand_type == Type.BOOL:
@@ -314,11 +299,11 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit výrazu pro násobení, dělení a modulo
 
         # Získáme typy levého a pravého operandu (výrazu)
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
         
         # Získáme operátor
-        operator = ctx.getChild(1).getText()
+        operator = ctx.operator
         
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -344,11 +329,11 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit výrazu pro sčítání, odčítání a spojení řetězců
 
         # Získáme typy levého a pravého operandu (výrazu)
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
         
         # Získáme operátor
-        operator = ctx.getChild(1).getText()
+        operator = ctx.operator
         
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -374,8 +359,8 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit porovnávacích výrazů (< > <= >=).
 
         # Získáme typy levého a pravého operandu (výrazu)
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
 
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -390,8 +375,8 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit porovnávacích výrazů (rovnost a nerovnost)
 
         # Získáme typy levého a pravého operandu (výrazu)
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
         
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -411,19 +396,19 @@ class TypeChecker(LanguageVisitor):
     def visitAndExpr(self, ctx):
         # Funkce pro visit logického AND výrazu (&&).
 
-        # Získáme text levého a pravého operandu (výrazu)
-        left_text = ctx.expression(0).getText()
-        right_text = ctx.expression(1).getText()
+        # Získáme levý a pravý operand (výraz)
+        left_expr = ctx.left
+        right_expr = ctx.right
         
         # Kontrola, jestli jsou oba operandy boolean literály
         # Např. true && false nebo false && true
-        if self.is_boolean_literal(left_text) and self.is_boolean_literal(right_text):
+        if self.is_boolean_literal(left_expr) and self.is_boolean_literal(right_expr):
             return Type.BOOL
         
         # Jestli je levý operand boolean literal:
-        if self.is_boolean_literal(left_text):
+        if self.is_boolean_literal(left_expr):
             # Navštívíme pravý operand a zkontrolujeme jeho typ
-            right_type = self.visit(ctx.expression(1))
+            right_type = self.visit(ctx.right)
             if right_type == Type.BOOL:
                 return Type.BOOL
             elif right_type == Type.ERROR:
@@ -432,8 +417,8 @@ class TypeChecker(LanguageVisitor):
                 return self.add_error(ctx, f"Logical AND operator requires boolean operands, but got bool and {Type.to_string(right_type)}")
         
         # To stejné, ale opak pro pravý operand
-        if self.is_boolean_literal(right_text):
-            left_type = self.visit(ctx.expression(0))
+        if self.is_boolean_literal(right_expr):
+            left_type = self.visit(ctx.left)
             if left_type == Type.BOOL:
                 return Type.BOOL
             elif left_type == Type.ERROR:
@@ -442,8 +427,8 @@ class TypeChecker(LanguageVisitor):
                 return self.add_error(ctx, f"Logical AND operator requires boolean operands, but got {Type.to_string(left_type)} and bool")
         
         # Získáme typy levého a pravého operandu (výrazu)
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
         
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -457,14 +442,14 @@ class TypeChecker(LanguageVisitor):
     def visitOrExpr(self, ctx):
         # Funkce pro visit logického OR výrazu (||).
 
-        left_text = ctx.expression(0).getText()
-        right_text = ctx.expression(1).getText()
+        left_expr = ctx.left
+        right_expr = ctx.right
         
-        if self.is_boolean_literal(left_text) and self.is_boolean_literal(right_text):
+        if self.is_boolean_literal(left_expr) and self.is_boolean_literal(right_expr):
             return Type.BOOL
         
-        if self.is_boolean_literal(left_text):
-            right_type = self.visit(ctx.expression(1))
+        if self.is_boolean_literal(left_expr):
+            right_type = self.visit(ctx.right)
             if right_type == Type.BOOL:
                 return Type.BOOL
             elif right_type == Type.ERROR:
@@ -472,8 +457,8 @@ class TypeChecker(LanguageVisitor):
             else:
                 return self.add_error(ctx, f"Logical OR operator requires boolean operands, but got bool and {Type.to_string(right_type)}")
         
-        if self.is_boolean_literal(right_text):
-            left_type = self.visit(ctx.expression(0))
+        if self.is_boolean_literal(right_expr):
+            left_type = self.visit(ctx.left)
             if left_type == Type.BOOL:
                 return Type.BOOL
             elif left_type == Type.ERROR:
@@ -481,8 +466,8 @@ class TypeChecker(LanguageVisitor):
             else:
                 return self.add_error(ctx, f"Logical OR operator requires boolean operands, but got {Type.to_string(left_type)} and bool")
         
-        left_type = self.visit(ctx.expression(0))
-        right_type = self.visit(ctx.expression(1))
+        left_type = self.visit(ctx.left)
+        right_type = self.visit(ctx.right)
         
         if left_type == Type.ERROR or right_type == Type.ERROR:
             return Type.ERROR
@@ -496,7 +481,7 @@ class TypeChecker(LanguageVisitor):
         # Funkce pro visit přiřazení výrazu (=).
 
         # Získáme název proměnné
-        var_name = ctx.ID().getText()
+        var_name = ctx.name
 
         # Kontrolujeme, zda je proměnná deklarována, pokud ne, přidáme chybu do seznamu chyb
         if var_name not in self.variables:
@@ -507,12 +492,11 @@ class TypeChecker(LanguageVisitor):
         
         # Speciální case pro boolean literály v přímém přiřazení
         
-        expr_text = ctx.expression().getText()
-        if var_type == Type.BOOL and (expr_text == "true" or expr_text == "false"):
+        if var_type == Type.BOOL and self.is_boolean_literal(ctx.expression):
             return Type.BOOL
         
         # Získáme typ výrazu na pravé straně přiřazení
-        expr_type = self.visit(ctx.expression())
+        expr_type = self.visit(ctx.expression)
         
         if expr_type == Type.ERROR:
             return Type.ERROR